@@ -1,14 +1,22 @@
-
+import argparse
 import cv2 
 import time
 import os
+
+parser = argparse.ArgumentParser(description="Capture a burst of frames at a known distance for calibrate.py.")
+parser.add_argument("--distance", type=float, required=True,
+                    help="distance from camera to face in centimeters, run once per distance")
+parser.add_argument("--camera", type=int, default=2, help="camera number")
+args = parser.parse_args()
 # chose your camera number:
-cam_number =2
+cam_number =args.camera
 camera = cv2.VideoCapture(cam_number)
 starting_time =time.time()
 Frame_Counter= 0
 Cap_frame =0 
-Dir_name = "capture_images"
+# each distance gets its own folder capture_images/<distance>cm next to this script, where calibrate.py looks
+Known_distance = args.distance
+Dir_name = os.path.join(os.path.dirname(os.path.abspath(__file__)), "capture_images", f"{Known_distance:g}cm")
 number_image_captured =20
 capture_image=False
 while True:
@@ -17,7 +25,7 @@ while True:
     print(IsDirExist)
     # if there is no Directory named "capture_image", simply create it. using os 
     if not IsDirExist:
-        os.mkdir(Dir_name)
+        os.makedirs(Dir_name)
 
     Frame_Counter+=1
     # reading the frames from camera 
@@ -0,0 +1,67 @@
+"""
+Fit a camera's focal length on bursts of frames taken at several known distances,
+and save it to calibration/<camera>.json for the servers to load at startup.
+
+    python Capture_Reference_image/calibrate.py --camera default
+    python Capture_Reference_image/calibrate.py --camera front_door --burst 40=bursts/40cm --burst 80=far/
+
+Capture_Reference_Image.py --distance D saves each burst to capture_images/<D>cm/
+next to it. Without --burst every such folder is used. Keep the camera resolution
+the servers will use.
+"""
+import argparse
+import os
+import re
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core import KNOWN_WIDTH
+from distance_core.calibration import (CALIBRATION_DIR, burst_paths, burst_widths, calibration_from_widths,
+                                       save_calibration)
+
+CAPTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "capture_images")
+
+
+def find_bursts(args):
+    """
+    :return: {distance: frame paths} from --burst DISTANCE=FOLDER, or the <distance>cm folders of capture_images.
+    """
+    bursts = {}
+    for item in args.burst:
+        distance, _, directory = item.partition("=")
+        bursts[float(distance)] = burst_paths(directory)
+    if not bursts and os.path.isdir(CAPTURE_DIR):
+        for name in os.listdir(CAPTURE_DIR):
+            match = re.fullmatch(r"(\d+(?:\.\d+)?)cm", name)
+            if match:
+                bursts[float(match.group(1))] = burst_paths(os.path.join(CAPTURE_DIR, name))
+    return dict(sorted(bursts.items()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--camera", default="default", help="name of the calibration file")
+    parser.add_argument("--burst", action="append", default=[], metavar="DISTANCE=FOLDER",
+                        help="frames taken at DISTANCE cm, repeat for each distance")
+    parser.add_argument("--real-width", type=float, default=KNOWN_WIDTH, help="face width in cm")
+    parser.add_argument("--directory", default=CALIBRATION_DIR)
+    args = parser.parse_args()
+
+    bursts = find_bursts(args)
+    if not bursts:
+        sys.exit(f"[ERROR] No bursts given and no <distance>cm folders in {CAPTURE_DIR}")
+    if len(bursts) == 1:
+        print("[WARNING] Frames at a single distance, a few distances across the alert range fit better.")
+
+    widths, image_size = burst_widths(bursts)
+    calibration = calibration_from_widths(widths, image_size, args.camera, args.real_width)
+    print(f"{'distance':>9} {'frames':>7} {'faces':>6} {'width px':>9} {'estimated':>10} {'error':>7}")
+    for distance, found in widths.items():
+        estimated = calibration.focal_length * args.real_width / found
+        print(f"{distance:>9.1f} {len(bursts[distance]):>7} {len(found):>6} {np.mean(found):>9.1f} "
+              f"{np.mean(estimated):>10.1f} {np.mean(estimated) - distance:>+7.1f}")
+    print(f"[INFO] Focal length {calibration.focal_length:.1f} px at {calibration.image_size[0]}x{calibration.image_size[1]}, "
+          f"RMS error {calibration.rms_error:.2f} cm over {calibration.samples} faces")
+    print(f"[INFO] Saved {save_calibration(calibration, args.directory)}")
@@ -51,3 +51,36 @@ def fillPolyTrans(img, points, color, opacity, line_thickness=2):
     img = new_img
     cv.polylines(img, [list_to_np_array], True, color,line_thickness, cv.LINE_AA)
     return img
+
+def fillPolyTransInPlace(img, points, color, opacity, line_thickness=2):
+    """
+    Same drawing as fillPolyTrans, but img itself is modified: only the polygon's bounding
+    box is blended, through a scratch buffer reused between calls, instead of copying the
+    whole image every time. For frames the caller owns, e.g. slots of a SharedFrameRing.
+    @return: img, the same array.
+    """
+    list_to_np_array = np.array(points, dtype=np.int32)
+    img_h, img_w = img.shape[:2]
+    x, y, w, h = cv.boundingRect(list_to_np_array)
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, img_w), min(y + h, img_h)
+    if x1 > x0 and y1 > y0:
+        roi = img[y0:y1, x0:x1]
+        overlay = _overlay_buffer(roi)
+        cv.fillPoly(overlay, [list_to_np_array - (x0, y0)], color)
+        cv.addWeighted(overlay, opacity, roi, 1 - opacity, 0, dst=roi)
+    cv.polylines(img, [list_to_np_array], True, color,line_thickness, cv.LINE_AA)
+    return img
+
+_scratch = np.empty(0, dtype=np.uint8)
+
+def _overlay_buffer(roi):
+    """
+    Copy of roi in a module level buffer that only grows when a bigger region comes along.
+    """
+    global _scratch
+    if _scratch.size < roi.size or _scratch.dtype != roi.dtype:
+        _scratch = np.empty(roi.size, dtype=roi.dtype)
+    overlay = _scratch[:roi.size].reshape(roi.shape)
+    np.copyto(overlay, roi)
+    return overlay
@@ -12,15 +12,20 @@
 '''
 
 import cv2
-import time
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core import (VideoSource, ThreadedSource, face_data, distance_finder, speed_finder,
+                           RollingStats, reference_focal_length)
 # variables
 initialTime = 0
 initialDistance = 0
 changeInTime = 0
 changeInDistance = 0
 
-listDistance = []
-listSpeed = []
+# averages over the last 2 distances and 10 speeds, fixed memory however long it runs
+distanceWindow = RollingStats(2)
+speedWindow = RollingStats(10)
 
 # distance from camera to object(face) measured
 Known_distance = 76.2  # centimeter
@@ -31,7 +36,7 @@ GREEN = (0, 255, 0)
 RED = (0, 0, 255)
 WHITE = (255, 255, 255)
 fonts = cv2.FONT_HERSHEY_COMPLEX
-cap = cv2.VideoCapture(0)
+cap = ThreadedSource(VideoSource(0)).open()
 
 # cap.set(3, 640)
 # cap.set(4, 480)
@@ -39,88 +44,10 @@ cap = cv2.VideoCapture(0)
 # Define the codec and create VideoWriter object
 fourcc = cv2.VideoWriter_fourcc(*'XVID')
 Recorder = cv2.VideoWriter('distanceAndSpeed2.mp4', fourcc, 15.0, (640, 480))
-# face detector object
-face_detector = cv2.CascadeClassifier("haarcascade_frontalface_default.xml")
-# focal length finder function
-
-
-def FocalLength(measured_distance, real_width, width_in_rf_image):
-    '''
-This Function Calculate the Focal Length(distance between lens to CMOS sensor), it is simple constant we can find by using
-MEASURED_DISTACE, REAL_WIDTH(Actual width of object) and WIDTH_OF_OBJECT_IN_IMAGE
-:param1 Measure_Distance(int): It is distance measured from object to the Camera while Capturing Reference image
-
-:param2 Real_Width(int): It is Actual width of object, in real world (like My face width is = 14.3 centimeters)
-:param3 Width_In_Image(int): It is object width in the frame /image in our case in the reference image(found by Face detector)
-:retrun Focal_Length(Float):
-'''
-    focal_length = (width_in_rf_image * measured_distance) / real_width
-    return focal_length
-# distance estimation function
-
-
-def Distance_finder(Focal_Length, real_face_width, face_width_in_frame):
-    '''
-This Function simply Estimates the distance between object and camera using arguments(Focal_Length, Actual_object_width, Object_width_in_the_image)
-:param1 Focal_length(float): return by the Focal_Length_Finder function
-
-:param2 Real_Width(int): It is Actual width of object, in real world (like My face width is = 5.7 Inches)
-:param3 object_Width_Frame(int): width of object in the image(frame in our case, using Video feed)
-:return Distance(float) : distance Estimated
-
-'''
-    distance = (real_face_width * Focal_Length)/face_width_in_frame
-    return distance
-
-
-def face_data(image):
-    '''
-    This function Detect the face
-    :param Takes image as argument.
-    :returns face_width in the pixels
-    '''
-
-    face_width = 0
-    gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    faces = face_detector.detectMultiScale(gray_image, 1.3, 5)
-    for (x, y, h, w) in faces:
-        cv2.rectangle(image, (x, y), (x+w, y+h), WHITE, 1)
-        face_width = w
-
-    return face_width
-
-
-def speedFinder(coveredDistance, timeTaken):
-
-    speed = coveredDistance / timeTaken
-
-    return speed
-
-
-def averageFinder(completeList, averageOfItems):
-
-    # finding the length of list.
-    lengthOfList = len(completeList)
-
-    # calculating the number items to find the average of
-    selectedItems = lengthOfList - averageOfItems
-    # 10 -6 =4
-
-    # getting the list most recent items of list to find average of .
-    selectedItemsList = completeList[selectedItems:]
-
-    # finding the average .
-    average = sum(selectedItemsList) / len(selectedItemsList)
-
-    return average
-
 
 # reading reference image from directory
-ref_image = cv2.imread("Ref_image.png")
-
-ref_image_face_width = face_data(ref_image)
-Focal_length_found = FocalLength(
-    Known_distance, Known_width, ref_image_face_width)
+Focal_length_found, ref_image = reference_focal_length(
+    measured_distance=Known_distance, real_width=Known_width)
 print(Focal_length_found)
 # cv2.imshow("ref_image", ref_image)
 
@@ -131,10 +58,9 @@ while True:
     face_width_in_frame = face_data(frame)
     # finding the distance by calling function Distance
     if face_width_in_frame != 0:
-        Distance = Distance_finder(
+        Distance = distance_finder(
             Focal_length_found, Known_width, face_width_in_frame)
-        listDistance.append(Distance)
-        averageDistance = averageFinder(listDistance, 2)
+        averageDistance = distanceWindow.push(Distance).mean()
 
         # converting centimeters into meters
         distanceInMeters = averageDistance/100
@@ -145,14 +71,13 @@ while True:
 
             # if changeInDistance < 0:
             #     changeInDistance * -1
-            # finding change in time
-            changeInTime = time.time() - initialTime
+            # finding change in time between the two frames' capture times
+            changeInTime = cap.timestamp - initialTime
 
             # finding the sped
-            speed = speedFinder(
-                coveredDistance=changeInDistance, timeTaken=changeInTime)
-            listSpeed.append(speed)
-            averageSpeed = averageFinder(listSpeed, 10)
+            speed = speed_finder(
+                covered_distance=changeInDistance, time_taken=changeInTime)
+            averageSpeed = speedWindow.push(speed).mean()
             if averageSpeed < 0:
                 averageSpeed = averageSpeed * -1
             # filling the progressive line dependent on the speed.
@@ -171,7 +96,7 @@ while True:
 
         # inital distance and time
         initialDistance = distanceInMeters
-        initialTime = time.time()
+        initialTime = cap.timestamp
 
     # Drwaing Text on the screen
         cv2.line(frame, (45, 25), (255, 25), (255, 0, 255), 30)
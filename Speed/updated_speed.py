@@ -1,5 +1,11 @@
 import cv2
 import time
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core import VideoSource, ThreadedSource, detect_faces, reference_focal_length, overlays
+from distance_core.measurements import MeasurementWriter
+from distance_core.tracker import FaceTracker
 
 # variables
 # distance from camera to object(face) measured
@@ -28,56 +34,13 @@ fonts3 = cv2.FONT_HERSHEY_COMPLEX_SMALL
 fonts4 = cv2.FONT_HERSHEY_TRIPLEX
 # Camera Object
 capID = 0
-cap = cv2.VideoCapture(capID)  # Number According to your Camera
+cap = ThreadedSource(VideoSource(capID)).open()  # Number According to your Camera
 Distance_level = 0
-travedDistance = 0
-changeDistance = 0
-velocity = 0
 
 # Define the codec and create VideoWriter object
 fourcc = cv2.VideoWriter_fourcc(*'XVID')
 out = cv2.VideoWriter('output21.mp4', fourcc, 30.0, (640, 480))
 
-# face detector object
-face_detector = cv2.CascadeClassifier("../haarcascade_frontalface_default.xml")
-# focal length finder function
-
-
-def FocalLength(measured_distance, real_width, width_in_rf_image):
-    # Function Discrption (Doc String)
-    '''
-    This Function Calculate the Focal Length(distance between lens to CMOS sensor), it is simple constant we can find by using 
-    MEASURED_DISTACE, REAL_WIDTH(Actual width of object) and WIDTH_OF_OBJECT_IN_IMAGE 
-    :param1 Measure_Distance(int): It is distance measured from object to the Camera while Capturing Reference image
-
-    :param2 Real_Width(int): It is Actual width of object, in real world (like My face width is = 5.7 Inches)
-    :param3 Width_In_Image(int): It is object width in the frame /image in our case in the reference image(found by Face detector) 
-    :retrun Focal_Length(Float):
-    '''
-    focal_length = (width_in_rf_image * measured_distance) / real_width
-    return focal_length
-# distance estimation function
-
-
-def Distance_finder(Focal_Length, real_face_width, face_width_in_frame):
-    '''
-    This Function simply Estimates the distance between object and camera using arguments(Focal_Length, Actual_object_width, Object_width_in_the_image)
-    :param1 Focal_length(float): return by the Focal_Length_Finder function
-
-    :param2 Real_Width(int): It is Actual width of object, in real world (like My face width is = 5.7 Inches)
-    :param3 object_Width_Frame(int): width of object in the image(frame in our case, using Video feed)
-    :return Distance(float) : distance Estimated  
-
-    '''
-    distance = (real_face_width * Focal_Length)/face_width_in_frame
-    return distance
-
-
-def speedFinder(distance, takenTime):
-    speed = distance/takenTime
-    return speed
-
-
 # face detection Fauction
 
 def face_data(image, CallOut, Distance_level):
@@ -96,118 +59,67 @@ def face_data(image, CallOut, Distance_level):
     '''
 
     face_width = 0
-    face_x, face_y = 0, 0
     face_center_x = 0
     face_center_y = 0
-    gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    faces = face_detector.detectMultiScale(gray_image, 1.3, 5)
-    for (x, y, h, w) in faces:
-        line_thickness = 2
-        # print(len(faces))
-        LLV = int(h*0.12)
-        # print(LLV)
-
-        # cv2.rectangle(image, (x, y), (x+w, y+h), BLACK, 1)
-        cv2.line(image, (x, y+LLV), (x+w, y+LLV), (GREEN), line_thickness)
-        cv2.line(image, (x, y+h), (x+w, y+h), (GREEN), line_thickness)
-        cv2.line(image, (x, y+LLV), (x, y+LLV+LLV), (GREEN), line_thickness)
-        cv2.line(image, (x+w, y+LLV), (x+w, y+LLV+LLV),
-                 (GREEN), line_thickness)
-        cv2.line(image, (x, y+h), (x, y+h-LLV), (GREEN), line_thickness)
-        cv2.line(image, (x+w, y+h), (x+w, y+h-LLV), (GREEN), line_thickness)
+    faces = detect_faces(image)
+    for (x, y, w, h) in faces:
+        overlays.draw_face_corners(image, (x, y, w, h), GREEN)
 
         face_width = w
-        face_center = []
-        # Drwaing circle at the center of the face
         face_center_x = int(w/2)+x
         face_center_y = int(h/2)+y
-        if Distance_level < 10:
-            Distance_level = 10
 
-        # cv2.circle(image, (face_center_x, face_center_y),5, (255,0,255), 3 )
         if CallOut == True:
-            # cv2.line(image, (x,y), (face_center_x,face_center_y ), (155,155,155),1)
-            cv2.line(image, (x, y-11), (x+180, y-11), (ORANGE), 28)
-            cv2.line(image, (x, y-11), (x+180, y-11), (YELLOW), 20)
-            cv2.line(image, (x, y-11), (x+Distance_level, y-11), (GREEN), 18)
-
-            # cv2.circle(image, (face_center_x, face_center_y),2, (255,0,255), 1 )
-            # cv2.circle(image, (x, y),2, (255,0,255), 1 )
-
-        # face_x = x
-        # face_y = y
+            overlays.draw_distance_bar(image, (x, y, w, h), Distance_level)
 
     return face_width, faces, face_center_x, face_center_y
 
 
-def averageFinder(valuesList, numberElements):
-    sizeOfList = len(valuesList)
-    lastMostElement = sizeOfList - numberElements
-    lastPart = valuesList[lastMostElement:]
-    average = sum(lastPart)/(len(lastPart))
-    return average
-
-
 # reading reference image from directory
-ref_image = cv2.imread("../Ref_image.png")
-
-ref_image_face_width, _, _, _ = face_data(ref_image, False, Distance_level)
-Focal_length_found = FocalLength(
-    Known_distance, Known_width, ref_image_face_width)
+Focal_length_found, ref_image = reference_focal_length(
+    measured_distance=Known_distance, real_width=Known_width)
 print(Focal_length_found)
 
 cv2.imshow("ref_image", ref_image)
-speedList = []
-DistanceList = []
-averageSpeed = 0
-intialDisntace = 0
+# every face keeps its own id, Kalman-filtered distance and speed across frames
+tracker = FaceTracker(Focal_length_found, Known_width)
+# read it back with distance_core.measurements.MeasurementLog
+measurement_log = MeasurementWriter(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "speed_measurements.bin"), camera=str(capID))
 
 while True:
     _, frame = cap.read()
     # calling face_data function
     # Distance_leve =0
-    intialTime = time.time()
     face_width_in_frame, Faces, FC_X, FC_Y = face_data(
         frame, True, Distance_level)
-    # finding the distance by calling function Distance finder
-    for (face_x, face_y, face_w, face_h) in Faces:
-        if face_width_in_frame != 0:
-
-            Distance = Distance_finder(
-                Focal_length_found, Known_width, face_width_in_frame)
-            DistanceList.append(Distance)
-            avergDistnce = averageFinder(DistanceList, 6)
-            # print(avergDistnce)
-            roundedDistance = round((avergDistnce*0.0254), 2)
-            # Drwaing Text on the screen
-            Distance_level = int(Distance)
-            if intialDisntace != 0:
-
-                changeDistance = Distance - intialDisntace
-                distanceInMeters = changeDistance * 0.0254
-
-                velocity = speedFinder(distanceInMeters, changeInTime)
-
-                speedList.append(velocity)
-
-                averageSpeed = averageFinder(speedList, 6)
-            # intial Distance
-            intialDisntace = avergDistnce
-
-            changeInTime = time.time() - intialTime
-            # print(changeInTime)
-
-            cv2.line(frame, (25, 45), (180, 45), (ORANGE), 26)
-            cv2.line(frame, (25, 45), (180, 45), (GREEN), 20)
-            # cv2.line(image, (x, y-11), (x+180, y-11), (YELLOW), 20)
-            # cv2.line(image, (x, y-11), (x+Distance_level, y-11), (GREEN), 18)
-            if averageSpeed < 0:
-                averageSpeed = averageSpeed * -1
-            cv2.putText(
-                frame, f"Speed: {round(averageSpeed,2)} m/s", (30, 50), fonts, 0.5, BLACK, 2)
-
-            cv2.putText(frame, f"Distance {roundedDistance} meter",
-                        (face_x-6, face_y-6), fonts, 0.5, (BLACK), 2)
+    # capture time of the frame, so speeds don't depend on how long processing took
+    tracked = tracker.update(Faces, timestamp=cap.timestamp)
+    # logged in cm and cm/s like the other tools
+    measurement_log.append_batch(time.time(), tracked.boxes, tracked.distances * 2.54, tracked.speeds * 2.54,
+                                 face_ids=tracked.ids)
+    for (face_x, face_y, face_w, face_h), face_id, Distance, velocity in zip(
+            tracked.boxes, tracked.ids, tracked.distances, tracked.speeds):
+        roundedDistance = round((Distance*0.0254), 2)
+        # Drwaing Text on the screen
+        Distance_level = int(Distance)
+        speedInMeters = 0 if velocity != velocity else abs(velocity * 0.0254)
+        cv2.putText(frame, f"ID {face_id}: {round(speedInMeters, 2)} m/s",
+                    (face_x-6, face_y+face_h+18), fonts, 0.5, (BLACK), 2)
+        cv2.putText(frame, f"Distance {roundedDistance} meter",
+                    (face_x-6, face_y-6), fonts, 0.5, (BLACK), 2)
+
+    if len(tracked.ids):
+        # banner shows the nearest face
+        nearest = tracked.distances.argmin()
+        averageSpeed = tracked.speeds[nearest]
+        averageSpeed = 0 if averageSpeed != averageSpeed else abs(averageSpeed * 0.0254)
+        cv2.line(frame, (25, 45), (180, 45), (ORANGE), 26)
+        cv2.line(frame, (25, 45), (180, 45), (GREEN), 20)
+        # cv2.line(image, (x, y-11), (x+180, y-11), (YELLOW), 20)
+        # cv2.line(image, (x, y-11), (x+Distance_level, y-11), (GREEN), 18)
+        cv2.putText(
+            frame, f"Speed: {round(averageSpeed,2)} m/s", (30, 50), fonts, 0.5, BLACK, 2)
     cv2.imshow("frame", frame)
     out.write(frame)
 
@@ -215,5 +127,6 @@ while True:
         break
 
 cap.release()
+measurement_log.close()
 # out.release()
 cv2.destroyAllWindows()
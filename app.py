@@ -1,7 +1,13 @@
-from flask import Flask, render_template, Response
+from flask import Flask, render_template, Response, jsonify
 import cv2
+import threading
+import time
+from distance_core import VideoSource, ThreadedSource, FrameBroadcaster, JpegCache, mjpeg_part
+from distance_core.lazy import LazyResource
 
 app = Flask(__name__)
+# answers /health uptime, set as soon as the module is loaded
+started = time.monotonic()
 
 def get_camera_index():
     try:
@@ -17,33 +23,63 @@ def get_camera_index():
 # Initialize video capture with the selected camera index
 def initialize_camera():
     camera_index = get_camera_index()
-    cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)
+    cap = ThreadedSource(VideoSource(camera_index, cv2.CAP_DSHOW)).open()
     if not cap.isOpened():
         raise Exception(f"Failed to open camera {camera_index}.")
     return cap
 
-cap = initialize_camera()
+# opened by the warm-up or the first viewer, a missing camera no longer stops the server from starting
+camera = LazyResource(initialize_camera, "camera")
+
+# Single capture loop publishing to every /video_feed client, frames are encoded once
+broadcaster = FrameBroadcaster()
+jpeg_cache = JpegCache()
+capture_thread = None
+capture_thread_lock = threading.Lock()
 
 @app.route('/')
 def index():
     return render_template('index3.html')
 
+@app.route('/health')
+def health():
+    """
+    Answer at once, also while the camera is still opening.
+    """
+    return jsonify({"status": "ok", "uptime": round(time.monotonic() - started, 3), "camera": camera.stats()})
+
 @app.route('/video_feed')
 def video_feed():
     return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
-def generate_frames():
+def capture_loop():
+    try:
+        cap = camera.get()
+    except Exception as error:
+        print(f"[ERROR] {error}")
+        cap = None
     while True:
-        success, frame = cap.read()
+        success, frame = cap.read() if cap is not None else (False, None)
         if not success:
             print("[ERROR] Failed to read frame from camera.")
+            broadcaster.close()
             break
 
-        ret, buffer = cv2.imencode('.jpg', frame)
-        frame = buffer.tobytes()
+        broadcaster.publish(frame)
+
+def start_capture_thread():
+    global capture_thread
+    with capture_thread_lock:
+        if capture_thread is None or not capture_thread.is_alive():
+            broadcaster.reopen()
+            capture_thread = threading.Thread(target=capture_loop, name="capture-loop", daemon=True)
+            capture_thread.start()
 
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+def generate_frames():
+    start_capture_thread()
+    for sequence, frame in broadcaster.subscribe():
+        yield mjpeg_part(jpeg_cache.get(sequence, frame))
 
 if __name__ == '__main__':
+    camera.warm_up()
     app.run(host='0.0.0.0', port=5000)
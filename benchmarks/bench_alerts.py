@@ -0,0 +1,110 @@
+"""
+Frame-loop cost of raising alerts, AlertDispatcher against a thread per alert.
+
+    python benchmarks/bench_alerts.py --tracks 1 5 20 --seconds 5
+
+A simulated 30 fps loop has N faces in the alert range on every frame. Sinks are a
+webhook to a local stub server and a stand-in for speech that takes --speech-ms.
+Reported: time the loop spends per alert call, and how many alerts reach the sinks
+(the dispatcher rate-limits per track and coalesces alerts still waiting).
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core.alerts import AlertDispatcher, WebhookSink, alert_message
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    received = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        StubHandler.received += 1
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class SlowSpeech:
+    name = "speech"
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def send(self, alert):
+        time.sleep(self.seconds)
+
+
+def frame_loop(tracks, seconds, fps, alert):
+    costs = []
+    frames = int(seconds * fps)
+    start = time.perf_counter()
+    for frame in range(frames):
+        for track in range(tracks):
+            call_start = time.perf_counter()
+            alert(track, 60.0 + track)
+            costs.append(time.perf_counter() - call_start)
+        delay = start + (frame + 1) / fps - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    return np.array(costs) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--speech-ms", type=float, default=400.0)
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between alerts of one track")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/alert"
+    sinks = [WebhookSink(url), SlowSpeech(args.speech_ms / 1000)]
+
+    print(f"{'tracks':>7} {'method':>11} {'p50 us':>9} {'p99 us':>9} {'max us':>9} {'delivered':>10} {'threads':>8}")
+    for tracks in args.tracks:
+        # legacy: every alert past the global interval starts a thread running the sinks
+        last = [0.0]
+        started = []
+
+        def legacy(track, distance):
+            now = time.monotonic()
+            if now - last[0] > args.interval:
+                last[0] = now
+                thread = threading.Thread(target=lambda: [sink.send(None) if isinstance(sink, SlowSpeech) else None
+                                                          for sink in sinks])
+                thread.start()
+                started.append(thread)
+
+        costs = frame_loop(tracks, args.seconds, args.fps, legacy)
+        for thread in started:
+            thread.join()
+        print(f"{tracks:>7} {'thread':>11} {np.percentile(costs, 50):>9.1f} {np.percentile(costs, 99):>9.1f} "
+              f"{costs.max():>9.1f} {len(started):>10} {len(started):>8}")
+
+        StubHandler.received = 0
+        dispatcher = AlertDispatcher(sinks, min_interval=args.interval)
+        costs = frame_loop(tracks, args.seconds, args.fps,
+                           lambda track, distance: dispatcher.submit("bench", track, distance, alert_message(distance)))
+        dispatcher.close(timeout=60)
+        stats = dispatcher.stats()
+        print(f"{tracks:>7} {'dispatcher':>11} {np.percentile(costs, 50):>9.1f} {np.percentile(costs, 99):>9.1f} "
+              f"{costs.max():>9.1f} {stats['delivered']:>10} {1:>8}   "
+              f"(rate limited {stats['rate_limited']}, coalesced {stats['coalesced']}, webhook got {StubHandler.received})")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Cost of an alert phrase: synthesized on every alert against pre-rendered by AudioCache.
+
+    python benchmarks/bench_audio_cache.py --alerts 200 --renderer auto
+
+Alerts at random distances in the alert range ask for their phrase. "synthesize"
+renders each phrase to one file and reads it back, like the old temp.mp3 path;
+"cached" quantizes to --step cm and serves the phrase from memory after the range
+was pre-rendered. Playback itself is left out, it costs the same either way.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core.alerts import alert_message
+from distance_core.audio_cache import RENDERERS, AudioCache, render_tone
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alerts", type=int, default=200)
+    parser.add_argument("--renderer", default="auto", help="sapi, pyttsx3, tone or auto")
+    parser.add_argument("--step", type=int, default=5)
+    parser.add_argument("--min", type=float, default=50)
+    parser.add_argument("--max", type=float, default=70)
+    args = parser.parse_args()
+
+    distances = np.random.default_rng(0).uniform(args.min, args.max, args.alerts)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = AudioCache(directory, step=args.step, renderer=args.renderer)
+        start = time.perf_counter()
+        cache.prerender(args.min, args.max)
+        prerender = time.perf_counter() - start
+        start = time.perf_counter()
+        for distance in distances:
+            cache.get(distance)
+        cached = (time.perf_counter() - start) / args.alerts
+        stats = cache.stats()
+
+        # the same renderer, once per alert with the unrounded distance
+        path = os.path.join(directory, "temp.wav")
+        start = time.perf_counter()
+        for distance in distances:
+            text = alert_message(distance)
+            if stats["renderer"] == "tone":
+                render_tone(text, path, distance)
+            else:
+                RENDERERS[stats["renderer"]](text, path)
+            with open(path, "rb") as file:
+                file.read()
+        synthesize = (time.perf_counter() - start) / args.alerts
+
+    print(f"renderer {stats['renderer']}, {stats['entries']} phrases pre-rendered in {prerender * 1000:.1f} ms")
+    print(f"{'synthesize':>12} {synthesize * 1000:>10.3f} ms per alert")
+    print(f"{'cached':>12} {cached * 1000:>10.3f} ms per alert ({stats['hits']} memory hits)")
+
+
+if __name__ == "__main__":
+    main()
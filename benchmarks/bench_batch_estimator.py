@@ -0,0 +1,56 @@
+"""
+Compare the vectorized estimate_batch() with the per-face loop it replaces.
+
+    python benchmarks/bench_batch_estimator.py --faces 1 8 32 128
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core import KNOWN_WIDTH
+from distance_core.batch import estimate_batch, estimate_batch_loop
+
+
+def random_faces(count, rng):
+    xy = rng.integers(0, 500, size=(count, 2))
+    size = rng.integers(40, 200, size=(count, 1))
+    return np.hstack([xy, size, size]).astype(np.int32)
+
+
+def time_call(function, repeats, *args):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function(*args)
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faces", type=int, nargs="+", default=[1, 4, 16, 64, 256])
+    parser.add_argument("--repeats", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    focal_length_found = 970.0
+    print(f"{'faces':>6} {'loop us':>10} {'vector us':>10} {'speedup':>8}")
+    for count in args.faces:
+        faces = random_faces(count, rng)
+        previous = rng.uniform(30, 300, size=count)
+        loop_args = (faces, focal_length_found, KNOWN_WIDTH, previous, 1 / 30)
+
+        reference = estimate_batch_loop(*loop_args)
+        vectorized = estimate_batch(*loop_args)
+        for expected, actual in zip(reference, vectorized):
+            np.testing.assert_allclose(actual, expected)
+
+        loop_time = time_call(estimate_batch_loop, args.repeats, *loop_args)
+        vector_time = time_call(estimate_batch, args.repeats, *loop_args)
+        print(f"{count:>6} {loop_time * 1e6:>10.1f} {vector_time * 1e6:>10.1f} {loop_time / vector_time:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Per-frame allocations of a capture -> grayscale -> overlay -> encode pipeline, with
+a new array at every handoff versus frames kept in a SharedFrameRing.
+
+    python benchmarks/bench_frame_ring.py --video door_cam.mp4
+    python benchmarks/bench_frame_ring.py            # synthetic clip from Ref_image.png
+
+Allocated bytes are measured with tracemalloc, which sees NumPy and OpenCV output
+buffers. The JPEG bytes themselves are the output and are allocated in both modes.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Raspberry_pi"))
+from distance_core import SharedFrameRing, VideoSource
+from AiPhile import fillPolyTransInPlace
+from synthetic_clips import approaching_face_clip, write_clip
+
+BANNER = [(20, 20), (320, 20), (320, 70), (20, 70)]
+
+
+def overlay_with_copy(frame):
+    # like fillPolyTrans: full-frame copy and a new blended frame per call
+    overlay = frame.copy()
+    cv2.fillPoly(overlay, [np.array(BANNER, dtype=np.int32)], (0, 255, 0))
+    return cv2.addWeighted(overlay, 0.4, frame, 0.6, 0)
+
+
+def run_copying(path, limit, on_frame):
+    frames = 0
+    with VideoSource(path) as capture:
+        while frames < limit:
+            success, frame = capture.read()
+            if not success:
+                break
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            gray = gray.copy()  # handed to the next stage
+            frame = overlay_with_copy(frame.copy())
+            cv2.imencode(".jpg", frame)
+            frames += 1
+            on_frame()
+    return frames, None
+
+
+def run_ring(path, limit, on_frame):
+    frames = 0
+    with VideoSource(path) as capture:
+        success, first = capture.read()
+        ring = SharedFrameRing(2, first.shape)
+        gray_ring = SharedFrameRing(2, first.shape[:2])
+        while success and frames < limit:
+            slot = ring.acquire()
+            success, frame = ring.read_into(slot, capture)
+            if success:
+                gray_slot = gray_ring.acquire()
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray_ring.array(gray_slot))
+                fillPolyTransInPlace(ring.array(slot), BANNER, (0, 255, 0), 0.4)
+                cv2.imencode(".jpg", ring.array(slot))
+                gray_ring.release(gray_slot)
+                frames += 1
+                on_frame()
+            ring.release(slot)
+        stats = ring.stats()
+        ring.close()
+        gray_ring.close()
+    return frames, stats
+
+
+def measure(run, path, limit):
+    """
+    :return: fps, mean bytes allocated on top of the live heap per frame, ring counters.
+    """
+    per_frame = []
+
+    def on_frame():
+        current, peak = tracemalloc.get_traced_memory()
+        per_frame.append(peak - current)
+        tracemalloc.reset_peak()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    frames, stats = run(path, limit, on_frame)
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    # the first frame includes one-time buffers (ring, decoder, overlay scratch)
+    return frames / elapsed, np.mean(per_frame[1:]), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", help="recorded clip, synthetic clip when omitted")
+    parser.add_argument("--max-frames", type=int, default=150)
+    args = parser.parse_args()
+
+    path = args.video
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), "synthetic_approach.mp4")
+        write_clip(path, approaching_face_clip(), fps=15.0)
+
+    print(f"{'mode':>8} {'fps':>8} {'KB allocated / frame':>21}")
+    for name, run in (("copying", run_copying), ("ring", run_ring)):
+        fps, allocated, stats = measure(run, path, args.max_frames)
+        print(f"{name:>8} {fps:>8.1f} {allocated / 1e3:>21.1f}")
+        if stats is not None:
+            print(f"[INFO] ring counters: {stats}")
+
+
+if __name__ == "__main__":
+    main()
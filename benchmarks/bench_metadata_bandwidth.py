@@ -0,0 +1,53 @@
+"""
+Bytes per frame a viewer downloads: annotated MJPEG against the /measurements
+Server-Sent Events stream, on a synthetic clip.
+
+    python benchmarks/bench_metadata_bandwidth.py --frames 150 --fps 15
+
+The MJPEG parts are encoded like /video_feed (OpenCV default quality), the events
+like /measurements in flask_server.py, from the same detections.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core import JpegCache, RoiDetector, mjpeg_part, overlays, reference_focal_length, sse_event
+from distance_core.tracker import FaceTracker, face_records
+from synthetic_clips import approaching_face_clip
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--fps", type=float, default=15.0)
+    args = parser.parse_args()
+
+    focal_length, _ = reference_focal_length()
+    detector = RoiDetector()
+    tracker = FaceTracker(focal_length)
+    cache = JpegCache()
+    video_bytes, event_bytes = [], []
+    for index, (frame, _) in enumerate(approaching_face_clip(args.frames)):
+        tracked = tracker.update(detector.update(frame), timestamp=index / args.fps)
+        event = sse_event({"time": round(time.time(), 3), "width": frame.shape[1], "height": frame.shape[0],
+                           "faces": face_records(tracked), "alert": False, "alert_distance_min": 50,
+                           "alert_distance_max": 70, "frame": index + 1})
+        for face, distance in zip(tracked.boxes, tracked.distances):
+            overlays.draw_face_box(frame, face)
+            overlays.draw_distance_text(frame, distance, (int(face[0]), max(int(face[1]) - 6, 12)), scaling=0.5)
+        video_bytes.append(len(mjpeg_part(cache.get(index + 1, frame))))
+        event_bytes.append(len(event))
+
+    video, events = np.mean(video_bytes), np.mean(event_bytes)
+    print(f"{'stream':>14} {'bytes / frame':>14} {'kbit/s at ' + str(args.fps) + ' fps':>20}")
+    print(f"{'mjpeg':>14} {video:>14.0f} {video * 8 * args.fps / 1000:>20.1f}")
+    print(f"{'measurements':>14} {events:>14.0f} {events * 8 * args.fps / 1000:>20.1f}")
+    print(f"\nmeasurements only: {video / events:.0f}x less per frame")
+
+
+if __name__ == "__main__":
+    main()
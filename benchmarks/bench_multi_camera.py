@@ -0,0 +1,63 @@
+"""
+Multi-camera scaling benchmark: local video files stand in for cameras (looped and
+played back at their own frame rate), and CameraManager processes them all on one
+shared worker pool.
+
+    python benchmarks/bench_multi_camera.py --video lobby.mp4 door.mp4 --cameras 1 8 16 32
+    python benchmarks/bench_multi_camera.py            # synthetic clip from Ref_image.png
+
+A camera keeps up when its processed fps matches the clip fps; the rest are dropped
+(newest-frame-wins), which is what a live deployment would do under the same load.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core import reference_focal_length
+from distance_core.multi_camera import CameraManager
+from synthetic_clips import approaching_face_clip, write_clip
+
+
+def run(videos, cameras, workers, duration, focal_length_found, realtime):
+    manager = CameraManager(focal_length_found, workers=workers)
+    for index in range(cameras):
+        camera = manager.add_camera(f"cam{index}", videos[index % len(videos)], loop=True, realtime=realtime)
+        camera.on_alert = lambda camera, distance: None
+    time.sleep(duration)
+    stats = manager.stats()["cameras"]
+    manager.shutdown()
+    processed = [camera["frames_processed"] / duration for camera in stats.values()]
+    captured = sum(camera["capture"]["captured"] for camera in stats.values())
+    dropped = sum(camera["capture"]["dropped"] for camera in stats.values())
+    return sum(processed), min(processed), dropped / captured if captured else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", nargs="*", default=[], help="clips used as cameras, synthetic clip when omitted")
+    parser.add_argument("--cameras", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--workers", type=int, nargs="+", default=[None], help="pool sizes, default CPU count")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per configuration")
+    parser.add_argument("--no-realtime", action="store_true", help="read files as fast as possible")
+    args = parser.parse_args()
+
+    videos = args.video
+    if not videos:
+        path = os.path.join(tempfile.gettempdir(), "synthetic_approach.mp4")
+        write_clip(path, approaching_face_clip(), fps=15.0)
+        videos = [path]
+
+    focal_length_found, _ = reference_focal_length()
+    print(f"{'cameras':>8} {'workers':>8} {'total fps':>10} {'min cam fps':>12} {'dropped %':>10}")
+    for workers in args.workers:
+        for cameras in args.cameras:
+            total, slowest, dropped = run(videos, cameras, workers, args.duration, focal_length_found,
+                                          not args.no_realtime)
+            print(f"{cameras:>8} {workers or os.cpu_count():>8} {total:>10.1f} {slowest:>12.1f} {dropped * 100:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Scaling of DetectionPool with the number of worker processes, against detecting
+in the calling process.
+
+    python benchmarks/bench_process_pool.py --video door_cam.mp4 --workers 1 2 4 8
+    python benchmarks/bench_process_pool.py            # synthetic clip, 1..CPU count workers
+
+Frames are decoded up front; the timed part is grayscale conversion into shared
+memory, detection and collecting the results in order. The last column checks
+that the pool returns the same distances as the in-process run.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core import DetectionPool, detect_faces, reference_focal_length
+from bench_skip_detection import load_frames, main_face_distance, run
+from synthetic_clips import approaching_face_clip
+
+
+def run_pool(frames, workers, focal_length_found):
+    with DetectionPool(workers=workers) as pool:
+        pool.warm_up()
+        distances = np.full(len(frames), np.nan)
+        start = time.perf_counter()
+        for index, (_, faces) in enumerate(pool.map(frames)):
+            distances[index] = main_face_distance(faces, focal_length_found)
+        elapsed = time.perf_counter() - start
+    return len(frames) / elapsed, distances
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", help="recorded clip, synthetic clip when omitted")
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="pool sizes, default 1..CPU count")
+    parser.add_argument("--max-frames", type=int, default=300)
+    args = parser.parse_args()
+
+    focal_length_found, _ = reference_focal_length()
+    if args.video:
+        frames = load_frames(args.video, args.max_frames)
+    else:
+        frames = [frame for frame, _ in approaching_face_clip(frames=args.max_frames)]
+    worker_counts = args.workers or list(range(1, (os.cpu_count() or 1) + 1))
+
+    inline_fps, inline = run(frames, detect_faces, focal_length_found)
+    print(f"[INFO] {len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'fps':>8} {'speedup':>8} {'same result':>12}")
+    print(f"{'inline':>8} {inline_fps:>8.1f} {1.0:>8.2f} {'-':>12}")
+    for workers in worker_counts:
+        fps, distances = run_pool(frames, workers, focal_length_found)
+        same = np.allclose(distances, inline, equal_nan=True)
+        print(f"{workers:>8} {fps:>8.1f} {fps / inline_fps:>8.2f} {str(same):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Per-frame detection cost of RoiDetector (search around previous faces, periodic
+full scans) compared with a full-frame scan on every frame.
+
+    python benchmarks/bench_roi_detection.py --video door_cam.mp4 --full-scan-every 10 30
+    python benchmarks/bench_roi_detection.py            # synthetic clip from Ref_image.png
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core import detect_faces, reference_focal_length
+from distance_core.roi_detector import RoiDetector
+from bench_skip_detection import load_frames, run
+from synthetic_clips import approaching_face_clip
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", nargs="*", default=[], help="recorded clips, synthetic clip when omitted")
+    parser.add_argument("--full-scan-every", type=int, nargs="+", default=[5, 15, 30])
+    parser.add_argument("--max-frames", type=int, default=600)
+    args = parser.parse_args()
+
+    focal_length_found, _ = reference_focal_length()
+    clips = [(path, load_frames(path, args.max_frames)) for path in args.video]
+    if not clips:
+        clips.append(("synthetic", [frame for frame, _ in approaching_face_clip()]))
+
+    for name, frames in clips:
+        full_fps, full = run(frames, detect_faces, focal_length_found)
+        print(f"\n[INFO] {name}: {len(frames)} frames")
+        print(f"{'mode':>14} {'fps':>8} {'speedup':>8} {'scanned %':>10} {'misses':>7} {'MAE vs full':>12}")
+        print(f"{'full':>14} {full_fps:>8.1f} {1.0:>8.2f} {100.0:>10.1f} {0:>7} {0.0:>12.2f}")
+        for every in args.full_scan_every:
+            detector = RoiDetector(full_scan_every=every)
+            fps, distances = run(frames, detector.update, focal_length_found)
+            stats = detector.stats()
+            both = ~np.isnan(distances) & ~np.isnan(full)
+            mae = np.mean(np.abs(distances[both] - full[both])) if both.any() else np.nan
+            print(f"{'roi, full/' + str(every):>14} {fps:>8.1f} {fps / full_fps:>8.2f} "
+                  f"{stats['scanned_fraction'] * 100:>10.1f} {stats['misses']:>7} {mae:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Throughput gained and distance accuracy lost by SkipFrameDetector compared with
+running the cascade on every frame.
+
+    python benchmarks/bench_skip_detection.py --video door_cam.mp4 --every 2 5 10
+    python benchmarks/bench_skip_detection.py            # synthetic clip from Ref_image.png
+
+Frames are decoded up front so only detection/tracking time is measured.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core import KNOWN_WIDTH, detect_faces, reference_focal_length
+from distance_core.batch import estimate_batch
+from distance_core.skip_detector import SkipFrameDetector
+from synthetic_clips import approaching_face_clip
+
+
+def load_frames(path, limit):
+    frames = []
+    cap = cv2.VideoCapture(path)
+    while len(frames) < limit:
+        success, frame = cap.read()
+        if not success:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def main_face_distance(faces, focal_length_found):
+    """
+    Distance of the largest face, NaN when there is none.
+    """
+    if len(faces) == 0:
+        return np.nan
+    faces = np.asarray(faces).reshape(-1, 4)
+    largest = faces[np.argmax(faces[:, 2])]
+    return estimate_batch(largest[None], focal_length_found, KNOWN_WIDTH).distances[0]
+
+
+def run(frames, detect, focal_length_found):
+    distances = np.full(len(frames), np.nan)
+    start = time.perf_counter()
+    for index, frame in enumerate(frames):
+        distances[index] = main_face_distance(detect(frame), focal_length_found)
+    elapsed = time.perf_counter() - start
+    return len(frames) / elapsed, distances
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", nargs="*", default=[], help="recorded clips, synthetic clip when omitted")
+    parser.add_argument("--every", type=int, nargs="+", default=[2, 5, 10])
+    parser.add_argument("--tracker", default="flow")
+    parser.add_argument("--max-frames", type=int, default=600)
+    args = parser.parse_args()
+
+    focal_length_found, _ = reference_focal_length()
+    clips = []
+    if args.video:
+        for path in args.video:
+            clips.append((path, load_frames(path, args.max_frames), None))
+    else:
+        frames, truth = zip(*approaching_face_clip())
+        clips.append(("synthetic", list(frames), np.array(truth)))
+
+    for name, frames, truth in clips:
+        full_fps, full = run(frames, detect_faces, focal_length_found)
+        print(f"\n[INFO] {name}: {len(frames)} frames")
+        print(f"{'mode':>12} {'fps':>8} {'speedup':>8} {'det %':>6} {'MAE vs full':>12} {'MAE vs truth':>13}")
+        rows = [("full", full_fps, full, 1.0)]
+        for every in args.every:
+            skip = SkipFrameDetector(detect_every=every, tracker=args.tracker)
+            fps, distances = run(frames, skip.update, focal_length_found)
+            rows.append((f"every {every}", fps, distances, skip.stats()["detection_ratio"]))
+        for mode, fps, distances, ratio in rows:
+            both = ~np.isnan(distances) & ~np.isnan(full)
+            mae_full = np.mean(np.abs(distances[both] - full[both])) if both.any() else np.nan
+            mae_truth = np.nan
+            if truth is not None:
+                found = ~np.isnan(distances)
+                mae_truth = np.mean(np.abs(distances[found] - truth[found])) if found.any() else np.nan
+            print(f"{mode:>12} {fps:>8.1f} {fps / full_fps:>8.2f} {ratio * 100:>6.1f} {mae_full:>12.2f} {mae_truth:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
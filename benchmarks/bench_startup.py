@@ -0,0 +1,85 @@
+"""
+Startup time of a server script: how long after the process starts /health answers,
+and how long until its lazily opened camera is ready.
+
+    python benchmarks/bench_startup.py --script flask_server.py --runs 5
+
+Each run starts the script in a fresh process and polls --url every few milliseconds.
+Reported per run: the module import time (measured in a separate process, without
+running the server), the time to the first /health answer and, when the server
+reports one, the time until its camera state is no longer "idle" or "starting".
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def import_time(script):
+    module = os.path.splitext(os.path.basename(script))[0]
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True, text=True, timeout=60)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def poll(url, timeout=0.2):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return json.loads(response.read())
+    except (OSError, ValueError):
+        return None
+
+
+def run_once(script, url, deadline, interval):
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, script], cwd=REPO_DIR,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    first_answer = camera_done = None
+    try:
+        while time.perf_counter() - start < deadline:
+            health = poll(url)
+            if health is not None:
+                elapsed = time.perf_counter() - start
+                if first_answer is None:
+                    first_answer = elapsed
+                state = health.get("camera", {}).get("state")
+                if state not in ("idle", "starting"):
+                    camera_done = elapsed
+                    break
+            elif process.poll() is not None:
+                break
+            time.sleep(interval)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return first_answer, camera_done
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--script", default="flask_server.py")
+    parser.add_argument("--url", default="http://127.0.0.1:5000/health")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--deadline", type=float, default=30.0, help="seconds to wait for the camera")
+    parser.add_argument("--interval", type=float, default=0.005, help="seconds between polls")
+    args = parser.parse_args()
+
+    imports = [import_time(args.script) for _ in range(args.runs)]
+    print(f"{args.script}: import {np.median(imports) * 1000:.0f} ms (median of {args.runs})")
+    print(f"{'run':>4} {'first /health ms':>17} {'camera done ms':>15}")
+    for run in range(args.runs):
+        first_answer, camera_done = run_once(args.script, args.url, args.deadline, args.interval)
+        first = f"{first_answer * 1000:.0f}" if first_answer is not None else "never"
+        done = f"{camera_done * 1000:.0f}" if camera_done is not None else "-"
+        print(f"{run + 1:>4} {first:>17} {done:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Cost per frame and identity switches of FaceTracker with many faces.
+
+    python benchmarks/bench_tracker.py --faces 1 10 50 100 --matcher greedy hungarian
+
+Synthetic faces walk in straight lines with jittered boxes and occasional missed
+detections; detections are shuffled every frame so ids can only come from tracking.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core.tracker import FaceTracker, hungarian_available
+
+
+def scene(faces, frames, miss_rate=0.05, seed=0):
+    """
+    :return: list of (boxes, true face index per box) per frame.
+    """
+    rng = np.random.default_rng(seed)
+    # faces on a grid so they don't start on top of each other, 1920x1080 canvas
+    columns = int(np.ceil(np.sqrt(faces)))
+    cell = 1800 / columns
+    start = np.stack([(np.arange(faces) % columns) * cell + 40, (np.arange(faces) // columns) * cell * 0.55 + 40], 1)
+    velocity = rng.uniform(-2, 2, (faces, 2))
+    width = rng.uniform(40, 0.6 * cell, faces)
+    growth = rng.uniform(0, 0.3, faces)
+    result = []
+    for frame in range(frames):
+        w = width + growth * frame
+        xy = start + velocity * frame + rng.normal(0, 1.5, (faces, 2))
+        boxes = np.column_stack([xy, w, w]).round()
+        seen = np.flatnonzero(rng.random(faces) > miss_rate)
+        rng.shuffle(seen)
+        result.append((boxes[seen], seen))
+    return result
+
+
+def run(frames, matcher, max_tracks):
+    tracker = FaceTracker(969.8, max_tracks=max_tracks, matcher=matcher)
+    owner = {}
+    switches = 0
+    for index, (boxes, truth) in enumerate(frames):
+        tracked = tracker.update(boxes, timestamp=index / 15)
+        for track_id, face in zip(tracked.ids, truth):
+            if owner.setdefault(face, track_id) != track_id:
+                switches += 1
+                owner[face] = track_id
+    return tracker.stats(), switches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faces", type=int, nargs="+", default=[1, 10, 30, 60, 100])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--matcher", nargs="+", default=["greedy"] + (["hungarian"] if hungarian_available() else []))
+    args = parser.parse_args()
+
+    print(f"{'faces':>6} {'matcher':>10} {'ms / frame':>11} {'us / face':>10} {'id switches':>12}")
+    for faces in args.faces:
+        frames = scene(faces, args.frames)
+        for matcher in args.matcher:
+            stats, switches = run(frames, matcher, max_tracks=max(64, 2 * faces))
+            print(f"{faces:>6} {matcher:>10} {stats['mean_cost_ms']:>11.3f} "
+                  f"{stats['mean_cost_ms'] * 1000 / faces:>10.1f} {switches:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Calibration check for downscaled detection: distance error and detection time at
+each detection scale, measured on Ref_image.png (face at KNOWN_DISTANCE) resized to
+simulate higher-resolution cameras.
+
+    python benchmarks/check_detection_scale.py --scales 1 0.5 0.25 --resolutions 1 2 3
+
+The focal length is always taken from a full-scale detection at the camera's own
+resolution, as a calibration would be, so the error shown is only what downscaling costs.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core import KNOWN_DISTANCE, KNOWN_WIDTH, REF_IMAGE, detect_faces, distance_finder, focal_length
+
+
+def largest_face_width(image, detection_scale, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        faces = detect_faces(image, detection_scale=detection_scale)
+    elapsed = (time.perf_counter() - start) / repeats
+    if len(faces) == 0:
+        return 0, elapsed
+    return max(int(face[2]) for face in faces), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.5, 0.25])
+    parser.add_argument("--resolutions", type=float, nargs="+", default=[1.0, 2.0, 3.0],
+                        help="multiples of Ref_image.png resolution (640x480)")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    ref_image = cv2.imread(REF_IMAGE)
+    print(f"{'resolution':>11} {'scale':>6} {'width px':>9} {'distance':>9} {'error %':>8} {'ms':>8}")
+    for multiple in args.resolutions:
+        image = cv2.resize(ref_image, None, fx=multiple, fy=multiple, interpolation=cv2.INTER_CUBIC)
+        height, width = image.shape[:2]
+        full_width, _ = largest_face_width(image, 1.0, 1)
+        if full_width == 0:
+            print(f"{width}x{height}: no face found at full scale")
+            continue
+        focal_length_found = focal_length(KNOWN_DISTANCE, KNOWN_WIDTH, full_width)
+        for scale in args.scales:
+            face_width, elapsed = largest_face_width(image, scale, args.repeats)
+            if face_width == 0:
+                print(f"{width}x{height:<5} {scale:>6} {'missed':>9}")
+                continue
+            distance = distance_finder(focal_length_found, KNOWN_WIDTH, face_width)
+            error = (distance - KNOWN_DISTANCE) / KNOWN_DISTANCE * 100
+            print(f"{f'{width}x{height}':>11} {scale:>6} {face_width:>9} {distance:>9.2f} {error:>8.2f} {elapsed * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
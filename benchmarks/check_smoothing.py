@@ -0,0 +1,88 @@
+"""
+Accuracy and cost of the smoothing options on a noisy, known approach.
+
+    python benchmarks/check_smoothing.py --faces 8 --frames 20000
+
+A face walks towards the camera at a known speed; distances get Gaussian noise like
+the per-frame estimates do. Speeds from the window/EMA smoothers are differences of
+consecutive smoothed distances, the Kalman filter estimates velocity directly.
+The last table compares per-frame cost against average_finder() over a list that
+keeps growing, as the speed scripts used to do.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core import average_finder
+from distance_core.smoothing import Ema, KalmanFilter, RollingStats
+
+
+def trajectory(frames, faces, fps, noise, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames)[:, None] / fps
+    speeds = rng.uniform(-60, -20, faces)           # cm/s, approaching
+    start = rng.uniform(250, 400, faces)
+    truth = start + t * speeds
+    return truth, truth + rng.normal(0, noise, truth.shape), speeds
+
+
+def evaluate(name, smoother, measured, truth, speeds, fps):
+    dt = 1 / fps
+    distances = np.empty_like(measured)
+    velocities = np.empty_like(measured)
+    previous = None
+    for index, values in enumerate(measured):
+        if isinstance(smoother, KalmanFilter):
+            smoother.push(values, dt)
+            distances[index] = smoother.distance()
+            velocities[index] = smoother.velocity()
+        else:
+            smoother.push(values)
+            distances[index] = smoother.median() if name == "median" else smoother.mean()
+            velocities[index] = np.nan if previous is None else (distances[index] - previous) / dt
+            previous = distances[index]
+    settled = slice(len(measured) // 10, None)
+    distance_error = np.nanmean(np.abs(distances[settled] - truth[settled]))
+    speed_error = np.nanmean(np.abs(velocities[settled] - speeds))
+    print(f"{name:>10} {distance_error:>14.2f} {speed_error:>14.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faces", type=int, default=4)
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--noise", type=float, default=3.0, help="cm, standard deviation of one estimate")
+    args = parser.parse_args()
+
+    truth, measured, speeds = trajectory(args.frames, args.faces, args.fps, args.noise)
+    print(f"{'smoother':>10} {'distance MAE':>14} {'speed MAE':>14}   (cm, cm/s)")
+    evaluate("raw", RollingStats(1, args.faces), measured, truth, speeds, args.fps)
+    evaluate("mean 6", RollingStats(6, args.faces), measured, truth, speeds, args.fps)
+    evaluate("median", RollingStats(6, args.faces), measured, truth, speeds, args.fps)
+    evaluate("ema 0.3", Ema(0.3, args.faces), measured, truth, speeds, args.fps)
+    evaluate("kalman", KalmanFilter(series=args.faces), measured, truth, speeds, args.fps)
+
+    values = measured[:, 0]
+    history = []
+    start = time.perf_counter()
+    for value in values:
+        history.append(value)
+        average_finder(history, 6)
+    list_time = (time.perf_counter() - start) / len(values)
+    rolling = RollingStats(6)
+    start = time.perf_counter()
+    for value in values:
+        rolling.push(value).mean()
+    rolling_time = (time.perf_counter() - start) / len(values)
+    print(f"\n{'per frame':>10} {'us':>8} {'memory':>12}")
+    print(f"{'list':>10} {list_time * 1e6:>8.2f} {len(history) * 8:>10} B+")
+    print(f"{'rolling':>10} {rolling_time * 1e6:>8.2f} {rolling.window * 8:>10} B")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Speed accuracy with capture timestamps against the processing clock, on a synthetic
+clip whose face approaches at a known constant speed.
+
+    python benchmarks/check_speed_timestamps.py --frames 60 --fps 15
+
+Scenarios:
+  file        every frame of a file, processing slowed down by a random delay
+  file-drops  a file with a share of the frames dropped before detection
+  live        the file played in real time behind ThreadedSource with a slow, uneven
+              consumer, so the capture thread drops frames like a busy camera
+
+"capture" feeds FaceTracker the frame's capture time (VideoSource.timestamp from
+CAP_PROP_POS_MSEC, ThreadedSource.timestamp from the capture thread's clock),
+"processing" lets it read the clock when the frame is processed.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core import KNOWN_DISTANCE, KNOWN_WIDTH, REF_IMAGE, ThreadedSource, VideoSource, detect_faces
+from distance_core import reference_focal_length
+from distance_core.tracker import FaceTracker
+from synthetic_clips import approaching_face_clip, write_clip
+
+
+def frames_of(scenario, path, drop_rate, rng):
+    """
+    Yield (frame, capture timestamp) as the scenario delivers them.
+    """
+    if scenario == "live":
+        with ThreadedSource(VideoSource(path, realtime=True)) as capture:
+            for frame in capture:
+                yield frame, capture.timestamp
+        return
+    with VideoSource(path) as video:
+        for frame in video:
+            if scenario == "file-drops" and rng.random() < drop_rate:
+                continue
+            yield frame, video.timestamp
+
+
+def run(scenario, path, focal_length, truth, args, seed=0):
+    rng = random.Random(seed)
+    trackers = {"capture": FaceTracker(focal_length, KNOWN_WIDTH), "processing": FaceTracker(focal_length, KNOWN_WIDTH)}
+    speeds = {name: [] for name in trackers}
+    delivered = 0
+    for frame, timestamp in frames_of(scenario, path, args.drop_rate, rng):
+        delivered += 1
+        faces = detect_faces(frame)
+        # the clip has one face, smaller boxes are cascade false positives
+        faces = faces[np.argsort(faces[:, 2])[-1:]] if len(faces) else faces
+        # uneven throughput: the same work takes a different time on every frame
+        time.sleep(rng.uniform(0, args.max_delay))
+        for name, tracker in trackers.items():
+            tracked = tracker.update(faces, timestamp=timestamp if name == "capture" else None)
+            speeds[name].extend(speed for speed in tracked.speeds if speed == speed)
+    for name, values in speeds.items():
+        # skip the first half while the filter settles
+        settled = np.array(values[len(values) // 2:])
+        if not len(settled):
+            print(f"{scenario:>11} {name:>11} {delivered:>10}   no speed measured")
+            continue
+        error = np.mean(np.abs(settled - truth))
+        print(f"{scenario:>11} {name:>11} {delivered:>10} {settled.mean():>10.2f} {error:>10.2f} "
+              f"{100 * error / truth:>8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--start-distance", type=float, default=150.0, help="cm")
+    parser.add_argument("--end-distance", type=float, default=60.0, help="cm")
+    parser.add_argument("--drop-rate", type=float, default=0.3)
+    parser.add_argument("--max-delay", type=float, default=0.08, help="seconds of extra work per frame, at most")
+    parser.add_argument("--scenarios", nargs="+", default=["file", "file-drops", "live"])
+    args = parser.parse_args()
+
+    focal_length, _ = reference_focal_length(REF_IMAGE, KNOWN_DISTANCE, KNOWN_WIDTH)
+    truth = (args.start_distance - args.end_distance) / ((args.frames - 1) / args.fps)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "approach.mp4")
+        write_clip(path, approaching_face_clip(args.frames, args.start_distance, args.end_distance), args.fps)
+        print(f"true speed {truth:.2f} cm/s, {args.frames} frames at {args.fps} fps\n")
+        print(f"{'scenario':>11} {'clock':>11} {'frames':>10} {'cm/s':>10} {'MAE':>10} {'error':>9}")
+        for scenario in args.scenarios:
+            run(scenario, path, focal_length, truth, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Simulate many browsers streaming to browser_camera_server.py.
+
+    python browser_camera_server.py --workers 4 &
+    python benchmarks/load_test_ingest.py --clients 20 --fps 15 --seconds 20
+
+Each simulated browser sends JPEG frames of a synthetic approaching face at a fixed
+rate without waiting for answers, like a page encoding getUserMedia frames on a
+timer, and reads results on its own thread. Reported per run: frames sent, results
+received (the server drops stale frames per client), result rate and the latency
+from sending a frame to receiving its result. Needs websocket-client.
+
+When there are more clients than server workers, the results of each client are
+listed too: workers are shared round-robin, so no client should be starved.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from synthetic_clips import approaching_face_clip
+
+
+def encode_frames(frames, quality, image_format):
+    extension = ".webp" if image_format == "webp" else ".jpg"
+    flag = cv2.IMWRITE_WEBP_QUALITY if image_format == "webp" else cv2.IMWRITE_JPEG_QUALITY
+    return [cv2.imencode(extension, frame, [flag, quality])[1].tobytes() for frame, _ in frames]
+
+
+class Browser:
+    def __init__(self, url, frames, fps, seconds, offset):
+        import websocket
+
+        self.ws = websocket.create_connection(url)
+        self.frames = frames
+        self.fps = fps
+        self.seconds = seconds
+        self.offset = offset
+        self.sent_at = []
+        self.latencies = []
+        self.results = 0
+        self.alerts = 0
+        self.faces = 0
+        self.receiver = threading.Thread(target=self._receive, daemon=True)
+
+    def _receive(self):
+        while True:
+            try:
+                message = self.ws.recv()
+            except Exception:
+                break
+            if not message:
+                break
+            result = json.loads(message)
+            if "frame" not in result:
+                continue
+            self.results += 1
+            self.alerts += result["alert"]
+            self.faces += len(result["faces"])
+            self.latencies.append(time.perf_counter() - self.sent_at[result["frame"]])
+
+    def run(self):
+        self.receiver.start()
+        interval = 1.0 / self.fps
+        start = time.perf_counter()
+        next_time = start
+        index = self.offset
+        while time.perf_counter() - start < self.seconds:
+            self.sent_at.append(time.perf_counter())
+            self.ws.send_binary(self.frames[index % len(self.frames)])
+            index += 1
+            next_time += interval
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        # let the last results arrive
+        time.sleep(1.0)
+        self.ws.close()
+        self.receiver.join(timeout=2.0)
+
+
+def server_workers(url):
+    """
+    Worker count from /ingest_stats next to the WebSocket URL, None when it can't be read.
+    """
+    stats_url = url.replace("ws://", "http://", 1).replace("wss://", "https://", 1).rsplit("/", 1)[0] + "/ingest_stats"
+    try:
+        with urllib.request.urlopen(stats_url, timeout=2.0) as response:
+            return json.loads(response.read())["workers"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="ws://127.0.0.1:5000/ingest")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--fps", type=float, default=15.0, help="frames sent per second by each client")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--quality", type=int, default=80)
+    parser.add_argument("--format", choices=["jpeg", "webp"], default="jpeg")
+    args = parser.parse_args()
+
+    workers = server_workers(args.url)
+    frames = encode_frames(list(approaching_face_clip(90)), args.quality, args.format)
+    print(f"{len(frames)} frames, {np.mean([len(frame) for frame in frames]) / 1024:.1f} KB each ({args.format})\n")
+    print(f"{'clients':>8} {'sent':>8} {'results':>8} {'kept':>7} {'results/s':>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for clients in args.clients:
+        browsers = [Browser(args.url, frames, args.fps, args.seconds, offset=index * 7) for index in range(clients)]
+        threads = [threading.Thread(target=browser.run) for browser in browsers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        sent = sum(len(browser.sent_at) for browser in browsers)
+        results = sum(browser.results for browser in browsers)
+        latencies = np.concatenate([browser.latencies for browser in browsers]) * 1000 if results else np.zeros(1)
+        print(f"{clients:>8} {sent:>8} {results:>8} {100 * results / sent:>6.1f}% {results / args.seconds:>10.1f} "
+              f"{np.percentile(latencies, 50):>8.1f} {np.percentile(latencies, 95):>8.1f}")
+        if workers is not None and clients > workers:
+            counts = [browser.results for browser in browsers]
+            print(f"{'':>8} results per client ({workers} workers): {counts}, "
+                  f"min {min(counts)} / max {max(counts)}{'  STARVED' if min(counts) == 0 else ''}")
+
+
+if __name__ == "__main__":
+    main()
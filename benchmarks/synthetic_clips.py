@@ -0,0 +1,61 @@
+"""
+Synthetic clips with known face motion, built by zooming and panning Ref_image.png.
+The face in Ref_image.png is KNOWN_DISTANCE away, so scaling the image by s puts it
+at KNOWN_DISTANCE / s, which gives exact ground-truth distances for every frame.
+"""
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from distance_core import KNOWN_DISTANCE, REF_IMAGE, detect_faces
+
+
+def approaching_face_clip(frames=150, start_distance=150.0, end_distance=60.0, pan=80,
+                          size=(640, 480), ref_image_path=REF_IMAGE, ref_distance=KNOWN_DISTANCE):
+    """
+    Yield (frame, true_distance) for a face moving from start_distance to end_distance (cm)
+    at constant speed while drifting sideways by up to pan pixels.
+    """
+    ref_image = cv2.imread(ref_image_path)
+    faces = detect_faces(ref_image)
+    if len(faces) == 0:
+        raise ValueError(f"No face found in {ref_image_path}")
+    x, y, w, h = faces[-1]
+    face_center = (x + w / 2, y + h / 2)
+    width, height = size
+    for index in range(frames):
+        progress = index / max(frames - 1, 1)
+        distance = start_distance + (end_distance - start_distance) * progress
+        scale = ref_distance / distance
+        offset_x = pan * np.sin(2 * np.pi * progress)
+        # scale about the face center, then move the face center to the middle of the frame
+        matrix = np.float32([
+            [scale, 0, width / 2 + offset_x - scale * face_center[0]],
+            [0, scale, height / 2 - scale * face_center[1]],
+        ])
+        frame = cv2.warpAffine(ref_image, matrix, size, borderMode=cv2.BORDER_REPLICATE)
+        yield frame, distance
+
+
+def write_clip(path, frames, fps=30.0):
+    """
+    Write frames (an iterable of BGR images or (frame, ...) tuples) to a video file.
+    """
+    writer = None
+    for item in frames:
+        frame = item[0] if isinstance(item, tuple) else item
+        if writer is None:
+            height, width = frame.shape[:2]
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+        writer.write(frame)
+    if writer is not None:
+        writer.release()
+
+
+if __name__ == "__main__":
+    output = sys.argv[1] if len(sys.argv) > 1 else "synthetic_approach.mp4"
+    write_clip(output, approaching_face_clip())
+    print(f"[INFO] Wrote {output}")
@@ -0,0 +1,125 @@
+"""
+Distance alerts for cameras in the browser: each page streams its getUserMedia
+frames as JPEG or WebP over a WebSocket, results come back on the same socket.
+
+    pip install flask-sock
+    python browser_camera_server.py --workers 4
+
+WebSocket /ingest protocol:
+  client -> server  binary message: one encoded frame (JPEG or WebP)
+  client -> server  text message:   {"alert_distance_min": 50, "alert_distance_max": 70}
+  server -> client  text message:   {"frame": n, "faces": [{"id", "box", "distance", "speed"}],
+                                     "alert": bool, "latency_ms": ..., "dropped": ...}
+
+Frames are decoded and measured on a shared worker pool (distance_core.ingest).
+A client sending faster than the server keeps up has its older frames dropped, so
+results always describe its newest frame. benchmarks/load_test_ingest.py
+simulates many browsers.
+"""
+import argparse
+import json
+import threading
+
+from flask import Flask, render_template, jsonify
+from flask_sock import Sock
+from simple_websocket import ConnectionClosed
+
+from distance_core.calibration import camera_focal_length
+from distance_core.ingest import FrameIngest
+from distance_core.lazy import LazyResource
+
+app = Flask(__name__)
+sock = Sock(app)
+# --workers and --calibration, set before the first client connects when run as a script
+settings = {"workers": None, "calibration": "default"}
+
+
+def create_ingest():
+    focal_length_found, focal_size = camera_focal_length(settings["calibration"])
+    return FrameIngest(focal_length_found, workers=settings["workers"], focal_size=focal_size)
+
+
+# Worker pool, created by the first client so importing the app (WSGI servers, tests) starts nothing
+ingest = LazyResource(create_ingest, "ingest")
+
+
+@app.route('/')
+def index():
+    return render_template('index2.html')
+
+
+@app.route('/ingest_stats')
+def ingest_stats():
+    if not ingest.ready:
+        return jsonify(ingest.stats())
+    return jsonify(ingest.get().stats())
+
+
+def send_results(send, client):
+    """
+    Push each client's newest result, runs on its own thread so a slow socket never holds a worker.
+    """
+    try:
+        for result in client.results():
+            send(result)
+    except ConnectionClosed:
+        pass
+
+
+def apply_settings(send, client, message):
+    try:
+        settings = json.loads(message)
+        client.set_alert_range(float(settings["alert_distance_min"]), float(settings["alert_distance_max"]))
+    except (ValueError, KeyError, TypeError) as error:
+        send({"message": f"Invalid settings: {error}"})
+        return
+    send({"message": f"Updated alert distances: Min = {client.alert_distance_min} cm, "
+                     f"Max = {client.alert_distance_max} cm"})
+
+
+@sock.route('/ingest')
+def ingest_socket(ws):
+    try:
+        frames = ingest.get()
+    except Exception as error:
+        print(f"[ERROR] Failed to start the worker pool: {error}")
+        ws.close(reason=1011, message="Worker pool unavailable.")
+        return
+    client = frames.connect()
+    print(f"[INFO] Client {client.client_id} connected.")
+    # results and replies to settings are sent from different threads
+    send_lock = threading.Lock()
+
+    def send(payload):
+        with send_lock:
+            ws.send(json.dumps(payload))
+
+    sender = threading.Thread(target=send_results, args=(send, client), name=f"send-{client.client_id}", daemon=True)
+    sender.start()
+    try:
+        while True:
+            message = ws.receive()
+            if message is None:
+                break
+            if isinstance(message, str):
+                apply_settings(send, client, message)
+            else:
+                frames.submit(client, message)
+    except ConnectionClosed:
+        pass
+    finally:
+        frames.disconnect(client)
+        sender.join(timeout=1.0)
+        print(f"[INFO] Client {client.client_id} disconnected: {client.stats()}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=None, help="decode and detection threads, defaults to CPU count")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--calibration", default="default", help="camera name of the calibration file to use")
+    args = parser.parse_args()
+
+    settings.update(workers=args.workers, calibration=args.calibration)
+    print(f"[INFO] Starting browser camera server with {ingest.get().workers} workers...")
+    app.run(host='0.0.0.0', port=args.port, threaded=True)
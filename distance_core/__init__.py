@@ -0,0 +1,25 @@
+"""
+Shared building blocks for the distance and speed estimation scripts and servers:
+face detector, distance estimator, overlays and capture sources.
+
+Importing the package never opens a camera or a window.
+"""
+
+from .config import KNOWN_DISTANCE, KNOWN_WIDTH, REF_IMAGE, DEFAULT_CASCADE
+from .detector import get_cascade, cascade_stats, detect_faces, face_data
+from .estimator import (
+    focal_length,
+    distance_finder,
+    speed_finder,
+    average_finder,
+    reference_focal_length,
+)
+from .batch import BatchEstimate, estimate_batch, estimate_batch_loop
+from .smoothing import RollingStats, Ema, KalmanFilter
+from .skip_detector import SkipFrameDetector
+from .roi_detector import RoiDetector
+from .capture import VideoSource, PiCameraSource, ThreadedSource
+from .broadcast import FrameBroadcaster, JpegCache, MjpegStream, mjpeg_part, sse_event, stream_options
+from .shared_frames import SharedFrameRing
+from .process_pool import DetectionPool
+from . import overlays
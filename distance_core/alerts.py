@@ -0,0 +1,229 @@
+import json
+import threading
+import time
+import urllib.request
+from collections import OrderedDict, namedtuple
+
+# one alert as it reaches the sinks; track is -1 when faces are not tracked
+Alert = namedtuple("Alert", ["source", "track", "distance", "message", "time"])
+
+
+def alert_message(distance):
+    return f"Intruder at {round(distance, 2)} cm.."
+
+
+class LogSink:
+    """
+    Print alerts, and optionally append them to a JSON-lines file.
+    """
+
+    name = "log"
+
+    def __init__(self, path=None):
+        self.path = path
+
+    def send(self, alert):
+        print(f"[ALERT] {alert.source} track {alert.track}: intruder detected at {round(alert.distance, 2)} cm.")
+        if self.path:
+            with open(self.path, "a") as file:
+                file.write(json.dumps(alert._asdict()) + "\n")
+
+
+class SpeechSink:
+    """
+    Speak alerts with SAPI (Windows, win32com) or pyttsx3. The engine is created once,
+    on the dispatcher thread that uses it, the first time an alert is spoken; when no
+    backend is installed the sink reports it once and stays silent.
+    """
+
+    name = "speech"
+
+    def __init__(self, backend="auto"):
+        """
+        :param backend: "sapi", "pyttsx3" or "auto" for the first one available.
+        """
+        self.backend = backend
+        self._speak = None
+        self.available = None
+
+    def _create(self):
+        backends = ["sapi", "pyttsx3"] if self.backend == "auto" else [self.backend]
+        for backend in backends:
+            try:
+                if backend == "sapi":
+                    from win32com.client import Dispatch
+
+                    voice = Dispatch("SAPI.SpVoice")
+                    return voice.Speak
+                import pyttsx3
+
+                engine = pyttsx3.init()
+
+                def speak(message):
+                    engine.say(message)
+                    engine.runAndWait()
+
+                return speak
+            except Exception as error:
+                print(f"[WARNING] Text-to-speech backend {backend} unavailable: {error}")
+        return None
+
+    def send(self, alert):
+        if self.available is None:
+            self._speak = self._create()
+            self.available = self._speak is not None
+        if self.available:
+            self._speak(alert.message)
+
+
+class AudioFileSink:
+    """
+    Render each alert to an audio file (e.g. temp.mp3) for a player or another process
+    to pick up, with pyttsx3's offline synthesis. The file is replaced on every alert.
+    """
+
+    name = "audio_file"
+
+    def __init__(self, path="temp.mp3"):
+        self.path = path
+        self._engine = None
+
+    def send(self, alert):
+        if self._engine is None:
+            import pyttsx3
+
+            self._engine = pyttsx3.init()
+        self._engine.save_to_file(alert.message, self.path)
+        self._engine.runAndWait()
+
+
+class WebhookSink:
+    """
+    POST each alert as JSON to a URL, e.g. a local home-automation stub.
+    """
+
+    name = "webhook"
+
+    def __init__(self, url, timeout=2.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alert):
+        request = urllib.request.Request(self.url, data=json.dumps(alert._asdict()).encode(),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class AlertDispatcher:
+    """
+    Hands alerts to slow sinks (speech, files, webhooks) on one long-lived worker thread,
+    so the frame loop only pays for a dictionary update.
+
+    Alerts are keyed by (source, track). A track alerts at most once per min_interval;
+    while one of its alerts still waits for the worker, a newer one replaces it instead
+    of queueing behind it. At most max_pending tracks wait at a time, further alerts are
+    dropped and counted.
+    """
+
+    def __init__(self, sinks=None, min_interval=5.0, max_pending=64):
+        """
+        :param sinks: objects with send(alert), called in order for every alert. Defaults to LogSink().
+        :param min_interval: seconds between two alerts of the same track.
+        """
+        self.sinks = [LogSink()] if sinks is None else list(sinks)
+        self.min_interval = min_interval
+        self.max_pending = max_pending
+        self._condition = threading.Condition()
+        self._pending = OrderedDict()
+        self._last_alert = {}
+        self._running = True
+        self.submitted = 0
+        self.queued = 0
+        self.rate_limited = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.delivered = 0
+        self.errors = {}
+        self.sink_time = {}
+        self._thread = threading.Thread(target=self._work, name="alert-dispatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, source, track, distance, message=None):
+        """
+        Offer an alert, never blocks.
+        :return: True if it was queued (or replaced a queued alert of the same track).
+        """
+        key = (str(source), int(track))
+        now = time.monotonic()
+        with self._condition:
+            self.submitted += 1
+            if not self._running:
+                return False
+            if key in self._pending:
+                self.coalesced += 1
+            elif now - self._last_alert.get(key, -self.min_interval) < self.min_interval:
+                self.rate_limited += 1
+                return False
+            elif len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            else:
+                self.queued += 1
+                self._last_alert[key] = now
+            self._pending[key] = Alert(key[0], key[1], float(distance), message or alert_message(distance), time.time())
+            self._condition.notify()
+            return True
+
+    def _work(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or not self._running)
+                if not self._pending:
+                    return
+                _, alert = self._pending.popitem(last=False)
+            timings, failed = {}, []
+            for sink in self.sinks:
+                name = getattr(sink, "name", type(sink).__name__)
+                start = time.perf_counter()
+                try:
+                    sink.send(alert)
+                except Exception as error:
+                    failed.append(name)
+                    print(f"[ERROR] Alert sink {name}: {error}")
+                timings[name] = time.perf_counter() - start
+            with self._condition:
+                self.delivered += 1
+                for name, elapsed in timings.items():
+                    self.sink_time[name] = self.sink_time.get(name, 0.0) + elapsed
+                for name in failed:
+                    self.errors[name] = self.errors.get(name, 0) + 1
+                # forget tracks that have been quiet for a while
+                if len(self._last_alert) > 4 * self.max_pending:
+                    cutoff = time.monotonic() - self.min_interval
+                    self._last_alert = {key: value for key, value in self._last_alert.items() if value > cutoff}
+
+    def stats(self):
+        with self._condition:
+            return {
+                "sinks": [getattr(sink, "name", type(sink).__name__) for sink in self.sinks],
+                "submitted": self.submitted,
+                "queued": self.queued,
+                "rate_limited": self.rate_limited,
+                "coalesced": self.coalesced,
+                "dropped": self.dropped,
+                "delivered": self.delivered,
+                "pending": len(self._pending),
+                "errors": dict(self.errors),
+                "sink_ms": {name: value / self.delivered * 1000 if self.delivered else None
+                            for name, value in self.sink_time.items()},
+            }
+
+    def close(self, timeout=5.0):
+        """
+        Stop accepting alerts, deliver the ones pending, and stop the worker.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join(timeout)
@@ -0,0 +1,266 @@
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import wave
+from collections import OrderedDict
+
+import numpy as np
+
+
+def render_sapi(text, path):
+    """
+    Synthesize text to a WAV file with Windows SAPI.
+    """
+    import pythoncom
+    from win32com.client import Dispatch
+
+    # SAPI is COM, each thread that uses it needs its own initialization
+    pythoncom.CoInitialize()
+    stream = Dispatch("SAPI.SpFileStream")
+    stream.Open(path, 3)  # SSFMCreateForWrite
+    voice = Dispatch("SAPI.SpVoice")
+    voice.AudioOutputStream = stream
+    voice.Speak(text)
+    stream.Close()
+
+
+def render_pyttsx3(text, path):
+    """
+    Synthesize text to a WAV file with pyttsx3 (SAPI, NSSpeechSynthesizer or eSpeak).
+    """
+    import pyttsx3
+
+    engine = pyttsx3.init()
+    engine.save_to_file(text, path)
+    engine.runAndWait()
+
+
+def render_tone(text, path, distance=None, sample_rate=16000):
+    """
+    Two short beeps, higher pitched the closer the face, for hosts without any
+    text-to-speech engine. Needs nothing but NumPy.
+    """
+    pitch = 1320.0 if distance is None else float(np.clip(1760 - 8 * distance, 440, 1760))
+    t = np.arange(int(0.12 * sample_rate)) / sample_rate
+    beep = np.sin(2 * np.pi * pitch * t) * np.hanning(len(t))
+    silence = np.zeros(int(0.08 * sample_rate))
+    samples = (np.concatenate([beep, silence, beep]) * 0.6 * 32767).astype("<i2")
+    with wave.open(path, "wb") as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(sample_rate)
+        file.writeframes(samples.tobytes())
+
+
+RENDERERS = {"sapi": render_sapi, "pyttsx3": render_pyttsx3, "tone": render_tone}
+
+
+def play_wav(data):
+    """
+    Play WAV bytes from memory: winsound on Windows, aplay or paplay elsewhere.
+    :return: False when there is no way to play audio on this host.
+    """
+    if sys.platform == "win32":
+        import winsound
+
+        winsound.PlaySound(data, winsound.SND_MEMORY)
+        return True
+    for player in (["aplay", "-q", "-"], ["paplay"]):
+        if shutil.which(player[0]):
+            subprocess.run(player, input=data, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return True
+    return False
+
+
+class AudioCache:
+    """
+    Alert phrases rendered once and played from memory. Distances are quantized to
+    step cm, so "Intruder at 63.27 cm" and "Intruder at 61.9 cm" share the 60 cm
+    phrase. Each phrase is synthesized offline to a file in directory (kept across
+    runs, like temp.mp3 was), and the most recently used phrases are held in memory,
+    evicting the least recently used beyond max_entries.
+    """
+
+    def __init__(self, directory="alert_audio", step=5, max_entries=32, renderer="auto",
+                 template="Intruder at {distance} cm", player=play_wav):
+        """
+        :param renderer: "sapi", "pyttsx3", "tone" or "auto" for the first one that works.
+        :param template: phrase with a {distance} field, filled with the quantized distance.
+        :param player: called with WAV bytes, returns False when audio can't be played.
+        """
+        self.directory = directory
+        self.step = step
+        self.max_entries = max_entries
+        self.template = template
+        self.player = player
+        self._renderers = ["sapi", "pyttsx3", "tone"] if renderer == "auto" else [renderer]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # synthesis engines are not thread-safe, one phrase is rendered at a time
+        self._render_lock = threading.Lock()
+        self._can_play = True
+        self._pending_range = None
+        self._prerender_thread = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.renders = 0
+        self.evictions = 0
+        self.render_time = 0.0
+
+    def quantize(self, distance):
+        return int(round(distance / self.step) * self.step)
+
+    def phrase(self, distance):
+        return self.template.format(distance=self.quantize(distance))
+
+    def path(self, distance, renderer=None):
+        """
+        File of the phrase, named after the renderer so beeps rendered on a host without
+        speech are not reused once an engine is installed.
+        """
+        renderer = renderer or (self._renderers[0] if self._renderers else "none")
+        return os.path.join(self.directory, f"alert_{self.quantize(distance)}cm_{renderer}.wav")
+
+    def get(self, distance):
+        """
+        :return: WAV bytes of the phrase for distance, rendered on the first request.
+        """
+        key = self.quantize(distance)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+        path = self.path(key)
+        if os.path.exists(path) and os.path.getsize(path):
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            path = self._render(self.phrase(key), key)
+        with open(path, "rb") as file:
+            data = file.read()
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return data
+
+    def _render(self, text, distance):
+        """
+        :return: path of the rendered file.
+        """
+        with self._render_lock:
+            start = time.perf_counter()
+            while self._renderers:
+                name = self._renderers[0]
+                path = self.path(distance, name)
+                if os.path.exists(path) and os.path.getsize(path):
+                    with self._lock:
+                        self.disk_hits += 1
+                    return path
+                # render next to the target and rename, so readers never see a half-written file
+                partial = path + ".part"
+                os.makedirs(self.directory, exist_ok=True)
+                try:
+                    if name == "tone":
+                        render_tone(text, partial, distance)
+                    else:
+                        RENDERERS[name](text, partial)
+                    if not os.path.exists(partial) or not os.path.getsize(partial):
+                        raise RuntimeError("no audio written")
+                    break
+                except Exception as error:
+                    print(f"[WARNING] Alert audio renderer {name} unavailable: {error}")
+                    self._renderers.pop(0)
+            else:
+                raise RuntimeError("No alert audio renderer works on this host.")
+            os.replace(partial, path)
+            with self._lock:
+                self.renders += 1
+                self.render_time += time.perf_counter() - start
+            return path
+
+    def prerender(self, start, stop):
+        """
+        Render and load every phrase between start and stop cm, e.g. the alert range.
+        No more than max_entries phrases starting at start, further ones would evict them.
+        """
+        first, last = self.quantize(start), self.quantize(stop)
+        distances = range(first, last + self.step, self.step)
+        if len(distances) > self.max_entries:
+            print(f"[WARNING] Alert range {start}-{stop} cm has {len(distances)} phrases, "
+                  f"pre-rendering the first {self.max_entries}.")
+            distances = distances[:self.max_entries]
+        for distance in distances:
+            self.get(distance)
+
+    def prerender_in_background(self, start, stop):
+        """
+        prerender() on one background thread, returns at once. A range requested while
+        it runs replaces any range still waiting, so repeated requests never render at
+        the same time.
+        """
+        with self._lock:
+            self._pending_range = (start, stop)
+            if self._prerender_thread is not None:
+                return
+            self._prerender_thread = threading.Thread(target=self._prerender_pending, name="alert-audio",
+                                                      daemon=True)
+            self._prerender_thread.start()
+
+    def _prerender_pending(self):
+        while True:
+            with self._lock:
+                pending, self._pending_range = self._pending_range, None
+                if pending is None:
+                    self._prerender_thread = None
+                    return
+            try:
+                self.prerender(*pending)
+            except Exception as error:
+                print(f"[ERROR] Failed to pre-render alert audio: {error}")
+
+    def play(self, distance):
+        """
+        Play the phrase for distance.
+        :return: False when audio can't be played on this host (reported once).
+        """
+        data = self.get(distance)
+        if self._can_play and not self.player(data):
+            print("[WARNING] No audio player found (winsound, aplay or paplay), alerts are not played.")
+            self._can_play = False
+        return self._can_play
+
+    def stats(self):
+        with self._lock:
+            return {
+                "renderer": self._renderers[0] if self._renderers else None,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "renders": self.renders,
+                "evictions": self.evictions,
+                "mean_render_ms": self.render_time / self.renders * 1000 if self.renders else None,
+            }
+
+
+class CachedSpeechSink:
+    """
+    AlertDispatcher sink playing pre-rendered phrases from an AudioCache, so an alert
+    costs a playback instead of a synthesis.
+    """
+
+    name = "speech_cache"
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def send(self, alert):
+        self.cache.play(alert.distance)
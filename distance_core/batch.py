@@ -0,0 +1,60 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .estimator import distance_finder, speed_finder
+
+# distances: (N,), centers: (N, 2) as (x, y), speeds: (N,) NaN where no previous distance is known
+BatchEstimate = namedtuple("BatchEstimate", ["distances", "centers", "speeds"])
+
+
+def as_face_array(faces):
+    """
+    Turn detectMultiScale output (N x 4 array, or the empty tuple it returns when
+    nothing is found) into a float N x 4 array of (x, y, w, h).
+    """
+    return np.asarray(faces, dtype=np.float64).reshape(-1, 4)
+
+
+def estimate_batch(faces, focal_length, real_width, previous_distances=None, time_delta=None):
+    """
+    Distances, centers and speeds for every detected face in one vectorized call.
+    :param faces: detectMultiScale output, N x 4 (x, y, w, h).
+    :param focal_length: value returned by focal_length().
+    :param real_width: actual face width, same unit as the returned distances.
+    :param previous_distances: distances of the same faces (same order) in the previous frame, NaN for unknown.
+    :param time_delta: seconds between the previous frame and this one.
+    :return: BatchEstimate, speeds are positive when a face moves towards the camera.
+    """
+    boxes = as_face_array(faces)
+    widths = boxes[:, 2]
+    distances = (real_width * focal_length) / widths
+    centers = boxes[:, :2] + np.floor(boxes[:, 2:] / 2)
+    if previous_distances is None or not time_delta:
+        speeds = np.full(len(boxes), np.nan)
+    else:
+        speeds = (np.asarray(previous_distances, dtype=np.float64) - distances) / time_delta
+    return BatchEstimate(distances, centers, speeds)
+
+
+def estimate_batch_loop(faces, focal_length, real_width, previous_distances=None, time_delta=None):
+    """
+    Reference implementation of estimate_batch() with a Python loop over faces, built
+    on distance_finder() and speed_finder(). Kept for benchmarks and cross-checking.
+    """
+    distances = []
+    centers = []
+    speeds = []
+    for index, (x, y, w, h) in enumerate(faces):
+        distance = distance_finder(focal_length, real_width, float(w))
+        distances.append(distance)
+        centers.append((int(w / 2) + x, int(h / 2) + y))
+        if previous_distances is None or not time_delta:
+            speeds.append(float("nan"))
+        else:
+            speeds.append(speed_finder(previous_distances[index] - distance, time_delta))
+    return BatchEstimate(
+        np.array(distances, dtype=np.float64),
+        np.array(centers, dtype=np.float64).reshape(-1, 2),
+        np.array(speeds, dtype=np.float64),
+    )
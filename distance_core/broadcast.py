@@ -0,0 +1,343 @@
+import json
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+
+
+class FrameBroadcaster:
+    """
+    Holds the most recent annotated frame produced by a single capture loop and
+    lets any number of subscribers wait for it, so viewers never call cap.read()
+    themselves and never compete for frames.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._frame = None
+        self._sequence = 0
+        self._timestamp = 0.0
+        self._closed = False
+        self.subscribers = 0
+
+    def publish(self, frame):
+        """
+        Replace the latest frame and wake every waiting subscriber.
+        :param frame: annotated frame (the broadcaster keeps a reference, callers must not reuse it).
+        :return: sequence number assigned to the frame.
+        """
+        with self._condition:
+            self._frame = frame
+            self._sequence += 1
+            self._timestamp = time.time()
+            self._condition.notify_all()
+            return self._sequence
+
+    def latest(self):
+        """
+        :return: (sequence, frame, timestamp) of the newest frame, frame is None before the first publish.
+        """
+        with self._condition:
+            return self._sequence, self._frame, self._timestamp
+
+    def wait_for_frame(self, last_sequence, timeout=1.0):
+        """
+        Block until a frame newer than last_sequence is available.
+        :param last_sequence: sequence number of the last frame the caller consumed (0 for none).
+        :param timeout: seconds to wait before giving up.
+        :return: (sequence, frame), or (last_sequence, None) on timeout or after close().
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._closed or self._sequence > last_sequence, timeout
+            )
+            if self._closed or self._sequence <= last_sequence:
+                return last_sequence, None
+            return self._sequence, self._frame
+
+    def subscribe(self):
+        """
+        Generator yielding (sequence, frame) for every new frame, skipping any the
+        subscriber was too slow to pick up. Stops when the broadcaster is closed.
+        """
+        with self._condition:
+            self.subscribers += 1
+        last_sequence = 0
+        try:
+            while not self._closed:
+                sequence, frame = self.wait_for_frame(last_sequence)
+                if frame is None:
+                    continue
+                last_sequence = sequence
+                yield sequence, frame
+        finally:
+            with self._condition:
+                self.subscribers -= 1
+
+    def close(self):
+        """
+        Wake all subscribers and make their generators return.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def reopen(self):
+        """
+        Accept new frames again after close(), e.g. when the capture loop is restarted.
+        """
+        with self._condition:
+            self._closed = False
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class JpegCache:
+    """
+    Encode-once cache for broadcast frames: the first viewer to ask for a frame at a
+    given quality and scale pays for the resize and cv2.imencode, every other viewer
+    asking for the same variant reuses the same bytes. Entries are keyed by
+    (sequence, quality, scale) and evicted as newer frames arrive.
+    """
+
+    def __init__(self, max_frames=2):
+        """
+        :param max_frames: how many distinct frame sequence numbers to keep encodings for.
+        """
+        self.max_frames = max_frames
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._newest_sequence = 0
+        self.encodes = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def get(self, sequence, frame, quality=None, scale=1.0):
+        """
+        :param sequence: broadcaster sequence number of frame.
+        :param frame: the frame to encode on a miss.
+        :param quality: JPEG quality 0-100, None for the OpenCV default.
+        :param scale: resize factor applied before encoding.
+        :return: encoded JPEG bytes.
+        """
+        key = (sequence, quality, scale)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {"lock": threading.Lock(), "data": None}
+                self._entries[key] = entry
+                if sequence > self._newest_sequence:
+                    self._newest_sequence = sequence
+                    self._evict()
+        # encode outside the cache lock so different qualities encode in parallel,
+        # concurrent viewers of the same key wait on the entry lock instead
+        with entry["lock"]:
+            if entry["data"] is not None:
+                with self._lock:
+                    self.hits += 1
+                return entry["data"]
+            params = [] if quality is None else [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+            if scale != 1.0:
+                frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            ret, buffer = cv2.imencode('.jpg', frame, params)
+            entry["data"] = buffer.tobytes()
+            with self._lock:
+                self.encodes += 1
+            return entry["data"]
+
+    def _evict(self):
+        oldest_kept = self._newest_sequence - self.max_frames
+        for key in list(self._entries):
+            if key[0] <= oldest_kept:
+                del self._entries[key]
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {"encodes": self.encodes, "hits": self.hits,
+                    "evictions": self.evictions, "entries": len(self._entries)}
+
+
+# steps an MjpegStream backs off through when its client can't keep up: multipliers of
+# the requested frame rate and scale, and a quality ceiling. Few, fixed steps keep the
+# number of distinct variants small, so slow clients still share encodings.
+BACKOFF_LEVELS = (
+    (1.0, 1.0, None),
+    (0.5, 1.0, 70),
+    (0.5, 0.75, 50),
+    (0.25, 0.5, 40),
+    (0.125, 0.5, 30),
+)
+
+
+def unsent_bytes(sock):
+    """
+    Bytes written to a TCP socket that the peer has not acknowledged yet, or None where
+    the platform can't tell (the TIOCOUTQ ioctl is Linux only).
+    """
+    try:
+        import fcntl
+        import termios
+
+        return struct.unpack("i", fcntl.ioctl(sock.fileno(), termios.TIOCOUTQ, b"\0\0\0\0"))[0]
+    except (ImportError, AttributeError, OSError, ValueError):
+        return None
+
+
+def stream_options(args):
+    """
+    MjpegStream arguments from query string values: quality (10-95), scale (0.1-1)
+    and max_fps. Raises ValueError for values out of range.
+    """
+    options = {}
+    if args.get("quality"):
+        options["quality"] = int(args["quality"])
+        if not 10 <= options["quality"] <= 95:
+            raise ValueError("quality must be between 10 and 95.")
+    if args.get("scale"):
+        options["scale"] = float(args["scale"])
+        if not 0.1 <= options["scale"] <= 1.0:
+            raise ValueError("scale must be between 0.1 and 1.")
+    if args.get("max_fps"):
+        options["max_fps"] = float(args["max_fps"])
+        if options["max_fps"] <= 0:
+            raise ValueError("max_fps must be positive.")
+    if args.get("adaptive"):
+        options["adaptive"] = args["adaptive"] != "0"
+    return options
+
+
+class MjpegStream:
+    """
+    One viewer's MJPEG stream with its own quality, scale and frame rate cap.
+
+    A client is falling behind when the socket holds more than backlog_frames frames
+    the peer has not acknowledged (Linux, when the socket is given), or when writes
+    block: the WSGI server writes each yielded part before it resumes the generator,
+    so the time spent outside the generator is the write time. The stream then steps
+    down BACKOFF_LEVELS, at most once per cooldown, and back up after a run of frames
+    that went out freely.
+    """
+
+    def __init__(self, broadcaster, cache, quality=None, scale=1.0, max_fps=None, adaptive=True, sock=None,
+                 backlog_frames=2, slow_share=0.5, fast_share=0.1, recover_frames=30, cooldown=1.0):
+        """
+        :param quality: JPEG quality, None for the OpenCV default.
+        :param scale: resize factor, 1.0 for full size.
+        :param max_fps: frame rate cap, None to send every frame.
+        :param sock: the client's socket (environ["werkzeug.socket"]) to watch its send queue.
+        :param backlog_frames: back off when more than this many frames are queued unacknowledged.
+        :param slow_share: back off when a write takes more than this share of the time between frames.
+        :param fast_share: writes below this share count towards stepping back up.
+        :param recover_frames: consecutive free frames needed to step up one level.
+        :param cooldown: seconds between two steps down, lets the queue drain at the new level.
+        """
+        self.broadcaster = broadcaster
+        self.cache = cache
+        self.quality = quality
+        self.scale = scale
+        self.max_fps = max_fps
+        self.adaptive = adaptive
+        self.slow_share = slow_share
+        self.fast_share = fast_share
+        self.recover_frames = recover_frames
+        self.sock = sock
+        self.backlog_frames = backlog_frames
+        self.cooldown = cooldown
+        self.level = 0
+        self._fast_writes = 0
+        self._last_backoff = 0.0
+        self.unsent = None
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.bytes_sent = 0
+        self.write_time = 0.0
+        self.backoffs = 0
+
+    def parameters(self):
+        """
+        :return: (quality, scale, max_fps) at the current backoff level.
+        """
+        fps_factor, scale_factor, quality_ceiling = BACKOFF_LEVELS[self.level]
+        quality = self.quality
+        if quality_ceiling is not None:
+            quality = quality_ceiling if quality is None else min(quality, quality_ceiling)
+        max_fps = self.max_fps
+        if fps_factor != 1.0:
+            # with no cap of its own, a slow client is capped relative to 30 fps
+            max_fps = (max_fps or 30.0) * fps_factor
+        return quality, round(self.scale * scale_factor, 3), max_fps
+
+    def __iter__(self):
+        last_sent = None
+        for sequence, frame in self.broadcaster.subscribe():
+            quality, scale, max_fps = self.parameters()
+            now = time.perf_counter()
+            if max_fps and last_sent is not None and now - last_sent < 1.0 / max_fps:
+                self.frames_skipped += 1
+                continue
+            interval = None if last_sent is None else now - last_sent
+            last_sent = now
+            data = self.cache.get(sequence, frame, quality, scale)
+            write_start = time.perf_counter()
+            yield mjpeg_part(data)
+            write_time = time.perf_counter() - write_start
+            self.frames_sent += 1
+            self.bytes_sent += len(data)
+            self.write_time += write_time
+            if self.adaptive and interval:
+                self.unsent = None if self.sock is None else unsent_bytes(self.sock)
+                self._adapt(write_time / interval, self.unsent, len(data))
+
+    def _adapt(self, write_share, unsent, frame_bytes):
+        backlog = unsent is not None and unsent > self.backlog_frames * frame_bytes
+        if write_share > self.slow_share or backlog:
+            self._fast_writes = 0
+            now = time.monotonic()
+            if self.level < len(BACKOFF_LEVELS) - 1 and now - self._last_backoff > self.cooldown:
+                self.level += 1
+                self.backoffs += 1
+                self._last_backoff = now
+        elif write_share < self.fast_share and (unsent is None or unsent <= frame_bytes):
+            self._fast_writes += 1
+            if self._fast_writes >= self.recover_frames and self.level > 0:
+                self.level -= 1
+                self._fast_writes = 0
+        else:
+            self._fast_writes = 0
+
+    def stats(self):
+        quality, scale, max_fps = self.parameters()
+        return {
+            "level": self.level,
+            "quality": quality,
+            "scale": scale,
+            "max_fps": max_fps,
+            "frames_sent": self.frames_sent,
+            "frames_skipped": self.frames_skipped,
+            "bytes_sent": self.bytes_sent,
+            "backoffs": self.backoffs,
+            "unsent_bytes": self.unsent,
+            "mean_write_ms": self.write_time / self.frames_sent * 1000 if self.frames_sent else None,
+        }
+
+
+def mjpeg_part(jpeg_bytes):
+    """
+    Wrap encoded JPEG bytes as one part of a multipart/x-mixed-replace stream.
+    """
+    return (b'--frame\r\n'
+            b'Content-Type: image/jpeg\r\n\r\n' + jpeg_bytes + b'\r\n')
+
+
+def sse_event(payload, event=None):
+    """
+    Encode a JSON-serialisable payload as one text/event-stream message.
+    :param event: optional event name, the browser dispatches it to addEventListener(event).
+    """
+    message = f"event: {event}\n" if event else ""
+    return (message + f"data: {json.dumps(payload, separators=(',', ':'))}\n\n").encode()
@@ -0,0 +1,199 @@
+import glob
+import json
+import os
+import re
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from .config import REPO_DIR, KNOWN_WIDTH
+from .detector import detect_faces
+from .estimator import reference_focal_length
+
+# per-camera calibration files, calibration/<camera>.json
+CALIBRATION_DIR = os.path.join(REPO_DIR, "calibration")
+
+# focal_length in pixels for frames of image_size (width, height); rms_error is the distance
+# error of the fit over all calibration frames, in the unit of real_width
+Calibration = namedtuple("Calibration", ["camera", "focal_length", "real_width", "image_size", "samples",
+                                         "rms_error", "created"])
+
+
+def burst_paths(directory):
+    """
+    Frames saved by Capture_Reference_Image.py (frame-1.png, frame-2.png...), in capture order.
+    """
+    paths = glob.glob(os.path.join(directory, "frame-*.png"))
+    return sorted(paths, key=lambda path: int(re.findall(r"\d+", os.path.basename(path))[0]))
+
+
+def burst_face_widths(paths):
+    """
+    Width of the largest face in each frame, frames without a face are skipped.
+    :return: (widths array, (width, height) of the frames).
+    """
+    widths, image_size = [], None
+    for path in paths:
+        image = cv2.imread(path)
+        if image is None:
+            print(f"[WARNING] Failed to read calibration frame {path}")
+            continue
+        size = (image.shape[1], image.shape[0])
+        if image_size is not None and size != image_size:
+            raise ValueError(f"Calibration frame {path} is {size[0]}x{size[1]}, the others {image_size[0]}x{image_size[1]}.")
+        image_size = size
+        faces = np.asarray(detect_faces(image)).reshape(-1, 4)
+        if len(faces):
+            widths.append(faces[:, 2].max())
+    return np.asarray(widths, dtype=np.float64), image_size
+
+
+def fit_focal_length(distances, widths, real_width=KNOWN_WIDTH):
+    """
+    Least-squares focal length over many detections: distance = focal_length * real_width / width,
+    fitted on the distance error so every frame counts in centimeters, whatever its distance.
+    :param distances: known distance of each detection.
+    :param widths: face width of each detection, in pixels.
+    :return: (focal_length, rms distance error of the fit).
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    ratios = real_width / np.asarray(widths, dtype=np.float64)
+    focal = float(np.dot(distances, ratios) / np.dot(ratios, ratios))
+    rms_error = float(np.sqrt(np.mean((focal * ratios - distances) ** 2)))
+    return focal, rms_error
+
+
+def burst_widths(bursts):
+    """
+    :param bursts: {known distance: list of frame paths}.
+    :return: ({known distance: face widths}, (width, height) shared by all frames).
+    """
+    widths, image_size = {}, None
+    for distance, paths in bursts.items():
+        found, size = burst_face_widths(paths)
+        if not len(found):
+            print(f"[WARNING] No face found in the {len(paths)} frames at {distance}")
+            continue
+        if image_size is not None and size != image_size:
+            raise ValueError(f"Frames at {distance} are {size[0]}x{size[1]}, the others {image_size[0]}x{image_size[1]}.")
+        image_size = size
+        widths[distance] = found
+    return widths, image_size
+
+
+def calibration_from_widths(widths, image_size, camera="default", real_width=KNOWN_WIDTH):
+    """
+    :param widths: {known distance: face widths in pixels}, as returned by burst_widths().
+    :return: Calibration of the camera.
+    """
+    if not widths:
+        raise ValueError("No face found in any calibration frame.")
+    distances = np.concatenate([np.full(len(found), float(distance)) for distance, found in widths.items()])
+    all_widths = np.concatenate(list(widths.values()))
+    focal, rms_error = fit_focal_length(distances, all_widths, real_width)
+    return Calibration(str(camera), focal, real_width, list(image_size), len(all_widths), rms_error,
+                       time.strftime("%Y-%m-%dT%H:%M:%S"))
+
+
+def calibrate(bursts, camera="default", real_width=KNOWN_WIDTH):
+    """
+    :param bursts: {known distance: list of frame paths} with frames at several distances.
+    :return: Calibration of the camera.
+    """
+    widths, image_size = burst_widths(bursts)
+    return calibration_from_widths(widths, image_size, camera, real_width)
+
+
+def calibration_path(camera="default", directory=CALIBRATION_DIR):
+    camera = str(camera)
+    if not camera or os.path.basename(camera) != camera or camera.startswith("."):
+        raise ValueError(f"Invalid camera name {camera!r} for a calibration file.")
+    return os.path.join(directory, f"{camera}.json")
+
+
+def save_calibration(calibration, directory=CALIBRATION_DIR):
+    """
+    :return: path of the written file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = calibration_path(calibration.camera, directory)
+    with open(path, "w") as file:
+        json.dump(calibration._asdict(), file, indent=2)
+    return path
+
+
+def load_calibration(camera="default", directory=CALIBRATION_DIR):
+    """
+    :return: the camera's Calibration, None when it has not been calibrated.
+    """
+    try:
+        with open(calibration_path(camera, directory)) as file:
+            return Calibration(**json.load(file))
+    except FileNotFoundError:
+        return None
+
+
+def scaled_focal_length(focal_length, fitted_size, image_size):
+    """
+    A focal length in pixels holds for the frame size it was fitted at; frames of another
+    size see the same field of view with a different pixel count, so it scales with the width.
+    :param fitted_size: (width, height) the focal length was fitted at.
+    :param image_size: (width, height) of the frames it is used on, None to keep it as it is.
+    """
+    if image_size is None or tuple(image_size) == tuple(fitted_size):
+        return focal_length
+    if abs(image_size[0] / image_size[1] - fitted_size[0] / fitted_size[1]) > 0.01:
+        print(f"[WARNING] Frames are {image_size[0]}x{image_size[1]}, calibrated at {fitted_size[0]}x{fitted_size[1]}: "
+              f"another aspect ratio may crop the image, calibrate at this resolution.")
+    return focal_length * image_size[0] / fitted_size[0]
+
+
+class FrameFocalLength:
+    """
+    A focal length fitted at one frame size, for sources whose frame size is only known
+    once frames arrive (and may change, e.g. a browser switching cameras). Call it with
+    each frame's (width, height); it rescales only when the size changes.
+    """
+
+    def __init__(self, focal_length, fitted_size=None):
+        """
+        :param fitted_size: (width, height) focal_length was fitted at, None to use it at any size.
+        """
+        self.fitted_focal_length = focal_length
+        self.fitted_size = fitted_size
+        self.image_size = None
+        self.focal_length = focal_length
+
+    def __call__(self, image_size):
+        image_size = tuple(image_size)
+        if image_size != self.image_size:
+            self.image_size = image_size
+            self.focal_length = scaled_focal_length(self.fitted_focal_length, self.fitted_size, image_size) \
+                if self.fitted_size is not None else self.fitted_focal_length
+        return self.focal_length
+
+
+def camera_focal_length(camera="default", directory=CALIBRATION_DIR):
+    """
+    Focal length from the camera's calibration file, or detected on Ref_image.png when
+    the camera has not been calibrated yet.
+    :return: (focal_length, (width, height) of the frames it was fitted at).
+    """
+    calibration = load_calibration(camera, directory)
+    if calibration is not None:
+        return calibration.focal_length, tuple(calibration.image_size)
+    print(f"[INFO] No calibration for camera {camera}, using the reference image.")
+    focal_length_found, ref_image = reference_focal_length()
+    return focal_length_found, (ref_image.shape[1], ref_image.shape[0])
+
+
+def calibrated_focal_length(camera="default", directory=CALIBRATION_DIR, image_size=None):
+    """
+    camera_focal_length() scaled by width to the frame size the camera delivers (see
+    scaled_focal_length()).
+    :param image_size: (width, height) of the live frames, None to use the focal length as fitted.
+    """
+    focal_length_found, fitted_size = camera_focal_length(camera, directory)
+    return scaled_focal_length(focal_length_found, fitted_size, image_size)
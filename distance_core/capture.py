@@ -0,0 +1,285 @@
+import threading
+import time
+
+import cv2
+
+
+class VideoSource:
+    """
+    Frame source over cv2.VideoCapture (camera index, file path or stream URL).
+    Nothing is opened until open() is called or the source is iterated.
+    """
+
+    def __init__(self, source=0, api_preference=None, width=None, height=None, loop=False, realtime=False):
+        """
+        :param source: camera index, video file path or RTSP/HTTP URL.
+        :param api_preference: optional cv2.CAP_* backend, e.g. cv2.CAP_DSHOW.
+        :param width: requested frame width, None keeps the camera default.
+        :param height: requested frame height, None keeps the camera default.
+        :param loop: for files, start again from the first frame at the end.
+        :param realtime: for files, deliver frames at the file's own frame rate like a live camera.
+        """
+        self.source = source
+        self.api_preference = api_preference
+        self.width = width
+        self.height = height
+        self.loop = loop
+        self.realtime = realtime
+        self.cap = None
+        self._frame_interval = 0.0
+        self._next_frame_time = 0.0
+        self._is_file = False
+        self._loop_offset = 0.0
+        # capture time of the frame last returned by read(), in seconds: its position in the
+        # file (CAP_PROP_POS_MSEC), or the monotonic clock when it came from a live source
+        self.timestamp = 0.0
+
+    def open(self):
+        if self.cap is None:
+            if self.api_preference is None:
+                self.cap = cv2.VideoCapture(self.source)
+            else:
+                self.cap = cv2.VideoCapture(self.source, self.api_preference)
+            if self.width is not None:
+                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            if self.height is not None:
+                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+            if not self.cap.isOpened():
+                print(f"[ERROR] Failed to open video source {self.source}.")
+            self._is_file = self.cap.get(cv2.CAP_PROP_FRAME_COUNT) > 0
+            self._loop_offset = 0.0
+            if self.realtime:
+                fps = self.cap.get(cv2.CAP_PROP_FPS)
+                self._frame_interval = 1.0 / fps if fps > 0 else 1.0 / 30
+                self._next_frame_time = time.monotonic()
+        return self
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def read(self, image=None):
+        """
+        :param image: preallocated frame (e.g. a SharedFrameRing slot) to decode into, reused
+                      when its size matches the source.
+        :return: (success, frame) like cv2.VideoCapture.read(); the frame's capture time is in self.timestamp.
+        """
+        if self.cap is None:
+            self.open()
+        success, frame = self.cap.read(image)
+        if not success and self.loop and self._is_file:
+            # keep file time increasing across laps
+            fps = self.cap.get(cv2.CAP_PROP_FPS)
+            self._loop_offset = self.timestamp + (1.0 / fps if fps > 0 else 1.0 / 30)
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, frame = self.cap.read(image)
+        if success:
+            if self._is_file:
+                self.timestamp = self._loop_offset + self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+            else:
+                self.timestamp = time.monotonic()
+        if self.realtime and success:
+            self._next_frame_time += self._frame_interval
+            delay = self._next_frame_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self._next_frame_time = time.monotonic()
+        return success, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def __iter__(self):
+        while True:
+            success, frame = self.read()
+            if not success:
+                break
+            yield frame
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class PiCameraSource:
+    """
+    Frame source over the Raspberry Pi camera. picamera is only imported when the
+    source is opened, so the package stays importable on other machines.
+    """
+
+    def __init__(self, width=640, height=480, framerate=10, warmup=0.1):
+        self.width = width
+        self.height = height
+        self.framerate = framerate
+        self.warmup = warmup
+        self.camera = None
+        self.raw_capture = None
+        self._stream = None
+
+    def open(self):
+        if self.camera is None:
+            from picamera import PiCamera
+            from picamera.array import PiRGBArray
+
+            self.camera = PiCamera()
+            self.camera.resolution = (self.width, self.height)
+            self.camera.framerate = self.framerate
+            self.raw_capture = PiRGBArray(self.camera, size=(self.width, self.height))
+            # allow the camera to warmup
+            time.sleep(self.warmup)
+        return self
+
+    def isOpened(self):
+        return self.camera is not None
+
+    def read(self, image=None):
+        """
+        :param image: unused, picamera fills its own buffer (SharedFrameRing.read_into copies it).
+        :return: (success, frame) like cv2.VideoCapture.read().
+        """
+        if self._stream is None:
+            self.open()
+            self._stream = self.camera.capture_continuous(
+                self.raw_capture, format="bgr", use_video_port=True
+            )
+        # clear the stream so it is ready for the next frame
+        self.raw_capture.truncate(0)
+        image_array = next(self._stream, None)
+        if image_array is None:
+            return False, None
+        return True, image_array.array
+
+    def release(self):
+        if self.camera is not None:
+            self.camera.close()
+            self.camera = None
+            self._stream = None
+
+    def __iter__(self):
+        while True:
+            success, frame = self.read()
+            if not success:
+                break
+            yield frame
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class ThreadedSource:
+    """
+    Reads another source (VideoSource, PiCameraSource) on a background thread and
+    keeps only the newest frame, so camera I/O never waits for processing and
+    processing never works on frames that queued up in the driver buffer.
+
+    Frames the consumer was too slow to pick up are dropped and counted. Meant for
+    live cameras; use the wrapped source directly for files that must not skip frames.
+    """
+
+    def __init__(self, source, timeout=2.0):
+        """
+        :param source: object with open(), read() and release(), e.g. VideoSource(0).
+        :param timeout: seconds read() waits for a new frame before reporting failure.
+        """
+        self.source = source
+        self.timeout = timeout
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._ended = False
+        self._frame = None
+        self._sequence = 0
+        self._frame_timestamp = 0.0
+        self._read_sequence = 0
+        # monotonic capture time and sequence number of the frame last returned by read()
+        self.timestamp = 0.0
+        self.sequence = 0
+        self.captured = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def open(self):
+        if self._thread is None:
+            self.source.open()
+            self._running = True
+            self._ended = False
+            self._thread = threading.Thread(target=self._reader, name="capture-reader", daemon=True)
+            self._thread.start()
+        return self
+
+    def isOpened(self):
+        return self.source.isOpened() and not self._ended
+
+    def _reader(self):
+        while self._running:
+            success, frame = self.source.read()
+            timestamp = time.monotonic()
+            with self._condition:
+                if not success:
+                    self._ended = True
+                    self._condition.notify_all()
+                    break
+                if self._sequence > self._read_sequence:
+                    self.dropped += 1
+                self._frame = frame
+                self._sequence += 1
+                self._frame_timestamp = timestamp
+                self.captured += 1
+                self._condition.notify_all()
+
+    def read(self, image=None):
+        """
+        Wait for a frame newer than the last one returned.
+        :param image: unused, frames belong to the reader thread (SharedFrameRing.read_into copies them).
+        :return: (success, frame) like cv2.VideoCapture.read(); the frame's capture time is in self.timestamp.
+        """
+        if self._thread is None:
+            self.open()
+        with self._condition:
+            self._condition.wait_for(lambda: self._ended or self._sequence > self._read_sequence, self.timeout)
+            if self._sequence <= self._read_sequence:
+                return False, None
+            self._read_sequence = self._sequence
+            self.sequence = self._sequence
+            self.timestamp = self._frame_timestamp
+            self.delivered += 1
+            return True, self._frame
+
+    def release(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout)
+            self._thread = None
+        self.source.release()
+
+    def stats(self):
+        """
+        :return: frame counters and the age (seconds) of the last frame returned by read().
+        """
+        with self._condition:
+            return {
+                "captured": self.captured,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "frame_age": time.monotonic() - self.timestamp if self.delivered else None,
+            }
+
+    def __iter__(self):
+        while True:
+            success, frame = self.read()
+            if not success:
+                break
+            yield frame
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.release()
@@ -0,0 +1,96 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from .process_pool import default_start_method
+from .roi_detector import RoiDetector
+
+
+def video_info(path):
+    """
+    :return: (frame count, fps) reported by the container, fps falls back to 30.
+    """
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            raise FileNotFoundError(f"Failed to open video {path}")
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS) or 30.0
+    finally:
+        cap.release()
+
+
+def video_size(path):
+    """
+    :return: (width, height) of the video's frames.
+    """
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            raise FileNotFoundError(f"Failed to open video {path}")
+        return int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        cap.release()
+
+
+def chunk_ranges(frame_count, chunk_frames):
+    """
+    Split [0, frame_count) into (start, end) ranges. The last range has end None and
+    reads to the real end of the file, container frame counts are often approximate.
+    """
+    chunk_frames = max(1, int(chunk_frames))
+    starts = list(range(0, max(frame_count, 1), chunk_frames))
+    return [(start, starts[index + 1] if index + 1 < len(starts) else None) for index, start in enumerate(starts)]
+
+
+def detect_chunk(path, start, end, fps, detector_options=None):
+    """
+    Seek to start and detect faces up to end (exclusive) with a fresh RoiDetector.
+    Runs in a worker process with its own VideoCapture.
+    :return: list of (frame index, time in seconds, faces) for the chunk.
+    """
+    cap = cv2.VideoCapture(path)
+    detector = RoiDetector(**(detector_options or {}))
+    detections = []
+    try:
+        index = 0
+        if start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            # some codecs land on the previous keyframe, trust where the decoder actually is
+            # and skip the frames before start
+            index = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+            while index < start and cap.grab():
+                index += 1
+        frame = None
+        while end is None or index < end:
+            success, frame = cap.read(frame)
+            if not success:
+                break
+            detections.append((index, index / fps, detector.update(frame)))
+            index += 1
+    finally:
+        cap.release()
+    return detections
+
+
+def detect_file_chunked(path, workers=None, chunk_seconds=60.0, detector_options=None, start_method=None):
+    """
+    Detect faces in a long video by processing time chunks in parallel processes.
+    Only the detections cross back, estimation that depends on the previous frames
+    (speed, smoothing) runs on the merged stream so chunk boundaries don't show.
+    :param workers: processes, None for the CPU count, 0 to detect the chunks one after
+                    another in this process.
+    :param chunk_seconds: length of one chunk, each chunk starts with a full-frame scan.
+    :return: generator of (frame index, time in seconds, faces) in frame order.
+    """
+    frame_count, fps = video_info(path)
+    ranges = chunk_ranges(frame_count, chunk_seconds * fps)
+    if workers == 0:
+        for start, end in ranges:
+            yield from detect_chunk(path, start, end, fps, detector_options)
+        return
+    context = multiprocessing.get_context(start_method or default_start_method())
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(detect_chunk, path, start, end, fps, detector_options) for start, end in ranges]
+        for future in futures:
+            yield from future.result()
@@ -0,0 +1,15 @@
+import os
+
+# repository root, where the cascade and the reference image live
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_CASCADE = "haarcascade_frontalface_default.xml"
+REF_IMAGE = os.path.join(REPO_DIR, "Ref_image.png")
+
+# distance from camera to face while capturing Ref_image.png, and real face width
+KNOWN_DISTANCE = 76.2  # centimeter
+KNOWN_WIDTH = 14.3  # centimeter
+
+# detectMultiScale parameters every script has been using
+SCALE_FACTOR = 1.3
+MIN_NEIGHBORS = 5
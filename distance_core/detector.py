@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from .config import REPO_DIR, DEFAULT_CASCADE, SCALE_FACTOR, MIN_NEIGHBORS
+from . import overlays
+
+# cascades are looked up in the repo root first, so scripts in sub folders don't need "../"
+CASCADE_DIR = REPO_DIR
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def resolve_cascade_path(name):
+    """
+    Find the cascade file: absolute paths are used as they are, relative names are
+    searched in the repo folder, the working directory, then OpenCV's bundled cascades.
+    :param name: file name or path of the Haar cascade XML.
+    :return: path to pass to cv2.CascadeClassifier.
+    """
+    if os.path.isabs(name):
+        return name
+    candidates = [os.path.join(CASCADE_DIR, name), os.path.abspath(name)]
+    cv2_data = getattr(cv2, "data", None)
+    if cv2_data is not None:
+        candidates.append(os.path.join(cv2_data.haarcascades, os.path.basename(name)))
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    return candidates[0]
+
+
+def get_cascade(name=DEFAULT_CASCADE):
+    """
+    Return the CascadeClassifier for name, parsing the XML only the first time it is
+    requested on the calling thread. Each thread gets its own classifier so
+    detectMultiScale can run concurrently without sharing internal buffers.
+    :param name: file name or path of the Haar cascade XML.
+    :return: loaded cv2.CascadeClassifier.
+    """
+    path = resolve_cascade_path(name)
+    cascades = getattr(_local, "cascades", None)
+    if cascades is None:
+        cascades = _local.cascades = {}
+
+    detector = cascades.get(path)
+    if detector is not None:
+        with _stats_lock:
+            _stats[path]["reuses"] += 1
+        return detector
+
+    start = time.perf_counter()
+    detector = cv2.CascadeClassifier(path)
+    load_time = time.perf_counter() - start
+    if detector.empty():
+        raise FileNotFoundError(f"Failed to load Haar cascade from {path}")
+    cascades[path] = detector
+
+    with _stats_lock:
+        entry = _stats.setdefault(path, {"loads": 0, "load_time": 0.0, "reuses": 0})
+        entry["loads"] += 1
+        entry["load_time"] += load_time
+    print(f"[INFO] Loaded cascade {os.path.basename(path)} in {round(load_time * 1000, 2)} ms "
+          f"on thread {threading.current_thread().name}")
+    return detector
+
+
+def cascade_stats():
+    """
+    :return: {path: {"loads", "load_time" (seconds, summed over threads), "reuses"}} for every cascade loaded so far.
+    """
+    with _stats_lock:
+        return {path: dict(entry) for path, entry in _stats.items()}
+
+
+def detect_faces(image, cascade=DEFAULT_CASCADE, scale_factor=SCALE_FACTOR, min_neighbors=MIN_NEIGHBORS, gray_image=None,
+                 min_size=None, max_size=None, detection_scale=1.0):
+    """
+    Run the Haar cascade on a BGR frame.
+    :param image: BGR frame.
+    :param cascade: cascade name or path, loaded through get_cascade().
+    :param gray_image: grayscale version of image if the caller already has one.
+    :param min_size: smallest face (w, h) to look for, in full-resolution pixels, None for no limit.
+    :param max_size: largest face (w, h) to look for, in full-resolution pixels, None for no limit.
+    :param detection_scale: run the cascade on a downsampled copy (e.g. 0.5, 0.25) and map the boxes
+                            back to full resolution. Faces smaller than 24 / detection_scale pixels are missed.
+    :return: faces as an N x 4 array of (x, y, w, h) in full-resolution pixels, empty tuple when nothing is found.
+    """
+    if gray_image is None:
+        gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if detection_scale != 1.0:
+        gray_image = cv2.resize(gray_image, None, fx=detection_scale, fy=detection_scale,
+                                interpolation=cv2.INTER_AREA)
+    size_limits = {}
+    if min_size is not None:
+        size_limits["minSize"] = tuple(int(v * detection_scale) for v in min_size)
+    if max_size is not None:
+        size_limits["maxSize"] = tuple(int(v * detection_scale) + 1 for v in max_size)
+    faces = get_cascade(cascade).detectMultiScale(gray_image, scale_factor, min_neighbors, **size_limits)
+    if detection_scale != 1.0 and len(faces):
+        faces = np.round(faces / detection_scale).astype(np.int32)
+    return faces
+
+
+def face_data(image, draw=True, color=overlays.WHITE, detector=None, faces=None):
+    """
+    Detect faces and return the width of the last one, like the original scripts did.
+    :param image: BGR frame, boxes are drawn on it when draw is True.
+    :param draw: draw a rectangle around every detected face.
+    :param detector: stateful detector with an update(image) method (SkipFrameDetector,
+                     RoiDetector), None to run the full cascade on every frame.
+    :param faces: boxes already detected elsewhere (e.g. by a DetectionPool), skips detection.
+    :return: width of the face in pixels, 0 when no face is found.
+    """
+    if faces is None:
+        faces = detect_faces(image) if detector is None else detector.update(image)
+    face_width = 0
+    for (x, y, w, h) in faces:
+        if draw:
+            overlays.draw_face_box(image, (x, y, w, h), color)
+        face_width = w
+    return face_width
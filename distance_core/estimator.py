@@ -0,0 +1,55 @@
+import cv2
+
+from .config import KNOWN_DISTANCE, KNOWN_WIDTH, REF_IMAGE
+from .detector import face_data
+
+
+def focal_length(measured_distance, real_width, width_in_rf_image):
+    """
+    Calculate the focal length (distance between lens and CMOS sensor) by triangle similarity.
+    :param measured_distance: distance from the object to the camera while capturing the reference image.
+    :param real_width: actual width of the object in the real world (e.g. 14.3 cm for a face).
+    :param width_in_rf_image: width of the object in the reference image, in pixels.
+    :return: focal length in pixels.
+    """
+    return (width_in_rf_image * measured_distance) / real_width
+
+
+def distance_finder(focal_length, real_face_width, face_width_in_frame):
+    """
+    Estimate the distance between object and camera.
+    :param focal_length: value returned by focal_length().
+    :param real_face_width: actual width of the object, same unit as the returned distance.
+    :param face_width_in_frame: width of the object in the frame, in pixels.
+    :return: estimated distance.
+    """
+    return (real_face_width * focal_length) / face_width_in_frame
+
+
+def speed_finder(covered_distance, time_taken):
+    """
+    :return: speed in distance units per time unit.
+    """
+    return covered_distance / time_taken
+
+
+def average_finder(values, number_of_items):
+    """
+    Average of the last number_of_items values of a list.
+    """
+    last_part = values[len(values) - number_of_items:]
+    return sum(last_part) / len(last_part)
+
+
+def reference_focal_length(ref_image_path=REF_IMAGE, measured_distance=KNOWN_DISTANCE, real_width=KNOWN_WIDTH):
+    """
+    Detect the face in the reference image and compute the focal length from it.
+    :return: (focal_length, ref_image) so scripts can still show the reference image.
+    """
+    ref_image = cv2.imread(ref_image_path)
+    if ref_image is None:
+        raise FileNotFoundError(f"Failed to read reference image {ref_image_path}")
+    ref_image_face_width = face_data(ref_image)
+    if ref_image_face_width == 0:
+        raise ValueError(f"No face found in reference image {ref_image_path}")
+    return focal_length(measured_distance, real_width, ref_image_face_width), ref_image
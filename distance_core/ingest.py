@@ -0,0 +1,251 @@
+import itertools
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from .calibration import FrameFocalLength
+from .config import KNOWN_WIDTH
+from .roi_detector import RoiDetector
+from .tracker import FaceTracker, face_records
+
+
+def print_alert(client, distance):
+    print(f"[ALERT] Client {client.client_id}: intruder detected at {round(distance, 2)} cm.")
+
+
+class IngestClient:
+    """
+    One remote camera (e.g. a browser tab) sending encoded frames. Only the newest
+    unprocessed frame is kept: a frame that arrives while the previous one still waits
+    for a worker replaces it, so a slow server never builds a backlog. Results are
+    kept the same way until the connection picks them up with results().
+    """
+
+    def __init__(self, client_id, focal_length, real_width=KNOWN_WIDTH, alert_distance_min=50, alert_distance_max=70,
+                 speech_interval=5, detection_scale=1.0, focal_size=None):
+        """
+        :param focal_size: (width, height) focal_length was fitted at, it is scaled to the size of
+                           the frames the client sends; None to use it as it is.
+        """
+        self.client_id = str(client_id)
+        self.frame_focal_length = FrameFocalLength(focal_length, focal_size)
+        self.focal_length = focal_length
+        self.real_width = real_width
+        self.speech_interval = speech_interval
+        self.set_alert_range(alert_distance_min, alert_distance_max)
+        # stateful per stream, only one worker handles a client at a time
+        self.detector = RoiDetector(detection_scale=detection_scale)
+        self.tracker = FaceTracker(focal_length, real_width)
+        self.last_alert_time = 0
+        self._condition = threading.Condition()
+        self._frame = None
+        self._frame_time = 0.0
+        self._frame_sequence = -1
+        self._scheduled = False
+        self._result = None
+        self._closed = False
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.undecodable = 0
+        self.results_sent = 0
+        self.results_dropped = 0
+        self.processing_time = 0.0
+
+    def set_alert_range(self, alert_distance_min, alert_distance_max):
+        if alert_distance_min >= alert_distance_max:
+            raise ValueError("Minimum distance must be less than maximum distance.")
+        self.alert_distance_min = alert_distance_min
+        self.alert_distance_max = alert_distance_max
+
+    def results(self, timeout=1.0):
+        """
+        Yield result dicts as they are ready, skipping results that were replaced by a
+        newer one before this loop got to them. Ends when the client is closed.
+        """
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._closed or self._result is not None, timeout)
+                if self._result is None:
+                    if self._closed:
+                        return
+                    continue
+                result, self._result = self._result, None
+                self.results_sent += 1
+            yield result
+
+    def _publish(self, result):
+        with self._condition:
+            if self._result is not None:
+                self.results_dropped += 1
+            self._result = result
+            self._condition.notify_all()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._frame = None
+            self._condition.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def stats(self):
+        with self._condition:
+            return {
+                "client": self.client_id,
+                "received": self.received,
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "undecodable": self.undecodable,
+                "results_sent": self.results_sent,
+                "results_dropped": self.results_dropped,
+                "mean_processing_ms": self.processing_time / self.processed * 1000 if self.processed else None,
+                "alert_distance_min": self.alert_distance_min,
+                "alert_distance_max": self.alert_distance_max,
+            }
+
+
+class FrameIngest:
+    """
+    Decodes and measures JPEG/WebP frames pushed by many remote clients on a shared
+    pool of worker threads (OpenCV releases the GIL while decoding and detecting).
+
+    submit() never blocks the connection that received the frame: it stores the frame
+    as the client's newest and queues the client once. A worker takes the newest frame
+    of a queued client, so each client has at most one frame in flight and stale
+    frames are dropped per client instead of delaying everyone. After each frame a
+    client that sent another one goes to the back of the queue, so an overloaded
+    server shares its workers round-robin.
+    """
+
+    def __init__(self, focal_length, workers=None, real_width=KNOWN_WIDTH, on_alert=print_alert, focal_size=None):
+        """
+        :param focal_length: focal length of the remote cameras in pixels.
+        :param focal_size: (width, height) focal_length was fitted at, scaled per client to its frame size.
+        :param workers: decode and detection threads, defaults to the number of CPUs.
+        :param on_alert: called as on_alert(client, distance) when a face enters a client's alert range.
+        """
+        self.focal_length = focal_length
+        self.focal_size = focal_size
+        self.real_width = real_width
+        self.on_alert = on_alert
+        self.workers = workers or os.cpu_count() or 1
+        self.clients = {}
+        self._lock = threading.Lock()
+        self._ready = queue.Queue()
+        self._ids = itertools.count(1)
+        self._threads = [threading.Thread(target=self._work, name=f"ingest-{index}", daemon=True)
+                         for index in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def connect(self, client_id=None, **options):
+        """
+        :param options: extra IngestClient arguments (alert range, detection_scale...).
+        :return: the new IngestClient.
+        """
+        client_id = next(self._ids) if client_id is None else client_id
+        options.setdefault("focal_size", self.focal_size)
+        client = IngestClient(client_id, self.focal_length, self.real_width, **options)
+        with self._lock:
+            if client.client_id in self.clients:
+                raise ValueError(f"Client {client.client_id} already connected.")
+            self.clients[client.client_id] = client
+        return client
+
+    def disconnect(self, client):
+        with self._lock:
+            self.clients.pop(client.client_id, None)
+        client.close()
+
+    def submit(self, client, data, timestamp=None):
+        """
+        Hand over one encoded frame, returns immediately.
+        :param data: JPEG or WebP bytes.
+        :param timestamp: capture time in seconds, the arrival time when None.
+        """
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with client._condition:
+            if client._closed:
+                return
+            if client._frame is not None:
+                client.dropped += 1
+            client._frame = data
+            client._frame_time = timestamp
+            client._frame_sequence = client.received
+            client.received += 1
+            schedule = not client._scheduled
+            client._scheduled = True
+        if schedule:
+            self._ready.put(client)
+
+    def _work(self):
+        while True:
+            client = self._ready.get()
+            if client is None:
+                break
+            with client._condition:
+                data, client._frame = client._frame, None
+                if data is None:
+                    client._scheduled = False
+                    continue
+                frame_time, sequence = client._frame_time, client._frame_sequence
+            try:
+                self._process(client, data, frame_time, sequence)
+            except Exception as error:
+                print(f"[ERROR] Client {client.client_id}: {error}")
+            # one frame per turn: a client with a newer frame waits behind the others (round-robin)
+            with client._condition:
+                if client._frame is None or client._closed:
+                    client._scheduled = False
+                    continue
+            self._ready.put(client)
+
+    def _process(self, client, data, frame_time, sequence):
+        start = time.perf_counter()
+        image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            client.undecodable += 1
+            return
+        faces = client.detector.update(image)
+        client.focal_length = client.tracker.focal_length = client.frame_focal_length((image.shape[1], image.shape[0]))
+        tracked = client.tracker.update(faces, timestamp=frame_time)
+        in_range = (tracked.distances >= client.alert_distance_min) & (tracked.distances <= client.alert_distance_max)
+        alert = bool(in_range.any())
+        current_time = time.time()
+        if alert and (current_time - client.last_alert_time) > client.speech_interval:
+            client.last_alert_time = current_time
+            self.on_alert(client, float(tracked.distances[in_range].min()))
+        client.processed += 1
+        client.processing_time += time.perf_counter() - start
+        client._publish({
+            "frame": sequence,
+            "width": image.shape[1],
+            "height": image.shape[0],
+            "faces": face_records(tracked),
+            "alert": alert,
+            "latency_ms": round((time.monotonic() - frame_time) * 1000, 1),
+            "dropped": client.dropped,
+        })
+
+    def stats(self):
+        with self._lock:
+            clients = list(self.clients.values())
+        return {"workers": self.workers, "queued": self._ready.qsize(),
+                "clients": {client.client_id: client.stats() for client in clients}}
+
+    def shutdown(self):
+        with self._lock:
+            clients = list(self.clients.values())
+        for client in clients:
+            self.disconnect(client)
+        for _ in self._threads:
+            self._ready.put(None)
+        for thread in self._threads:
+            thread.join()
@@ -0,0 +1,98 @@
+import threading
+import time
+
+
+class LazyResource:
+    """
+    A slow backend (camera, speech engine...) created on first use instead of at import,
+    so a server answers requests while its hardware is still opening.
+
+    get() creates it once, whichever thread asks first; warm_up() creates it on a
+    background thread so the first request doesn't wait. A factory that raises is
+    reported by state and stats() and tried again on the next get(). generation counts
+    reset() calls, so a long-running user (a capture loop) can notice the resource was
+    replaced and get() the new one.
+    """
+
+    def __init__(self, factory, name="resource"):
+        """
+        :param factory: called without arguments to create the resource.
+        """
+        self.factory = factory
+        self.name = name
+        self._lock = threading.Lock()
+        self._value = None
+        self._starting = False
+        self.error = None
+        self.create_time = None
+        self.generation = 0
+
+    def get(self):
+        """
+        :return: the resource, created now if needed (other callers wait for it).
+        """
+        value = self._value
+        if value is not None:
+            return value
+        with self._lock:
+            if self._value is None:
+                self._starting = True
+                start = time.perf_counter()
+                try:
+                    self._value = self.factory()
+                    self.error = None
+                except Exception as error:
+                    self.error = f"{type(error).__name__}: {error}"
+                    raise
+                finally:
+                    self._starting = False
+                    self.create_time = time.perf_counter() - start
+            return self._value
+
+    def warm_up(self):
+        """
+        Create the resource on a background thread, returns at once.
+        """
+        thread = threading.Thread(target=self._warm_up, name=f"warm-up-{self.name}", daemon=True)
+        thread.start()
+        return thread
+
+    def _warm_up(self):
+        try:
+            self.get()
+        except Exception as error:
+            print(f"[ERROR] Failed to start {self.name}: {error}")
+
+    def reset(self):
+        """
+        Forget the resource so the next get() creates a new one.
+        :return: the previous resource or None, for the caller to release.
+        """
+        with self._lock:
+            value, self._value = self._value, None
+            self.generation += 1
+            self.error = None
+            self.create_time = None
+        return value
+
+    @property
+    def ready(self):
+        return self._value is not None
+
+    @property
+    def state(self):
+        """
+        "ready", "starting", "failed" or "idle" (not requested yet). Never blocks.
+        """
+        if self._value is not None:
+            return "ready"
+        if self._starting:
+            return "starting"
+        return "failed" if self.error else "idle"
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "create_ms": self.create_time * 1000 if self.create_time is not None else None,
+            "error": self.error,
+        }
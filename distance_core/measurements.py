@@ -0,0 +1,168 @@
+import os
+import threading
+
+import numpy as np
+
+# one fixed-width little-endian record per face per frame
+MEASUREMENT_DTYPE = np.dtype([
+    ("timestamp", "<f8"),   # seconds, time.time() or the capture clock
+    ("camera", "S16"),
+    ("face_id", "<i4"),     # -1 when faces are not tracked
+    ("x", "<i4"),
+    ("y", "<i4"),
+    ("w", "<i4"),
+    ("h", "<i4"),
+    ("distance", "<f4"),    # cm
+    ("speed", "<f4"),       # cm/s, positive when approaching, NaN when unknown
+])
+MAGIC = b"DCMLOG01"
+HEADER = np.dtype([("magic", "S8"), ("record_size", "<u4"), ("reserved", "<u4")])
+
+
+class MeasurementWriter:
+    """
+    Append-only binary log of measurements. Records are buffered in a preallocated
+    array and written in blocks, so a long session costs a fixed amount of memory.
+    Appending to an existing log continues it. Safe to share between threads.
+
+    Records must be appended in time order for MeasurementLog.time_range().
+    """
+
+    def __init__(self, path, camera="0", flush_every=256):
+        """
+        :param camera: default camera name for append(), at most 16 bytes are kept.
+        :param flush_every: records buffered before they are written to disk.
+        """
+        self.path = path
+        self.camera = camera
+        self._buffer = np.zeros(flush_every, dtype=MEASUREMENT_DTYPE)
+        self._count = 0
+        self._lock = threading.Lock()
+        self.records_written = 0
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER.itemsize:
+            read_header(path)
+            self.file = open(path, "ab")
+        else:
+            self.file = open(path, "wb")
+            header = np.zeros((), dtype=HEADER)
+            header["magic"] = MAGIC
+            header["record_size"] = MEASUREMENT_DTYPE.itemsize
+            self.file.write(header.tobytes())
+
+    def append(self, timestamp, box, distance, speed=np.nan, face_id=-1, camera=None):
+        """
+        :param box: (x, y, w, h) of the face in pixels.
+        """
+        with self._lock:
+            record = self._buffer[self._count]
+            record["timestamp"] = timestamp
+            record["camera"] = (camera or self.camera).encode()[:16]
+            record["face_id"] = face_id
+            record["x"], record["y"], record["w"], record["h"] = box
+            record["distance"] = distance
+            record["speed"] = np.nan if speed is None else speed
+            self._count += 1
+            if self._count == len(self._buffer):
+                self._flush()
+
+    def append_batch(self, timestamp, boxes, distances, speeds=None, face_ids=None, camera=None):
+        """
+        Append every face of one frame.
+        :param boxes: N x 4 array of (x, y, w, h).
+        :param distances: N distances; speeds and face_ids are N values or None.
+        """
+        boxes = np.asarray(boxes).reshape(-1, 4)
+        records = np.zeros(len(boxes), dtype=MEASUREMENT_DTYPE)
+        records["timestamp"] = timestamp
+        records["camera"] = (camera or self.camera).encode()[:16]
+        records["face_id"] = -1 if face_ids is None else face_ids
+        records["x"], records["y"], records["w"], records["h"] = boxes.T
+        records["distance"] = distances
+        records["speed"] = np.nan if speeds is None else speeds
+        with self._lock:
+            copied = 0
+            while copied < len(records):
+                count = min(len(self._buffer) - self._count, len(records) - copied)
+                self._buffer[self._count:self._count + count] = records[copied:copied + count]
+                self._count += count
+                copied += count
+                if self._count == len(self._buffer):
+                    self._flush()
+
+    def _flush(self):
+        if self._count:
+            self._buffer[:self._count].tofile(self.file)
+            self.file.flush()
+            self.records_written += self._count
+            self._count = 0
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_header(path):
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if len(header) != 1 or header["magic"][0] != MAGIC:
+        raise ValueError(f"{path} is not a measurement log.")
+    if header["record_size"][0] != MEASUREMENT_DTYPE.itemsize:
+        raise ValueError(f"{path} has {header['record_size'][0]} byte records, expected {MEASUREMENT_DTYPE.itemsize}.")
+
+
+class MeasurementLog:
+    """
+    Memory-mapped reader of a log written by MeasurementWriter. Nothing is loaded
+    up front: time_range() binary-searches the timestamp column and only the pages
+    of the requested slice are read from disk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        read_header(path)
+        self.refresh()
+
+    def refresh(self):
+        """
+        Map the file again to see records appended since it was opened.
+        """
+        count = (os.path.getsize(self.path) - HEADER.itemsize) // MEASUREMENT_DTYPE.itemsize
+        if count:
+            self.records = np.memmap(self.path, dtype=MEASUREMENT_DTYPE, mode="r", offset=HEADER.itemsize,
+                                     shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=MEASUREMENT_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def time_range(self, start=None, end=None, camera=None):
+        """
+        Records with start <= timestamp < end, optionally for one camera.
+        :return: structured array (a view of the mapped file when camera is None).
+        """
+        timestamps = self.records["timestamp"]
+        first = 0 if start is None else np.searchsorted(timestamps, start, side="left")
+        last = len(timestamps) if end is None else np.searchsorted(timestamps, end, side="left")
+        records = self.records[first:last]
+        if camera is not None:
+            records = records[records["camera"] == camera.encode()[:16]]
+        return records
+
+    def span(self):
+        """
+        :return: (first timestamp, last timestamp), None for an empty log.
+        """
+        if not len(self.records):
+            return None
+        return float(self.records[0]["timestamp"]), float(self.records[-1]["timestamp"])
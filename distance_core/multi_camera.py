@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .batch import estimate_batch
+from .calibration import FrameFocalLength
+from .broadcast import FrameBroadcaster, JpegCache
+from .capture import ThreadedSource, VideoSource
+from .config import KNOWN_WIDTH
+from .roi_detector import RoiDetector
+from . import overlays
+
+
+def print_alert(camera, distance):
+    print(f"[ALERT] Camera {camera.camera_id}: intruder detected at {round(distance, 2)} cm.")
+
+
+class Camera:
+    """
+    One capture source with its own detector state, alert range and broadcast buffer.
+    Frames are processed one at a time per camera (the ROI detector is stateful), but
+    the processing itself runs on the manager's shared worker pool.
+    """
+
+    def __init__(self, camera_id, source, focal_length, real_width=KNOWN_WIDTH, alert_distance_min=50,
+                 alert_distance_max=70, speech_interval=5, detection_scale=1.0, loop=False, realtime=False,
+                 focal_size=None):
+        """
+        :param camera_id: name used in the routes, e.g. "front_door".
+        :param source: camera index, video file or RTSP/HTTP URL.
+        :param focal_length: focal length of this camera in pixels.
+        :param focal_size: (width, height) focal_length was fitted at, it is scaled to the size of
+                           the frames; None to use it as it is.
+        :param loop: for files, restart at the end (files as stand-in cameras).
+        :param realtime: for files, deliver frames at the file's frame rate.
+        """
+        self.camera_id = str(camera_id)
+        self.source = source
+        self.frame_focal_length = FrameFocalLength(focal_length, focal_size)
+        self.focal_length = focal_length
+        self.real_width = real_width
+        self.speech_interval = speech_interval
+        self.set_alert_range(alert_distance_min, alert_distance_max)
+        self.capture = ThreadedSource(VideoSource(source, loop=loop, realtime=realtime))
+        self.detector = RoiDetector(detection_scale=detection_scale)
+        self.broadcaster = FrameBroadcaster()
+        self.jpeg_cache = JpegCache()
+        self.on_alert = print_alert
+        self.last_alert_time = 0
+        self.last_distances = []
+        self.frames_processed = 0
+        self.processing_time = 0.0
+        self.running = False
+        self.dispatcher = None
+
+    def set_alert_range(self, alert_distance_min, alert_distance_max):
+        if alert_distance_min >= alert_distance_max:
+            raise ValueError("Minimum distance must be less than maximum distance.")
+        self.alert_distance_min = alert_distance_min
+        self.alert_distance_max = alert_distance_max
+
+    def process(self, frame):
+        """
+        Detect, estimate the distance of every face, draw, alert and publish one frame.
+        :return: distances of all faces found, in cm.
+        """
+        start = time.perf_counter()
+        faces = self.detector.update(frame)
+        self.focal_length = self.frame_focal_length((frame.shape[1], frame.shape[0]))
+        distances = estimate_batch(faces, self.focal_length, self.real_width).distances
+        for face, distance in zip(faces, distances):
+            overlays.draw_face_box(frame, face)
+            overlays.draw_distance_text(frame, distance, (int(face[0]), max(int(face[1]) - 6, 12)), scaling=0.5)
+
+        in_range = distances[(distances >= self.alert_distance_min) & (distances <= self.alert_distance_max)]
+        current_time = time.time()
+        if len(in_range) and (current_time - self.last_alert_time) > self.speech_interval:
+            self.last_alert_time = current_time
+            self.on_alert(self, float(in_range.min()))
+
+        self.broadcaster.publish(frame)
+        self.last_distances = [round(float(distance), 2) for distance in distances]
+        self.frames_processed += 1
+        self.processing_time += time.perf_counter() - start
+        return distances
+
+    def stats(self):
+        return {
+            "source": str(self.source),
+            "running": self.running,
+            "focal_length": round(self.focal_length, 1),
+            "frames_processed": self.frames_processed,
+            "mean_processing_ms": self.processing_time / self.frames_processed * 1000 if self.frames_processed else None,
+            "alert_distance_min": self.alert_distance_min,
+            "alert_distance_max": self.alert_distance_max,
+            "distances": self.last_distances,
+            "viewers": self.broadcaster.subscribers,
+            "capture": self.capture.stats(),
+            "detector": self.detector.stats(),
+        }
+
+
+class CameraManager:
+    """
+    Runs many cameras in one process. Each camera has a light dispatcher thread that
+    waits for its newest frame and hands it to a shared worker pool sized to the CPU
+    count; OpenCV releases the GIL while detecting, so the pool uses all cores.
+    """
+
+    def __init__(self, focal_length, workers=None, focal_size=None):
+        """
+        :param focal_length: default focal length for cameras added without their own.
+        :param workers: size of the detection pool, defaults to the number of CPUs.
+        :param focal_size: (width, height) the default focal length was fitted at.
+        """
+        self.focal_length = focal_length
+        self.focal_size = focal_size
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="detect")
+        self.cameras = {}
+        self._lock = threading.Lock()
+
+    def add_camera(self, camera_id, source, focal_length=None, focal_size=None, **options):
+        """
+        Open a source and start processing it.
+        :param focal_size: (width, height) focal_length was fitted at.
+        :param options: extra Camera arguments (alert range, detection_scale, loop, realtime...).
+        :return: the new Camera.
+        """
+        if focal_length is None:
+            focal_length, focal_size = self.focal_length, self.focal_size
+        camera = Camera(camera_id, source, focal_length, focal_size=focal_size, **options)
+        with self._lock:
+            if camera.camera_id in self.cameras:
+                raise ValueError(f"Camera {camera.camera_id} already exists.")
+            self.cameras[camera.camera_id] = camera
+        camera.capture.open()
+        camera.running = True
+        camera.dispatcher = threading.Thread(target=self._dispatch, args=(camera,),
+                                             name=f"camera-{camera.camera_id}", daemon=True)
+        camera.dispatcher.start()
+        print(f"[INFO] Camera {camera.camera_id} started on {source}.")
+        return camera
+
+    def _dispatch(self, camera):
+        while camera.running:
+            success, frame = camera.capture.read()
+            if not success:
+                if camera.capture.isOpened():
+                    continue  # no new frame within the timeout, keep waiting
+                print(f"[ERROR] Camera {camera.camera_id}: failed to read frame from {camera.source}.")
+                break
+            # one frame in flight per camera, the pool is shared by all cameras
+            self.pool.submit(camera.process, frame).result()
+        camera.running = False
+        camera.broadcaster.close()
+
+    def get(self, camera_id):
+        with self._lock:
+            return self.cameras.get(str(camera_id))
+
+    def remove_camera(self, camera_id):
+        with self._lock:
+            camera = self.cameras.pop(str(camera_id), None)
+        if camera is not None:
+            camera.running = False
+            camera.capture.release()
+            camera.broadcaster.close()
+            print(f"[INFO] Camera {camera.camera_id} removed.")
+        return camera
+
+    def stats(self):
+        with self._lock:
+            cameras = list(self.cameras.values())
+        return {"workers": self.workers, "cameras": {camera.camera_id: camera.stats() for camera in cameras}}
+
+    def shutdown(self):
+        for camera_id in list(self.cameras):
+            self.remove_camera(camera_id)
+        self.pool.shutdown(wait=True)
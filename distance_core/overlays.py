@@ -0,0 +1,69 @@
+import cv2
+
+# Colors  >>> BGR Format(BLUE, GREEN, RED)
+GREEN = (0, 255, 0)
+RED = (0, 0, 255)
+BLACK = (0, 0, 0)
+YELLOW = (0, 255, 255)
+WHITE = (255, 255, 255)
+CYAN = (255, 255, 0)
+MAGENTA = (255, 0, 242)
+ORANGE = (0, 69, 255)
+
+fonts = cv2.FONT_HERSHEY_COMPLEX
+
+
+def draw_face_box(image, face, color=WHITE, thickness=1):
+    """
+    Draw a plain rectangle around a face.
+    :param face: (x, y, w, h) as returned by detectMultiScale.
+    """
+    x, y, w, h = (int(v) for v in face)
+    cv2.rectangle(image, (x, y), (x + w, y + h), color, thickness)
+
+
+def draw_face_corners(image, face, color=GREEN, line_thickness=2):
+    """
+    Draw the open-corner face frame used by Updated_distance.py and the speed scripts.
+    :param face: (x, y, w, h) as returned by detectMultiScale.
+    """
+    x, y, w, h = (int(v) for v in face)
+    LLV = int(h * 0.12)
+    cv2.line(image, (x, y + LLV), (x + w, y + LLV), color, line_thickness)
+    cv2.line(image, (x, y + h), (x + w, y + h), color, line_thickness)
+    cv2.line(image, (x, y + LLV), (x, y + LLV + LLV), color, line_thickness)
+    cv2.line(image, (x + w, y + LLV), (x + w, y + LLV + LLV), color, line_thickness)
+    cv2.line(image, (x, y + h), (x, y + h - LLV), color, line_thickness)
+    cv2.line(image, (x + w, y + h), (x + w, y + h - LLV), color, line_thickness)
+
+
+def draw_distance_bar(image, face, distance_level):
+    """
+    Draw the call-out bar above a face whose green fill follows the distance.
+    :param face: (x, y, w, h) as returned by detectMultiScale.
+    :param distance_level: fill length in pixels, clamped to at least 10.
+    """
+    x, y = int(face[0]), int(face[1])
+    distance_level = max(int(distance_level), 10)
+    cv2.line(image, (x, y - 11), (x + 180, y - 11), ORANGE, 28)
+    cv2.line(image, (x, y - 11), (x + 180, y - 11), YELLOW, 20)
+    cv2.line(image, (x, y - 11), (x + distance_level, y - 11), GREEN, 18)
+
+
+def draw_distance_text(image, distance, position=(50, 50), unit="CM", scaling=1, color=WHITE, thickness=2):
+    """
+    Write "Distance = <distance> <unit>" on the frame.
+    """
+    cv2.putText(image, f"Distance = {round(distance, 2)} {unit}", position, fonts, scaling, color, thickness)
+
+
+def text_with_outline(image, text, position, font=cv2.FONT_HERSHEY_SIMPLEX, scaling=1,
+                      text_color=GREEN, thickness=1, bg_color=BLACK):
+    """
+    Write text on a filled box with an outline (same look as AiPhile.textBGoutline).
+    """
+    x, y = position
+    (w, h), p = cv2.getTextSize(text, font, scaling, thickness)
+    cv2.rectangle(image, (x - p, y + p), (x + w + p, y - h - p), bg_color, -1)
+    cv2.rectangle(image, (x - p, y + p), (x + w + p, y - h - p), text_color, thickness, cv2.LINE_AA)
+    cv2.putText(image, text, position, font, scaling, text_color, thickness, cv2.LINE_AA)
@@ -0,0 +1,198 @@
+import multiprocessing
+import os
+from multiprocessing import resource_tracker
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from .config import DEFAULT_CASCADE, SCALE_FACTOR, MIN_NEIGHBORS
+from .detector import detect_faces, get_cascade
+from .shared_frames import SharedFrameRing
+
+# rings attached by this worker process, keyed by shared memory name
+_worker_rings = {}
+
+
+def _worker_ring(name, slots, shape, dtype):
+    ring = _worker_rings.get(name)
+    if ring is None:
+        # a new ring means the pool was resized for a new frame size, drop the old ones
+        for old in _worker_rings.values():
+            old.close()
+        _worker_rings.clear()
+        ring = _worker_rings[name] = SharedFrameRing(slots, shape, dtype, name=name)
+    return ring
+
+
+def _detect_slot(ring_description, slot, cascade, scale_factor, min_neighbors, detection_scale):
+    """
+    Worker side: run the cascade on the grayscale frame stored in slot.
+    """
+    gray_image = _worker_ring(*ring_description).array(slot)
+    faces = detect_faces(None, cascade, scale_factor, min_neighbors, gray_image, detection_scale=detection_scale)
+    return np.asarray(faces, dtype=np.int32).reshape(-1, 4)
+
+
+def _warm_up(cascade):
+    get_cascade(cascade)
+    return os.getpid()
+
+
+def default_start_method():
+    """
+    fork where available: spawn and forkserver re-import the main script in every
+    worker, and flask_server.py creates its pool at module level, outside any
+    __main__ guard. Forking is safe because the pools are started before any other
+    thread exists (capture, alerts), so no lock is copied while held.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return "fork" if "fork" in methods else methods[0]
+
+
+class DetectionPool:
+    """
+    Full-frame face detection on a pool of worker processes, so the cascade uses
+    every core instead of one GIL-bound thread.
+
+    submit() converts the frame to grayscale directly into a shared memory slot and
+    only the slot index crosses the process boundary. Results come back from
+    results() in submission order, together with the payload given to submit()
+    (usually the color frame, which never leaves this process).
+
+    Meant to be driven from one thread. Detection is stateless here; ROI and skip-frame
+    detectors depend on the previous frame and stay in-process.
+    """
+
+    def __init__(self, workers=None, max_in_flight=None, cascade=DEFAULT_CASCADE, scale_factor=SCALE_FACTOR,
+                 min_neighbors=MIN_NEIGHBORS, detection_scale=1.0, start_method=None):
+        """
+        :param workers: number of detector processes, defaults to the number of CPUs.
+        :param max_in_flight: frames submitted but not yet collected, defaults to twice the workers.
+                              submit() waits for the oldest frame once the limit is reached.
+        :param detection_scale: downsample factor applied inside the workers, see detect_faces().
+        :param start_method: multiprocessing start method, see default_start_method().
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or 2 * self.workers
+        self.cascade = cascade
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.detection_scale = detection_scale
+        # start the tracker before any worker exists so they all share it, otherwise a
+        # worker's own tracker unlinks the shared frames when the worker exits
+        resource_tracker.ensure_running()
+        context = multiprocessing.get_context(start_method or default_start_method())
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        self.ring = None
+        self._sequence = 0
+        self._in_flight = deque()
+        self._ready = deque()
+        self.submitted = 0
+        self.completed = 0
+
+    def warm_up(self):
+        """
+        Start every worker and load the cascade in it. Call before starting other
+        threads when using fork, and to keep the load time out of the first frames.
+        :return: process ids of the workers.
+        """
+        futures = [self.pool.submit(_warm_up, self.cascade) for _ in range(self.workers)]
+        return sorted({future.result() for future in futures})
+
+    def _ensure_ring(self, shape):
+        if self.ring is not None and self.ring.shape == shape:
+            return
+        # frame size changed (or first frame): collect what is in flight, then reallocate
+        while self._in_flight:
+            self._collect_oldest()
+        if self.ring is not None:
+            self.ring.close()
+        self.ring = SharedFrameRing(self.max_in_flight, shape)
+
+    def _collect_oldest(self):
+        sequence, slot, payload, future = self._in_flight.popleft()
+        try:
+            faces = future.result()
+        finally:
+            self.ring.release(slot)
+        self.completed += 1
+        self._ready.append((sequence, payload, faces))
+
+    def submit(self, image, payload=None, gray_image=None):
+        """
+        Queue one frame for detection.
+        :param image: BGR frame, ignored when gray_image is given.
+        :param payload: anything to get back with the result, e.g. the frame itself.
+        :return: sequence number of the frame.
+        """
+        shape = gray_image.shape if gray_image is not None else image.shape[:2]
+        self._ensure_ring(shape)
+        slot = self.ring.acquire()
+        while slot is None:
+            self._collect_oldest()
+            slot = self.ring.acquire()
+        if gray_image is None:
+            cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=self.ring.array(slot))
+        else:
+            self.ring.write(slot, gray_image)
+
+        self._sequence += 1
+        future = self.pool.submit(_detect_slot, self.ring.describe(), slot, self.cascade, self.scale_factor,
+                                  self.min_neighbors, self.detection_scale)
+        self._in_flight.append((self._sequence, slot, payload, future))
+        self.submitted += 1
+        return self._sequence
+
+    def results(self, wait=False):
+        """
+        Yield (sequence, payload, faces) in submission order. Stops at the first frame
+        still being processed, unless wait is True, then everything submitted is returned.
+        """
+        while self._in_flight and (wait or self._in_flight[0][3].done()):
+            self._collect_oldest()
+        while self._ready:
+            yield self._ready.popleft()
+
+    def map(self, frames):
+        """
+        Detect faces in every frame of an iterable, keeping all workers busy.
+        :return: generator of (frame, faces) in the original order.
+        """
+        for frame in frames:
+            self.submit(frame, payload=frame)
+            for _, ready_frame, faces in self.results():
+                yield ready_frame, faces
+        for _, ready_frame, faces in self.results(wait=True):
+            yield ready_frame, faces
+
+    @property
+    def pending(self):
+        return len(self._in_flight) + len(self._ready)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "max_in_flight": self.max_in_flight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "in_flight": len(self._in_flight),
+            "ring": self.ring.stats() if self.ring is not None else None,
+        }
+
+    def close(self):
+        for *_, future in self._in_flight:
+            future.cancel()
+        self._in_flight.clear()
+        self._ready.clear()
+        self.pool.shutdown(wait=True)
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,86 @@
+import csv
+import json
+import os
+
+# one row per face per frame; speed is None when it can't be measured yet
+RESULT_FIELDS = ("source", "frame", "time", "face", "track", "x", "y", "w", "h", "distance", "speed")
+# column types for formats that store them, anything not listed is a string
+RESULT_TYPES = {"frame": "int64", "time": "float64", "face": "int64", "track": "int64", "x": "int64", "y": "int64",
+                "w": "int64", "h": "int64", "distance": "float64", "speed": "float64"}
+
+
+class CsvWriter:
+    def __init__(self, path, fields=RESULT_FIELDS):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=fields)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlWriter:
+    def __init__(self, path, fields=RESULT_FIELDS):
+        self.file = open(path, "w")
+        self.fields = fields
+
+    def write(self, row):
+        self.file.write(json.dumps({field: row.get(field) for field in self.fields}) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """
+    Buffers rows column by column and writes one row group every batch_rows rows,
+    so memory stays flat however long the footage is. Needs pyarrow.
+    """
+
+    def __init__(self, path, fields=RESULT_FIELDS, batch_rows=65536):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as error:
+            raise ImportError("Writing .parquet results needs pyarrow: pip install pyarrow") from error
+        self.pa = pyarrow
+        self.fields = fields
+        self.batch_rows = batch_rows
+        self.schema = pyarrow.schema([(field, RESULT_TYPES.get(field, "string")) for field in fields])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        self.columns = {field: [] for field in fields}
+        self.rows = 0
+
+    def write(self, row):
+        for field in self.fields:
+            self.columns[field].append(row.get(field))
+        self.rows += 1
+        if self.rows >= self.batch_rows:
+            self._flush()
+
+    def _flush(self):
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pydict(self.columns, schema=self.schema))
+            self.columns = {field: [] for field in self.fields}
+            self.rows = 0
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+WRITERS = {".csv": CsvWriter, ".jsonl": JsonlWriter, ".parquet": ParquetWriter}
+
+
+def open_results(path, fields=RESULT_FIELDS):
+    """
+    Writer for per-frame results, format chosen by extension (.csv, .jsonl, .parquet).
+    :return: object with write(row dict) and close().
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"Unsupported results format {extension!r}, use one of {', '.join(WRITERS)}.")
+    return WRITERS[extension](path, fields)
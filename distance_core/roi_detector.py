@@ -0,0 +1,127 @@
+import cv2
+import numpy as np
+
+from .config import DEFAULT_CASCADE, SCALE_FACTOR, MIN_NEIGHBORS
+from .detector import detect_faces
+
+
+def box_iou(first, second):
+    """
+    Intersection over union of two (x, y, w, h) boxes.
+    """
+    x0 = max(first[0], second[0])
+    y0 = max(first[1], second[1])
+    x1 = min(first[0] + first[2], second[0] + second[2])
+    y1 = min(first[1] + first[3], second[1] + second[3])
+    intersection = max(0, x1 - x0) * max(0, y1 - y0)
+    union = first[2] * first[3] + second[2] * second[3] - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+class RoiDetector:
+    """
+    Incremental face detection: once faces are known, the next frame only searches a
+    padded region around each previous box, for faces close to the previous width.
+    The whole frame is scanned again every full_scan_every frames, and immediately
+    when a previously seen face is not found in its region.
+    """
+
+    def __init__(self, padding=0.5, size_tolerance=0.3, full_scan_every=15, cascade=DEFAULT_CASCADE,
+                 scale_factor=SCALE_FACTOR, min_neighbors=MIN_NEIGHBORS, roi_scale_factor=1.1, detection_scale=1.0):
+        """
+        :param padding: region margin around the previous box, as a fraction of its width/height.
+        :param size_tolerance: search faces between (1 - tol) and (1 + tol) times the previous width.
+        :param full_scan_every: full-frame scan at least every this many frames, catches new faces.
+        :param roi_scale_factor: finer pyramid step used inside regions, affordable because the size range is narrow.
+        :param detection_scale: downsample factor for full-frame scans, see detect_faces(). Regions are
+                                searched at full resolution since they are already small.
+        """
+        self.padding = padding
+        self.size_tolerance = size_tolerance
+        self.full_scan_every = max(1, int(full_scan_every))
+        self.cascade = cascade
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.roi_scale_factor = roi_scale_factor
+        self.detection_scale = detection_scale
+        self.reset()
+
+    def reset(self):
+        self._boxes = np.empty((0, 4), dtype=np.int32)
+        self._frames_since_full_scan = 0
+        self.frames = 0
+        self.full_scans = 0
+        self.roi_scans = 0
+        self.misses = 0
+        self.scanned_pixels = 0
+        self.frame_pixels = 0
+
+    def update(self, image, gray_image=None):
+        """
+        :param image: BGR frame.
+        :param gray_image: grayscale version of image if the caller already has one.
+        :return: faces as an N x 4 int32 array of (x, y, w, h), like detectMultiScale.
+        """
+        if gray_image is None:
+            gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        self.frames += 1
+        self.frame_pixels += gray_image.size
+
+        faces = None
+        if len(self._boxes) and self._frames_since_full_scan + 1 < self.full_scan_every:
+            faces = self._search_regions(gray_image)
+            if faces is None:
+                self.misses += 1
+
+        if faces is None:
+            faces = np.asarray(
+                detect_faces(image, self.cascade, self.scale_factor, self.min_neighbors, gray_image,
+                             detection_scale=self.detection_scale),
+                dtype=np.int32,
+            ).reshape(-1, 4)
+            self.full_scans += 1
+            self.scanned_pixels += gray_image.size
+            self._frames_since_full_scan = 0
+        else:
+            self._frames_since_full_scan += 1
+
+        self._boxes = faces
+        return faces
+
+    def _search_regions(self, gray_image):
+        """
+        :return: faces found around the previous boxes, None as soon as one previous face is missing.
+        """
+        height, width = gray_image.shape[:2]
+        found = []
+        for (x, y, w, h) in self._boxes:
+            pad_x, pad_y = int(w * self.padding), int(h * self.padding)
+            x0, y0 = max(x - pad_x, 0), max(y - pad_y, 0)
+            x1, y1 = min(x + w + pad_x, width), min(y + h + pad_y, height)
+            region = gray_image[y0:y1, x0:x1]
+            min_side = max(int(w * (1 - self.size_tolerance)), 1)
+            max_side = int(w * (1 + self.size_tolerance)) + 1
+            self.roi_scans += 1
+            self.scanned_pixels += region.size
+            faces = detect_faces(None, self.cascade, self.roi_scale_factor, self.min_neighbors, region,
+                                 min_size=(min_side, min_side), max_size=(max_side, max_side))
+            if len(faces) == 0:
+                return None
+            # keep the candidate closest in size to the previous box
+            best = min(faces, key=lambda face: abs(int(face[2]) - int(w)))
+            candidate = (best[0] + x0, best[1] + y0, best[2], best[3])
+            if not any(box_iou(candidate, other) > 0.3 for other in found):
+                found.append(candidate)
+        return np.asarray(found, dtype=np.int32).reshape(-1, 4)
+
+    def stats(self):
+        """
+        :return: scan counters and the fraction of frame pixels actually scanned by the cascade.
+        """
+        return {
+            "frames": self.frames,
+            "full_scans": self.full_scans,
+            "roi_scans": self.roi_scans,
+            "misses": self.misses,
+            "scanned_fraction": self.scanned_pixels / self.frame_pixels if self.frame_pixels else 0.0,
+        }
@@ -0,0 +1,123 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedFrameRing:
+    """
+    Fixed number of preallocated frames of one shape in a single shared memory block.
+    Processes exchange slot indices instead of pickling arrays; every process sees the
+    same pixels through array(slot).
+
+    Pipeline stages write into slots in place (decode with read_into(), convert with
+    cv2.cvtColor(..., dst=ring.array(slot))) and hand the slot index on. write() and
+    read_into() count every full-frame copy and every frame the source allocated itself,
+    so stats() shows how close a pipeline gets to zero allocations per frame.
+    """
+
+    def __init__(self, slots, shape, dtype=np.uint8, name=None):
+        """
+        :param slots: number of frames in the ring.
+        :param shape: shape of one frame, e.g. (480, 640) or (480, 640, 3).
+        :param name: attach to an existing ring created by another process, None to create one.
+        """
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.owner = name is None
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=self.frame_bytes * slots)
+        else:
+            self.memory = attach_shared_memory(name)
+        self.name = self.memory.name
+        self._frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self.memory.buf)
+        self._free = list(range(slots - 1, -1, -1))
+        # the ring itself is the only allocation when every stage works in place
+        self.allocations = 1
+        self.copies = 0
+        self.frames = 0
+
+    def array(self, slot):
+        """
+        :return: NumPy view of the frame in slot (no copy).
+        """
+        return self._frames[slot]
+
+    def acquire(self):
+        """
+        :return: index of a free slot, None when every slot is in use.
+        """
+        if not self._free:
+            return None
+        self.frames += 1
+        return self._free.pop()
+
+    def release(self, slot):
+        self._free.append(slot)
+
+    @property
+    def free_slots(self):
+        return len(self._free)
+
+    def write(self, slot, frame):
+        """
+        Copy a frame produced outside the ring into slot. Prefer writing in place.
+        :return: the slot's array.
+        """
+        target = self._frames[slot]
+        np.copyto(target, frame)
+        self.copies += 1
+        return target
+
+    def read_into(self, slot, source):
+        """
+        Read the next frame of source straight into slot.
+        :param source: object whose read(image) fills image when it can (VideoSource, cv2.VideoCapture).
+        :return: (success, slot array).
+        """
+        target = self._frames[slot]
+        success, frame = source.read(target)
+        if success and not np.shares_memory(frame, target):
+            # the source decoded into its own buffer (other size, ThreadedSource...)
+            self.allocations += 1
+            self.write(slot, frame)
+        return success, target
+
+    def stats(self):
+        """
+        :return: frame, copy and allocation counters, per frame acquired.
+        """
+        return {
+            "slots": self.slots,
+            "frame_bytes": self.frame_bytes,
+            "frames": self.frames,
+            "copies": self.copies,
+            "allocations": self.allocations,
+            "copies_per_frame": self.copies / self.frames if self.frames else 0.0,
+            "allocations_per_frame": self.allocations / self.frames if self.frames else 0.0,
+        }
+
+    def describe(self):
+        """
+        :return: (name, slots, shape, dtype string), enough for another process to attach.
+        """
+        return self.name, self.slots, self.shape, self.dtype.str
+
+    def close(self):
+        self._frames = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def attach_shared_memory(name):
+    """
+    Attach to a block created by another process; only the creator unlinks it.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track argument. multiprocessing children share the
+        # parent's resource tracker, so registering the same name again is harmless.
+        return shared_memory.SharedMemory(name=name)
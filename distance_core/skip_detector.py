@@ -0,0 +1,180 @@
+import cv2
+import numpy as np
+
+from .config import DEFAULT_CASCADE
+from .detector import detect_faces
+
+# OpenCV trackers that can be used instead of optical flow, when the build has them
+OPENCV_TRACKERS = ("KCF", "CSRT", "MOSSE", "MIL")
+
+
+def create_opencv_tracker(name):
+    """
+    Create an OpenCV single-object tracker by name, looking in cv2 and cv2.legacy
+    (KCF, CSRT and MOSSE need opencv-contrib-python).
+    :param name: one of OPENCV_TRACKERS.
+    :return: tracker object with init(image, box) and update(image).
+    """
+    factory_name = f"Tracker{name}_create"
+    for module in (cv2, getattr(cv2, "legacy", None)):
+        factory = getattr(module, factory_name, None)
+        if factory is not None:
+            return factory()
+    raise ValueError(f"OpenCV tracker {name} is not available in this OpenCV build, "
+                     f"install opencv-contrib-python or use tracker='flow'")
+
+
+class SkipFrameDetector:
+    """
+    Runs the Haar cascade only every detect_every frames, or sooner when tracking
+    confidence drops, and moves the face boxes with a cheap tracker in between.
+
+    The default "flow" tracker follows corner features inside each box with pyramidal
+    Lucas-Kanade optical flow and updates both position and size, so face widths (and
+    therefore distances) keep changing between detections.
+    """
+
+    def __init__(self, detect_every=5, min_confidence=0.5, tracker="flow", cascade=DEFAULT_CASCADE,
+                 scale_factor=1.3, min_neighbors=5, detection_scale=1.0):
+        """
+        :param detect_every: run the cascade at least once every this many frames (1 = every frame).
+        :param min_confidence: re-detect as soon as any tracked box falls below this confidence (0-1).
+        :param tracker: "flow" for optical flow, or one of OPENCV_TRACKERS.
+        :param detection_scale: downsample factor for the cascade, see detect_faces().
+        """
+        if tracker != "flow" and tracker not in OPENCV_TRACKERS:
+            raise ValueError(f"Unknown tracker {tracker}, use 'flow' or one of {OPENCV_TRACKERS}")
+        self.detect_every = max(1, int(detect_every))
+        self.min_confidence = min_confidence
+        self.tracker = tracker
+        self.cascade = cascade
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.detection_scale = detection_scale
+        self.reset()
+
+    def reset(self):
+        self._boxes = np.empty((0, 4), dtype=np.float64)
+        self._previous_gray = None
+        self._opencv_trackers = []
+        self._frames_since_detection = 0
+        self.confidence = 1.0
+        self.frames = 0
+        self.detections = 0
+        self.forced_detections = 0
+
+    def update(self, image, gray_image=None):
+        """
+        :param image: BGR frame.
+        :param gray_image: grayscale version of image if the caller already has one.
+        :return: faces as an N x 4 int32 array of (x, y, w, h), like detectMultiScale.
+        """
+        if gray_image is None:
+            gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        self.frames += 1
+
+        detect = self._previous_gray is None or self._frames_since_detection + 1 >= self.detect_every
+        if not detect and len(self._boxes):
+            boxes, confidences = self._track(image, gray_image)
+            self.confidence = float(confidences.min())
+            if self.confidence < self.min_confidence:
+                detect = True
+                self.forced_detections += 1
+            else:
+                self._boxes = self._clip(boxes, gray_image.shape)
+
+        if detect:
+            faces = detect_faces(image, self.cascade, self.scale_factor, self.min_neighbors, gray_image,
+                                 detection_scale=self.detection_scale)
+            self._boxes = np.asarray(faces, dtype=np.float64).reshape(-1, 4)
+            self._frames_since_detection = 0
+            self.confidence = 1.0
+            self.detections += 1
+            if self.tracker != "flow":
+                self._opencv_trackers = []
+                for box in self._boxes:
+                    opencv_tracker = create_opencv_tracker(self.tracker)
+                    opencv_tracker.init(image, tuple(int(v) for v in box))
+                    self._opencv_trackers.append(opencv_tracker)
+        else:
+            self._frames_since_detection += 1
+
+        self._previous_gray = gray_image
+        return np.round(self._boxes).astype(np.int32)
+
+    def _track(self, image, gray_image):
+        if self.tracker != "flow":
+            boxes = []
+            confidences = []
+            for opencv_tracker, box in zip(self._opencv_trackers, self._boxes):
+                ok, new_box = opencv_tracker.update(image)
+                boxes.append(new_box if ok else box)
+                confidences.append(1.0 if ok else 0.0)
+            return np.asarray(boxes, dtype=np.float64).reshape(-1, 4), np.asarray(confidences)
+
+        boxes = self._boxes.copy()
+        confidences = np.zeros(len(boxes))
+        for index, (x, y, w, h) in enumerate(self._boxes):
+            shift, scale, confidences[index] = track_box_flow(self._previous_gray, gray_image, (x, y, w, h))
+            if confidences[index] > 0:
+                center_x = x + w / 2 + shift[0]
+                center_y = y + h / 2 + shift[1]
+                boxes[index] = (center_x - w * scale / 2, center_y - h * scale / 2, w * scale, h * scale)
+        return boxes, confidences
+
+    @staticmethod
+    def _clip(boxes, shape):
+        height, width = shape[:2]
+        boxes[:, 0] = np.clip(boxes[:, 0], 0, width - 1)
+        boxes[:, 1] = np.clip(boxes[:, 1], 0, height - 1)
+        return boxes
+
+    def stats(self):
+        """
+        :return: frames seen, cascade runs, runs forced by low confidence, and the fraction of frames detected.
+        """
+        return {
+            "frames": self.frames,
+            "detections": self.detections,
+            "forced_detections": self.forced_detections,
+            "detection_ratio": self.detections / self.frames if self.frames else 0.0,
+        }
+
+
+def track_box_flow(previous_gray, gray_image, box, max_points=40, max_fb_error=1.0):
+    """
+    Follow one box from previous_gray to gray_image with Lucas-Kanade optical flow.
+    :param box: (x, y, w, h) in previous_gray.
+    :return: ((dx, dy), scale, confidence), confidence is the share of feature points
+             that survived the forward-backward check, 0 when the box could not be tracked.
+    """
+    x, y, w, h = (int(round(v)) for v in box)
+    height, width = previous_gray.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, width), min(y + h, height)
+    if x1 - x0 < 8 or y1 - y0 < 8:
+        return (0.0, 0.0), 1.0, 0.0
+
+    points = cv2.goodFeaturesToTrack(previous_gray[y0:y1, x0:x1], max_points, 0.01, 3)
+    if points is None or len(points) < 4:
+        return (0.0, 0.0), 1.0, 0.0
+    points = points.reshape(-1, 2) + np.float32([x0, y0])
+
+    lk_params = dict(winSize=(15, 15), maxLevel=2,
+                     criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+    next_points, status, _ = cv2.calcOpticalFlowPyrLK(previous_gray, gray_image, points, None, **lk_params)
+    back_points, back_status, _ = cv2.calcOpticalFlowPyrLK(gray_image, previous_gray, next_points, None, **lk_params)
+    fb_error = np.linalg.norm(points - back_points, axis=1)
+    good = (status.ravel() == 1) & (back_status.ravel() == 1) & (fb_error < max_fb_error)
+    if good.sum() < 4:
+        return (0.0, 0.0), 1.0, 0.0
+
+    old, new = points[good], next_points[good]
+    shift = np.median(new - old, axis=0)
+    # scale change from the ratio of pairwise point distances, robust to a few outliers
+    first, second = np.triu_indices(len(old), k=1)
+    old_spread = np.linalg.norm(old[first] - old[second], axis=1)
+    new_spread = np.linalg.norm(new[first] - new[second], axis=1)
+    valid = old_spread > 1e-3
+    scale = float(np.median(new_spread[valid] / old_spread[valid])) if valid.any() else 1.0
+    return (float(shift[0]), float(shift[1])), scale, good.sum() / len(points)
@@ -0,0 +1,222 @@
+import math
+import statistics
+
+import numpy as np
+
+
+class _Series:
+    """
+    Values of one series (series=None, plain floats in and out) or of many series at
+    once, e.g. one per face, as NumPy arrays. NaN means "no measurement this frame".
+    """
+
+    def __init__(self, series):
+        self.scalar = series is None
+        self.series = 1 if series is None else int(series)
+
+    def _input(self, values):
+        return np.asarray(values, dtype=np.float64).reshape(self.series)
+
+    def _output(self, values):
+        return float(values[0]) if self.scalar else values
+
+
+class RollingStats(_Series):
+    """
+    Fixed-capacity window of the last values, replacing average_finder() over a list
+    that grows forever. push() and mean() cost the same whatever the session length:
+    the running sum is updated with the value entering and the one leaving the ring.
+    A single series runs on plain floats, NumPy only pays off for many faces.
+    """
+
+    def __init__(self, window, series=None):
+        """
+        :param window: number of values kept per series.
+        :param series: None for one series of floats, N for N series pushed as arrays.
+        """
+        super().__init__(series)
+        self.window = int(window)
+        self._index = 0
+        if self.scalar:
+            self._ring = [math.nan] * self.window
+            self._total = 0.0
+            self._filled = 0
+        else:
+            self._values = np.full((self.window, self.series), np.nan)
+            self._sum = np.zeros(self.series)
+            self._count = np.zeros(self.series, dtype=np.int64)
+
+    def push(self, values):
+        """
+        :param values: new value (or one per series), NaN where there is none.
+        :return: self, so rolling.push(x).mean() reads like average_finder.
+        """
+        if self.scalar:
+            value = float(values)
+            old = self._ring[self._index]
+            if old == old:
+                self._total -= old
+                self._filled -= 1
+            if value == value:
+                self._total += value
+                self._filled += 1
+            self._ring[self._index] = value
+        else:
+            values = self._input(values)
+            old = self._values[self._index]
+            old_valid = ~np.isnan(old)
+            new_valid = ~np.isnan(values)
+            self._sum += np.where(new_valid, values, 0.0) - np.where(old_valid, old, 0.0)
+            self._count += new_valid.astype(np.int64) - old_valid
+            self._values[self._index] = values
+        self._index = (self._index + 1) % self.window
+        if self._index == 0:
+            # re-sum once per lap so floating point error can't build up
+            if self.scalar:
+                self._total = math.fsum(value for value in self._ring if value == value)
+            else:
+                self._sum = np.nansum(self._values, axis=0)
+        return self
+
+    def mean(self):
+        if self.scalar:
+            return self._total / self._filled if self._filled else math.nan
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self._count > 0, self._sum / np.maximum(self._count, 1), np.nan)
+
+    def median(self):
+        if self.scalar:
+            present = [value for value in self._ring if value == value]
+            return statistics.median(present) if present else math.nan
+        result = np.full(self.series, np.nan)
+        present = self._count > 0
+        if present.any():
+            result[present] = np.nanmedian(self._values[:, present], axis=0)
+        return result
+
+    def count(self):
+        if self.scalar:
+            return self._filled
+        return self._count.copy()
+
+    def values(self):
+        """
+        :return: the window, oldest first (window x series for many series), NaN where empty.
+        """
+        if self.scalar:
+            return self._ring[self._index:] + self._ring[:self._index]
+        return np.roll(self._values, -self._index, axis=0)
+
+    def reset(self, series=None):
+        """
+        Forget the values of some series (e.g. a face that left), or of all of them.
+        """
+        if self.scalar:
+            self._ring = [math.nan] * self.window
+            self._total = 0.0
+            self._filled = 0
+            return
+        index = slice(None) if series is None else series
+        self._values[:, index] = np.nan
+        self._sum[index] = 0.0
+        self._count[index] = 0
+
+
+class Ema(_Series):
+    """
+    Exponential moving average, constant memory, starts at the first value seen.
+    """
+
+    def __init__(self, alpha=0.3, series=None):
+        """
+        :param alpha: weight of the new value, higher follows faster and smooths less.
+        """
+        super().__init__(series)
+        self.alpha = alpha
+        self._value = np.full(self.series, np.nan)
+
+    def push(self, values):
+        values = self._input(values)
+        valid = ~np.isnan(values)
+        first = valid & np.isnan(self._value)
+        blended = self.alpha * values + (1 - self.alpha) * self._value
+        self._value = np.where(first, values, np.where(valid, blended, self._value))
+        return self
+
+    def mean(self):
+        return self._output(self._value.copy())
+
+    def reset(self, series=None):
+        self._value[slice(None) if series is None else series] = np.nan
+
+
+class KalmanFilter(_Series):
+    """
+    Constant-velocity Kalman filter on distance, one independent filter per series.
+    The state is (distance, velocity); velocity is the rate of change of the distance,
+    negative when the face comes closer. Series without a measurement are only predicted.
+    """
+
+    def __init__(self, process_noise=100.0, measurement_noise=9.0, series=None):
+        """
+        :param process_noise: acceleration variance, higher follows changes of speed faster.
+        :param measurement_noise: variance of a single distance estimate (unit squared).
+        """
+        super().__init__(series)
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.reset()
+
+    def reset(self, series=None):
+        if series is None:
+            self._distance = np.full(self.series, np.nan)
+            self._velocity = np.zeros(self.series)
+            self._p00 = np.zeros(self.series)
+            self._p01 = np.zeros(self.series)
+            self._p11 = np.zeros(self.series)
+        else:
+            self._distance[series] = np.nan
+            self._velocity[series] = 0.0
+
+    def push(self, values, time_delta):
+        """
+        :param values: distance measurements, NaN where there is none.
+        :param time_delta: seconds since the previous push, one value or one per series.
+        """
+        values = self._input(values)
+        dt = np.broadcast_to(np.asarray(time_delta, dtype=np.float64), values.shape)
+        q = self.process_noise
+        started = ~np.isnan(self._distance)
+
+        # predict
+        self._distance = np.where(started, self._distance + dt * self._velocity, self._distance)
+        p00 = self._p00 + 2 * dt * self._p01 + dt * dt * self._p11 + q * dt ** 3 / 3
+        p01 = self._p01 + dt * self._p11 + q * dt * dt / 2
+        p11 = self._p11 + q * dt
+
+        # update where there is a measurement
+        valid = ~np.isnan(values)
+        update = valid & started
+        s = p00 + self.measurement_noise
+        k0, k1 = p00 / s, p01 / s
+        residual = np.where(update, values - self._distance, 0.0)
+        self._distance = np.where(update, self._distance + k0 * residual, self._distance)
+        self._velocity = np.where(update, self._velocity + k1 * residual, self._velocity)
+        self._p00 = np.where(update, (1 - k0) * p00, p00)
+        self._p01 = np.where(update, (1 - k0) * p01, p01)
+        self._p11 = np.where(update, p11 - k1 * p01, p11)
+
+        # first measurement of a series: start at it with an unknown velocity
+        new = valid & ~started
+        self._distance = np.where(new, values, self._distance)
+        self._velocity = np.where(new, 0.0, self._velocity)
+        self._p00 = np.where(new, self.measurement_noise, self._p00)
+        self._p01 = np.where(new, 0.0, self._p01)
+        self._p11 = np.where(new, 1e4, self._p11)
+        return self
+
+    def distance(self):
+        return self._output(self._distance.copy())
+
+    def velocity(self):
+        return self._output(self._velocity.copy())
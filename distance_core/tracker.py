@@ -0,0 +1,246 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .batch import as_face_array
+from .config import KNOWN_WIDTH
+from .smoothing import KalmanFilter, RollingStats
+
+# per detection, in the order of the faces given to update(); id -1 when no track slot was free.
+# distances are Kalman-filtered, speeds are positive when the face comes closer, NaN for a new track.
+TrackedFaces = namedtuple("TrackedFaces", ["ids", "boxes", "distances", "speeds"])
+
+
+def face_records(tracked, decimals=2):
+    """
+    TrackedFaces as JSON-ready dicts {"id", "box", "distance", "speed"}, speed None when unknown.
+    """
+    return [
+        {"id": int(track_id), "box": [int(value) for value in box], "distance": round(float(distance), decimals),
+         "speed": round(float(speed), decimals) if speed == speed else None}
+        for track_id, box, distance, speed in zip(tracked.ids, tracked.boxes, tracked.distances, tracked.speeds)
+    ]
+
+
+def iou_matrix(first, second):
+    """
+    Intersection over union of every box in first (N x 4) with every box in second (M x 4).
+    :return: N x M array.
+    """
+    a = first[:, None, :]
+    b = second[None, :, :]
+    x0 = np.maximum(a[..., 0], b[..., 0])
+    y0 = np.maximum(a[..., 1], b[..., 1])
+    x1 = np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2])
+    y1 = np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3])
+    intersection = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+    union = a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
+
+
+def association_cost(tracks, detections, min_iou=0.2, max_centroid_distance=1.0):
+    """
+    Cost of assigning each detection to each track: 1 - IoU for overlapping boxes,
+    1 + centroid distance (in track widths) for fast moves that left no overlap.
+    :return: (cost N x M, feasible N x M boolean).
+    """
+    iou = iou_matrix(tracks, detections)
+    track_centers = tracks[:, None, :2] + tracks[:, None, 2:] / 2
+    detection_centers = detections[None, :, :2] + detections[None, :, 2:] / 2
+    centroid = np.linalg.norm(track_centers - detection_centers, axis=2) / np.maximum(tracks[:, None, 2], 1)
+    cost = np.where(iou > 0, 1 - iou, 1 + centroid)
+    feasible = (iou >= min_iou) | (centroid <= max_centroid_distance)
+    return cost, feasible
+
+
+def match_greedy(cost, feasible):
+    """
+    Lowest-cost pairs first. Only feasible pairs are visited, about one per face when
+    faces are apart, so the Python loop stays linear in the number of faces.
+    :return: (track indexes, detection indexes).
+    """
+    rows, cols = np.nonzero(feasible)
+    order = np.argsort(cost[rows, cols], kind="stable")
+    used_rows = np.zeros(cost.shape[0], dtype=bool)
+    used_cols = np.zeros(cost.shape[1], dtype=bool)
+    matched_rows, matched_cols = [], []
+    for row, col in zip(rows[order], cols[order]):
+        if not used_rows[row] and not used_cols[col]:
+            used_rows[row] = used_cols[col] = True
+            matched_rows.append(row)
+            matched_cols.append(col)
+    return np.array(matched_rows, dtype=np.intp), np.array(matched_cols, dtype=np.intp)
+
+
+def match_hungarian(cost, feasible):
+    """
+    Globally optimal assignment, needs scipy.
+    :return: (track indexes, detection indexes).
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    rows, cols = linear_sum_assignment(np.where(feasible, cost, 1e6))
+    keep = feasible[rows, cols]
+    return rows[keep], cols[keep]
+
+
+def hungarian_available():
+    try:
+        import scipy.optimize  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class FaceTracker:
+    """
+    Gives every face a stable id across frames and estimates its own distance and
+    speed, so two people in the frame no longer share one speed value.
+
+    Tracks live in a fixed number of slots; all per-track state (box, Kalman filter,
+    distance history) is a NumPy array indexed by slot, so a frame costs a handful of
+    vectorized operations whatever the number of faces.
+    """
+
+    def __init__(self, focal_length, real_width=KNOWN_WIDTH, max_tracks=64, min_iou=0.2, max_centroid_distance=1.0,
+                 max_missed=5, history=30, matcher="auto", process_noise=100.0, measurement_noise=9.0):
+        """
+        :param focal_length: focal length in pixels.
+        :param real_width: actual face width, sets the distance unit.
+        :param max_tracks: tracks followed at the same time.
+        :param min_iou: overlap needed to continue a track.
+        :param max_centroid_distance: or a centre shift of at most this many track widths.
+        :param max_missed: frames a track survives without a matching detection.
+        :param history: raw distances kept per track, see history().
+        :param matcher: "greedy", "hungarian" (needs scipy) or "auto".
+        """
+        self.focal_length = focal_length
+        self.real_width = real_width
+        self.max_tracks = max_tracks
+        self.min_iou = min_iou
+        self.max_centroid_distance = max_centroid_distance
+        self.max_missed = max_missed
+        if matcher == "auto":
+            matcher = "hungarian" if hungarian_available() else "greedy"
+        self.matcher = matcher
+        self._match = match_hungarian if matcher == "hungarian" else match_greedy
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.history_length = history
+        self.reset()
+
+    def reset(self):
+        self._kalman = KalmanFilter(self.process_noise, self.measurement_noise, series=self.max_tracks)
+        self._history = RollingStats(self.history_length, series=self.max_tracks)
+        self._active = np.zeros(self.max_tracks, dtype=bool)
+        self._ids = np.full(self.max_tracks, -1, dtype=np.int64)
+        self._boxes = np.zeros((self.max_tracks, 4))
+        self._missed = np.zeros(self.max_tracks, dtype=np.int64)
+        self._age = np.zeros(self.max_tracks, dtype=np.int64)
+        self._last_timestamp = None
+        self._next_id = 0
+        self.frames = 0
+        self.tracks_created = 0
+        self.tracks_lost = 0
+        self.untracked = 0
+        self.last_cost = 0.0
+        self.total_cost = 0.0
+
+    def update(self, faces, timestamp=None):
+        """
+        :param faces: detections of this frame, N x 4 (x, y, w, h).
+        :param timestamp: capture time of the frame in seconds, e.g. VideoSource.timestamp or
+                          ThreadedSource.timestamp. When None, time.monotonic() at this call is used,
+                          which counts processing delays as motion time.
+        :return: TrackedFaces aligned with faces.
+        """
+        start = time.perf_counter()
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        time_delta = 0.0 if self._last_timestamp is None else max(timestamp - self._last_timestamp, 0.0)
+        self._last_timestamp = timestamp
+        boxes = as_face_array(faces)
+        distances = (self.real_width * self.focal_length) / np.maximum(boxes[:, 2], 1)
+
+        # associate detections with active tracks
+        active = np.flatnonzero(self._active)
+        slots = np.full(len(boxes), -1, dtype=np.intp)
+        if len(active) and len(boxes):
+            cost, feasible = association_cost(self._boxes[active], boxes, self.min_iou, self.max_centroid_distance)
+            track_index, detection_index = self._match(cost, feasible)
+            slots[detection_index] = active[track_index]
+
+        # start tracks for the rest, in free slots
+        new = np.flatnonzero(slots < 0)
+        free = np.flatnonzero(~self._active)[:len(new)]
+        self.untracked += len(new) - len(free)
+        new = new[:len(free)]
+        if len(new):
+            slots[new] = free
+            self._active[free] = True
+            self._ids[free] = np.arange(self._next_id, self._next_id + len(free))
+            self._next_id += len(free)
+            self._age[free] = 0
+            self._kalman.reset(free)
+            self._history.reset(free)
+            self.tracks_created += len(free)
+
+        # one vectorized filter step for every slot, unmatched tracks are only predicted, so each
+        # track's velocity spans the capture times of its own measurements, missed frames included
+        tracked = slots >= 0
+        measurements = np.full(self.max_tracks, np.nan)
+        measurements[slots[tracked]] = distances[tracked]
+        self._kalman.push(measurements, time_delta)
+        self._history.push(measurements)
+        self._boxes[slots[tracked]] = boxes[tracked]
+        self._missed[active] += 1
+        self._missed[slots[tracked]] = 0
+        self._age[slots[tracked]] += 1
+
+        lost = self._active & (self._missed > self.max_missed)
+        if lost.any():
+            self._active[lost] = False
+            self._ids[lost] = -1
+            self.tracks_lost += int(lost.sum())
+
+        ids = np.full(len(boxes), -1, dtype=np.int64)
+        smoothed = distances.copy()
+        speeds = np.full(len(boxes), np.nan)
+        ids[tracked] = self._ids[slots[tracked]]
+        smoothed[tracked] = self._kalman.distance()[slots[tracked]]
+        moving = tracked.copy()
+        moving[tracked] = self._age[slots[tracked]] > 1
+        speeds[moving] = -self._kalman.velocity()[slots[moving]]
+
+        self.frames += 1
+        self.last_cost = time.perf_counter() - start
+        self.total_cost += self.last_cost
+        return TrackedFaces(ids, boxes.astype(np.int32), smoothed, speeds)
+
+    def history(self, track_id):
+        """
+        :return: raw distances of a live track, oldest first, NaN for frames it was missed.
+        """
+        slot = np.flatnonzero(self._ids == track_id)
+        if not len(slot):
+            return np.empty(0)
+        return self._history.values()[:, slot[0]]
+
+    @property
+    def active_tracks(self):
+        return int(self._active.sum())
+
+    def stats(self):
+        """
+        :return: track counters and the time spent tracking, last frame and mean, in ms.
+        """
+        return {
+            "matcher": self.matcher,
+            "frames": self.frames,
+            "active_tracks": self.active_tracks,
+            "tracks_created": self.tracks_created,
+            "tracks_lost": self.tracks_lost,
+            "untracked": self.untracked,
+            "last_cost_ms": self.last_cost * 1000,
+            "mean_cost_ms": self.total_cost / self.frames * 1000 if self.frames else None,
+        }
@@ -1,78 +1,203 @@
-from flask import Flask, render_template, Response, request, redirect, url_for
-import cv2
-from win32com.client import Dispatch
+from flask import Flask, render_template, Response, request, redirect, url_for, jsonify
+import os
 import time
 import threading
+from collections.abc import Mapping
+from distance_core import (KNOWN_WIDTH, VideoSource, ThreadedSource, FrameBroadcaster,
+                           JpegCache, MjpegStream, stream_options, sse_event, cascade_stats, overlays, RoiDetector,
+                           DetectionPool)
+from distance_core.alerts import AlertDispatcher, LogSink
+from distance_core.audio_cache import AudioCache, CachedSpeechSink
+from distance_core.calibration import calibrated_focal_length
+from distance_core.lazy import LazyResource
+from distance_core.tracker import FaceTracker, face_records
 
 app = Flask(__name__)
+# answers /health uptime, set as soon as the module is loaded
+started = time.monotonic()
+
+# Detector processes for full-frame detection on every core, 0 to detect in the capture thread with the ROI detector
+DETECTION_WORKERS = 0
+detection_pool = None
+if DETECTION_WORKERS:
+    # start the workers before any other thread exists, they are forked from this process
+    detection_pool = DetectionPool(workers=DETECTION_WORKERS)
+    detection_pool.warm_up()
+
+def open_camera():
+    """
+    Open the camera (change the index if necessary to match your camera), raising when it
+    can't be opened so the failure is not cached as a working camera.
+    """
+    cap = ThreadedSource(VideoSource(1)).open()
+    if not cap.isOpened():
+        cap.release()
+        raise RuntimeError("Failed to open camera 1.")
+    return cap
 
-# Initialize video capture (change the index if necessary to match your camera)
-cap = cv2.VideoCapture(1)
-
-# Known variables for distance estimation
-KNOWN_DISTANCE = 76.2  # Measured distance to object in centimeters
-KNOWN_WIDTH = 14.3     # Known width of the object in centimeters
-fonts = cv2.FONT_HERSHEY_COMPLEX
+# Video capture, opened by the warm-up or the first viewer
+camera = LazyResource(open_camera, "camera")
 
 # Global variables for distance settings
-last_speech_time = 0    # Tracks the last time a speech alert was triggered
-speech_interval = 5     # Time interval in seconds between consecutive speech alerts
+speech_interval = 5     # Time interval in seconds between consecutive alerts of the same face
 alert_distance_min = 50 # Default minimum alert distance (in cm)
 alert_distance_max = 70 # Default maximum alert distance (in cm)
+max_alert_distance = 1000 # Alert distances beyond this (in cm) are rejected, far past what a face detector sees
+
+# Single capture-and-detect loop publishing to every /video_feed client
+broadcaster = FrameBroadcaster()
+jpeg_cache = JpegCache()
+# the same frames without burned-in text, for pages that draw /measurements as an overlay
+clean_broadcaster = FrameBroadcaster()
+clean_jpeg_cache = JpegCache()
+# viewers currently connected to /video_feed
+streams = set()
+# per-frame faces, distances, speeds and alert state for /measurements
+measurements = FrameBroadcaster()
+# calibration/<CAMERA_NAME>.json from Capture_Reference_image/calibrate.py, Ref_image.png until the camera is
+# calibrated; loaded with the tracker on the first frame, scaled to the frame size the camera delivers
+CAMERA_NAME = "default"
+face_tracker = None
+# fixed cameras: re-detect around the previous faces, full-frame scan only periodically or after a miss
+roi_detector = RoiDetector()
+capture_thread = None
+capture_thread_lock = threading.Lock()
+
+# Speech and logging run on one dispatcher thread, the capture loop only queues alerts
+# alert phrases are rendered once in 5 cm steps and played from memory
+audio_cache = AudioCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alert_audio"), step=5)
+alerts = AlertDispatcher([LogSink(), CachedSpeechSink(audio_cache)], min_interval=speech_interval)
+
+def prerender_alert_audio():
+    """
+    Render the phrases of the current alert range in the background, so the first alert doesn't wait.
+    """
+    audio_cache.prerender_in_background(alert_distance_min, alert_distance_max)
 
-def focal_length(measured_distance, real_width, width_in_rf_image):
-    focal_length_value = (width_in_rf_image * measured_distance) / real_width
-    print(f"[DEBUG] Calculated focal length: {focal_length_value}")
-    return focal_length_value
-
-def distance_finder(focal_length, real_face_width, face_width_in_frame):
-    distance = (real_face_width * focal_length) / face_width_in_frame
-    print(f"[DEBUG] Calculated distance: {distance} cm")
-    return distance
-
-def face_data(image):
-    face_width = 0
-    gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    face_detector = cv2.CascadeClassifier("haarcascade_frontalface_default.xml")
-    faces = face_detector.detectMultiScale(gray_image, 1.3, 5)
-
-    for (x, y, h, w) in faces:
-        cv2.rectangle(image, (x, y), (x + w, y + h), (255, 255, 255), 1)
-        face_width = w
-        print(f"[DEBUG] Detected face width: {face_width}")
-
-    return face_width
+def warm_up():
+    """
+    Open the camera and render the alert audio in the background, the server answers meanwhile.
+    The detector loads its cascade on the capture thread that uses it, speech engines on the
+    alert thread.
+    """
+    camera.warm_up()
+    prerender_alert_audio()
 
-def speak_message(message):
-    print(f"[INFO] Speaking message: {message}")
-    speak = Dispatch("SAPI.SpVoice")
-    speak.Speak(message)
+def process_frame(frame, timestamp, faces=None):
+    """
+    Distance estimation and alerting for one frame, then publish its measurements and
+    the frame to all subscribers.
+    :param timestamp: capture time of the frame, drives the speed estimate.
+    :param faces: boxes from the detection pool, None to detect here with the ROI detector.
+    """
+    if faces is None:
+        faces = roi_detector.update(frame)
+    tracked = face_tracker.update(faces, timestamp=timestamp)
+    in_range = (tracked.distances >= alert_distance_min) & (tracked.distances <= alert_distance_max)
+    alert = bool(in_range.any())
+    for track_id, Distance in zip(tracked.ids[in_range], tracked.distances[in_range]):
+        alerts.submit("camera", track_id, Distance)
+
+    sequence = measurements.publish({
+        "time": round(time.time(), 3),
+        "width": frame.shape[1],
+        "height": frame.shape[0],
+        "faces": face_records(tracked),
+        "alert": alert,
+        "alert_distance_min": alert_distance_min,
+        "alert_distance_max": alert_distance_max,
+    })
+    if clean_broadcaster.subscribers:
+        clean_broadcaster.publish(frame.copy())
+    for face, distance in zip(tracked.boxes, tracked.distances):
+        overlays.draw_face_box(frame, face)
+        overlays.draw_distance_text(frame, distance, (int(face[0]), max(int(face[1]) - 6, 12)), scaling=0.5)
+    broadcaster.publish(frame)
+    return sequence
+
+def create_face_tracker(frame):
+    """
+    Load the camera's focal length for the size of its frames and create the tracker.
+    Runs on the capture thread, so importing the server never loads the cascade.
+    """
+    global face_tracker
+    focal_length_found = calibrated_focal_length(CAMERA_NAME, image_size=(frame.shape[1], frame.shape[0]))
+    face_tracker = FaceTracker(focal_length_found, KNOWN_WIDTH)
+    print(f"[INFO] Focal length {focal_length_found:.1f} px for camera {CAMERA_NAME}.")
 
-def generate_frames():
-    focal_length_found = focal_length(KNOWN_DISTANCE, KNOWN_WIDTH, 100)
-    global last_speech_time
+def capture_loop():
+    """
+    Owns the camera: reads every frame once, runs detection, distance estimation and
+    alerting, then publishes the annotated frame to all subscribers. With a detection
+    pool, frames are detected in parallel and handled in capture order.
+    """
+    try:
+        cap = camera.get()
+    except Exception as error:
+        print(f"[ERROR] Failed to open camera: {error}")
+        cap = None
     while True:
-        success, frame = cap.read()
+        success, frame = cap.read() if cap is not None else (False, None)
+        if success and face_tracker is None:
+            try:
+                create_face_tracker(frame)
+            except Exception as error:
+                print(f"[ERROR] No focal length for camera {CAMERA_NAME}: {error}")
+                success = False
         if not success:
             print("[ERROR] Failed to read frame from camera.")
+            if detection_pool is not None:
+                for _, (pending_frame, timestamp), faces in detection_pool.results(wait=True):
+                    process_frame(pending_frame, timestamp, faces)
+            # the next viewer opens the camera again instead of getting this source back
+            failed = camera.reset()
+            if failed is not None:
+                failed.release()
+            broadcaster.close()
+            clean_broadcaster.close()
+            measurements.close()
             break
 
-        face_width_in_frame = face_data(frame)
-        if face_width_in_frame != 0:
-            Distance = distance_finder(focal_length_found, KNOWN_WIDTH, face_width_in_frame)
-            current_time = time.time()
-            if alert_distance_min <= Distance <= alert_distance_max and (current_time - last_speech_time) > speech_interval:
-                print(f"[ALERT] Intruder detected at {round(Distance, 2)} cm.")
-                threading.Thread(target=speak_message, args=(f"Intruder at {round(Distance, 2)} cm..",)).start()
-                last_speech_time = current_time
-            
-            cv2.putText(frame, f"Distance = {round(Distance, 2)} CM", (50, 50), fonts, 1, (255, 255, 255), 2)
+        if detection_pool is None:
+            process_frame(frame, cap.timestamp)
+        else:
+            detection_pool.submit(frame, payload=(frame, cap.timestamp))
+            for _, (ready_frame, timestamp), faces in detection_pool.results():
+                process_frame(ready_frame, timestamp, faces)
 
-        ret, buffer = cv2.imencode('.jpg', frame)
-        frame = buffer.tobytes()
+def start_capture_thread():
+    """
+    Start the capture loop on the first request, or restart it if the camera failed.
+    """
+    global capture_thread
+    with capture_thread_lock:
+        if capture_thread is None or not capture_thread.is_alive():
+            broadcaster.reopen()
+            clean_broadcaster.reopen()
+            measurements.reopen()
+            capture_thread = threading.Thread(target=capture_loop, name="capture-loop", daemon=True)
+            capture_thread.start()
+            print("[INFO] Capture thread started.")
+
+def generate_frames(overlay=True, **options):
+    """
+    :param options: MjpegStream quality, scale, max_fps and adaptive settings of this viewer.
+    """
+    start_capture_thread()
+    if overlay:
+        stream = MjpegStream(broadcaster, jpeg_cache, **options)
+    else:
+        stream = MjpegStream(clean_broadcaster, clean_jpeg_cache, **options)
+    streams.add(stream)
+    try:
+        yield from stream
+    finally:
+        streams.discard(stream)
 
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+def generate_measurements():
+    start_capture_thread()
+    for sequence, payload in measurements.subscribe():
+        yield sse_event(dict(payload, frame=sequence))
 
 @app.route('/')
 def index():
@@ -84,196 +209,127 @@ def index():
 
 @app.route('/video_feed')
 def video_feed():
-    return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    """
+    MJPEG stream, ?overlay=0 for frames without burned-in distances (draw /measurements instead).
+    ?quality=50&scale=0.5&max_fps=10 pick the stream for a slow link, it backs off further on
+    its own when the client can't keep up (adaptive=0 to disable).
+    """
+    overlay = request.args.get('overlay', '1') != '0'
+    try:
+        options = stream_options(request.args)
+    except ValueError as error:
+        return jsonify({"message": str(error)}), 400
+    options['sock'] = request.environ.get('werkzeug.socket')
+    return Response(generate_frames(overlay, **options), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@app.route('/stream_stats')
+def stream_stats():
+    """
+    Report each viewer's current stream parameters and backoff level, and how often
+    encoded variants were shared between viewers.
+    """
+    return jsonify({
+        "jpeg_cache": jpeg_cache.stats(),
+        "clean_jpeg_cache": clean_jpeg_cache.stats(),
+        "streams": [stream.stats() for stream in list(streams)],
+    })
+
+@app.route('/measurements')
+def measurements_stream():
+    """
+    Server-Sent Events stream of every frame's faces (id, box, distance in cm, speed in
+    cm/s), alert state and alert range, a few hundred bytes per frame instead of a JPEG.
+    """
+    response = Response(generate_measurements(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/detector_stats')
+def detector_stats():
+    """
+    Report cascade load times and reuse counts, to confirm the XML is parsed once per thread.
+    """
+    return jsonify(cascade_stats())
+
+@app.route('/detection_pool_stats')
+def detection_pool_stats():
+    """
+    Report submitted, completed and in-flight frames of the detection processes.
+    """
+    if detection_pool is None:
+        return jsonify({"workers": 0})
+    return jsonify(detection_pool.stats())
+
+@app.route('/alert_stats')
+def alert_stats():
+    """
+    Report queued, rate-limited, coalesced and delivered alerts, the time each sink takes and
+    the alert audio cache.
+    """
+    return jsonify(dict(alerts.stats(), audio_cache=audio_cache.stats()))
+
+@app.route('/capture_stats')
+def capture_stats():
+    """
+    Report captured, delivered and dropped frame counts and the age of the frame being processed.
+    """
+    if not camera.ready:
+        return jsonify(camera.stats())
+    return jsonify(camera.get().stats())
+
+@app.route('/health')
+def health():
+    """
+    Answer at once, also while the camera is still opening: uptime and the state of the
+    lazily started backends.
+    """
+    return jsonify({
+        "status": "ok",
+        "uptime": round(time.monotonic() - started, 3),
+        "camera": camera.stats(),
+        "camera_opened": camera.ready and camera.get().isOpened(),
+        "capture_running": capture_thread is not None and capture_thread.is_alive(),
+    })
 
 @app.route('/set_distance', methods=['POST'])
 def set_distance():
     """
     Handle the form submission to set alert distances and provide feedback to the user.
+    JSON requests get a JSON answer instead of the re-rendered page.
     """
     global alert_distance_min, alert_distance_max
     message = ''  # Initialize message variable
+    data = request.get_json(silent=True) or request.form
     try:
-        min_distance = int(request.form['min_distance'])
-        max_distance = int(request.form['max_distance'])
+        if not isinstance(data, Mapping):
+            raise TypeError(f"Expected form or JSON object fields, got {type(data).__name__}.")
+        min_distance = int(data['min_distance'])
+        max_distance = int(data['max_distance'])
 
         # Validate the inputs to ensure minimum is less than maximum
         if min_distance >= max_distance:
             message = "Minimum distance must be less than maximum distance."
             print(f"[ERROR] {message}")
+        elif min_distance < 0 or max_distance > max_alert_distance:
+            message = f"Distances must be between 0 and {max_alert_distance} cm."
+            print(f"[ERROR] {message}")
         else:
             alert_distance_min = min_distance
             alert_distance_max = max_distance
+            prerender_alert_audio()
             message = f"Updated alert distances: Min = {alert_distance_min} cm, Max = {alert_distance_max} cm"
             print(f"[INFO] {message}")
-    except ValueError:
+    except (KeyError, TypeError, ValueError):
         message = "Invalid distance value entered. Please enter valid integers."
         print(f"[ERROR] {message}")
 
+    if request.is_json:
+        return jsonify({"message": message, "min_distance": alert_distance_min, "max_distance": alert_distance_max})
     # Return to the main page with the message
     return render_template('index.html', min_distance=alert_distance_min, max_distance=alert_distance_max, message=message)
 
 if __name__ == '__main__':
     print("[INFO] Starting Flask server...")
+    warm_up()
     app.run(host='0.0.0.0', port=5000)
-
-
-# from flask import Flask, render_template, request, redirect, url_for
-# from flask_socketio import SocketIO
-# import cv2
-# from win32com.client import Dispatch
-# import numpy as np
-# import time
-# import threading
-
-# app = Flask(__name__)
-# socketio = SocketIO(app)
-
-# # Initialize video capture (change the index if necessary to match your camera)
-# # cap = cv2.VideoCapture(1)
-
-# # Known variables for distance estimation
-# KNOWN_DISTANCE = 76.2  # Measured distance to object in centimeters
-# KNOWN_WIDTH = 14.3     # Known width of the object in centimeters
-# fonts = cv2.FONT_HERSHEY_COMPLEX
-
-# # Global variables for distance settings
-# last_speech_time = 0    # Tracks the last time a speech alert was triggered
-# speech_interval = 5     # Time interval in seconds between consecutive speech alerts
-# alert_distance_min = 50 # Default minimum alert distance (in cm)
-# alert_distance_max = 70 # Default maximum alert distance (in cm)
-
-# def focal_length(measured_distance, real_width, width_in_rf_image):
-#     focal_length_value = (width_in_rf_image * measured_distance) / real_width
-#     print(f"[DEBUG] Calculated focal length: {focal_length_value}")
-#     return focal_length_value
-
-# def distance_finder(focal_length, real_face_width, face_width_in_frame):
-#     distance = (real_face_width * focal_length) / face_width_in_frame
-#     print(f"[DEBUG] Calculated distance: {distance} cm")
-#     return distance
-
-# def face_data(image):
-#     face_width = 0
-#     gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-#     face_detector = cv2.CascadeClassifier("haarcascade_frontalface_default.xml")
-#     faces = face_detector.detectMultiScale(gray_image, 1.3, 5)
-
-#     for (x, y, h, w) in faces:
-#         cv2.rectangle(image, (x, y), (x + w, y + h), (255, 255, 255), 1)
-#         face_width = w
-#         print(f"[DEBUG] Detected face width: {face_width}")
-
-#     return face_width
-
-# def speak_message(message):
-#     print(f"[INFO] Speaking message: {message}")
-#     speak = Dispatch("SAPI.SpVoice")
-#     speak.Speak(message)
-
-# # def generate_frames():
-# #     focal_length_found = focal_length(KNOWN_DISTANCE, KNOWN_WIDTH, 100)
-# #     global last_speech_time
-# #     while True:
-# #         success, frame = cap.read()
-# #         if not success:
-# #             print("[ERROR] Failed to read frame from camera.")
-# #             break
-
-# #         face_width_in_frame = face_data(frame)
-# #         if face_width_in_frame != 0:
-# #             Distance = distance_finder(focal_length_found, KNOWN_WIDTH, face_width_in_frame)
-# #             current_time = time.time()
-# #             if alert_distance_min <= Distance <= alert_distance_max and (current_time - last_speech_time) > speech_interval:
-# #                 print(f"[ALERT] Intruder detected at {round(Distance, 2)} cm.")
-# #                 threading.Thread(target=speak_message, args=(f"Intruder at {round(Distance, 2)} cm..",)).start()
-# #                 last_speech_time = current_time
-            
-# #             cv2.putText(frame, f"Distance = {round(Distance, 2)} CM", (50, 50), fonts, 1, (255, 255, 255), 2)
-
-# #         ret, buffer = cv2.imencode('.jpg', frame)
-# #         frame = buffer.tobytes()
-
-# #         yield (b'--frame\r\n'
-# #                b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-
-
-# @socketio.on('connect')
-# def handle_connect():
-#     print("[INFO] Client connected")
-
-# @socketio.on('disconnect')
-# def handle_disconnect():
-#     print("[INFO] Client disconnected")
-
-# @socketio.on('message')
-# def handle_frame(data):
-#     global last_speech_time
-    
-#     # Convert received binary data to a numpy array
-#     nparr = np.frombuffer(data, np.uint8)
-#     frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    
-#     if frame is not None:
-#         focal_length_found = focal_length(KNOWN_DISTANCE, KNOWN_WIDTH, 100)
-#         face_width_in_frame = face_data(frame)
-#         if face_width_in_frame != 0:
-#             Distance = distance_finder(focal_length_found, KNOWN_WIDTH, face_width_in_frame)
-#             current_time = time.time()
-#             if alert_distance_min <= Distance <= alert_distance_max and (current_time - last_speech_time) > speech_interval:
-#                 print(f"[ALERT] Intruder detected at {round(Distance, 2)} cm.")
-#                 threading.Thread(target=speak_message, args=(f"Intruder at {round(Distance, 2)} cm..",)).start()
-#                 last_speech_time = current_time
-
-#         # Optionally display the frame with distance overlay for debugging
-#         cv2.putText(frame, f"Distance = {round(Distance, 2)} CM", (50, 50), fonts, 1, (255, 255, 255), 2)
-#         cv2.imshow('Frame', frame)
-
-#         if cv2.waitKey(1) & 0xFF == ord('q'):
-#             cv2.destroyAllWindows()
-
-
-# @app.route('/')
-# def index():
-#     """
-#     Render the main page with video feed and distance setting form.
-#     """
-#     # Initial render without any message
-#     return render_template('index2.html', min_distance=alert_distance_min, max_distance=alert_distance_max, message='')
-
-# # @app.route('/video_feed')
-# # def video_feed():
-# #     return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
-
-# @app.route('/set_distance', methods=['POST'])
-# def set_distance():
-#     """
-#     Handle the form submission to set alert distances and provide feedback to the user.
-#     """
-#     global alert_distance_min, alert_distance_max
-#     message = ''  # Initialize message variable
-#     try:
-#         min_distance = int(request.form['min_distance'])
-#         max_distance = int(request.form['max_distance'])
-
-#         # Validate the inputs to ensure minimum is less than maximum
-#         if min_distance >= max_distance:
-#             message = "Minimum distance must be less than maximum distance."
-#             print(f"[ERROR] {message}")
-#         else:
-#             alert_distance_min = min_distance
-#             alert_distance_max = max_distance
-#             message = f"Updated alert distances: Min = {alert_distance_min} cm, Max = {alert_distance_max} cm"
-#             print(f"[INFO] {message}")
-#     except ValueError:
-#         message = "Invalid distance value entered. Please enter valid integers."
-#         print(f"[ERROR] {message}")
-
-#     # Return to the main page with the message
-#     return render_template('index.html', min_distance=alert_distance_min, max_distance=alert_distance_max, message=message)
-
-# if __name__ == '__main__':
-#     print("[INFO] Starting Flask server...")
-#     app.run(host='0.0.0.0', port=5000)
-
-
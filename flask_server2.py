@@ -1,88 +1,124 @@
-from flask import Flask, render_template, Response, request, redirect, url_for
-import cv2
-from win32com.client import Dispatch
-import pyttsx3
-import time
+from flask import Flask, render_template, Response, request, redirect, url_for, jsonify
 import threading
+import time
+from distance_core import (KNOWN_WIDTH, VideoSource, ThreadedSource, FrameBroadcaster,
+                           JpegCache, mjpeg_part, cascade_stats, distance_finder, face_data,
+                           overlays, RoiDetector)
+from distance_core.alerts import AlertDispatcher, LogSink, SpeechSink
+from distance_core.calibration import calibrated_focal_length
+from distance_core.lazy import LazyResource
 
 app = Flask(__name__)
+# answers /health uptime, set as soon as the module is loaded
+started = time.monotonic()
 
 # Initialize video capture with a default IP (can be changed by user)
 camera_ip = ""
 
-# Initialize video capture (change the index if necessary to match your camera)
-cap = cv2.VideoCapture(camera_ip)
+def open_camera():
+    """
+    Open the camera at camera_ip, raising when it can't be opened so the failure is not
+    cached as a working camera.
+    """
+    cap = ThreadedSource(VideoSource(camera_ip)).open()
+    if not cap.isOpened():
+        cap.release()
+        raise RuntimeError(f"Failed to open camera {camera_ip!r}.")
+    return cap
 
-# Known variables for distance estimation
-KNOWN_DISTANCE = 76.2  # Measured distance to object in centimeters
-KNOWN_WIDTH = 14.3     # Known width of the object in centimeters
-fonts = cv2.FONT_HERSHEY_COMPLEX
+# Video capture of the current camera_ip, opened by the warm-up or the first viewer
+camera = LazyResource(open_camera, "camera")
+# calibration/<CAMERA_NAME>.json from Capture_Reference_image/calibrate.py, Ref_image.png until the camera is calibrated
+CAMERA_NAME = "default"
 
 # Global variables for distance settings
-last_speech_time = 0    # Tracks the last time a speech alert was triggered
 speech_interval = 5     # Time interval in seconds between consecutive speech alerts
 alert_distance_min = 50 # Default minimum alert distance (in cm)
 alert_distance_max = 70 # Default maximum alert distance (in cm)
 
-def focal_length(measured_distance, real_width, width_in_rf_image):
-    focal_length_value = (width_in_rf_image * measured_distance) / real_width
-    print(f"[DEBUG] Calculated focal length: {focal_length_value}")
-    return focal_length_value
-
-def distance_finder(focal_length, real_face_width, face_width_in_frame):
-    distance = (real_face_width * focal_length) / face_width_in_frame
-    print(f"[DEBUG] Calculated distance: {distance} cm")
-    return distance
-
-def face_data(image):
-    face_width = 0
-    gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    face_detector = cv2.CascadeClassifier("haarcascade_frontalface_default.xml")
-    faces = face_detector.detectMultiScale(gray_image, 1.3, 5)
-
-    for (x, y, h, w) in faces:
-        cv2.rectangle(image, (x, y), (x + w, y + h), (255, 255, 255), 1)
-        face_width = w
-        print(f"[DEBUG] Detected face width: {face_width}")
-
-    return face_width
-
-# def speak_message(message):
-#     print(f"[INFO] Speaking message: {message}")
-#     speak = Dispatch("SAPI.SpVoice")
-#     speak.Speak(message)
-
-def speak_message(message):
-    print(f"[INFO] Speaking message: {message}")
-    engine = pyttsx3.init()
-    engine.say(message)
-    engine.runAndWait()
-
-def generate_frames():
-    focal_length_found = focal_length(KNOWN_DISTANCE, KNOWN_WIDTH, 100)
-    global last_speech_time
+# Single capture-and-detect loop publishing to every /video_feed client, frames are encoded once
+broadcaster = FrameBroadcaster()
+jpeg_cache = JpegCache()
+# fixed cameras: re-detect around the previous faces, full-frame scan only periodically or after a miss.
+# IP cameras are often 1080p or more, full-frame scans run on a downsample (1.0 = full resolution,
+# check the distance error of each scale with benchmarks/check_detection_scale.py)
+DETECTION_SCALE = 0.5
+roi_detector = RoiDetector(detection_scale=DETECTION_SCALE)
+capture_thread = None
+capture_thread_lock = threading.Lock()
+
+# Speech and logging run on one dispatcher thread, the capture loop only queues alerts
+alerts = AlertDispatcher([LogSink(), SpeechSink(backend="pyttsx3")], min_interval=speech_interval)
+
+def capture_loop():
+    """
+    Owns the camera: reads every frame once, runs detection, distance estimation and
+    alerting, then publishes the annotated frame to all subscribers. Keeps running when
+    /set_camera_ip switches cameras: the loop releases the source it was reading and
+    continues with the new one.
+    """
+    global capture_thread
+    cap, generation, focal_length_found = None, None, None
     while True:
-        success, frame = cap.read()
+        if camera.generation != generation:
+            generation = camera.generation
+            previous = cap
+            try:
+                cap = camera.get()
+            except Exception as error:
+                print(f"[ERROR] Failed to open camera: {error}")
+                cap = None
+            if previous is not None and previous is not cap:
+                previous.release()
+                roi_detector.reset()  # previous faces belong to the old camera
+                focal_length_found = None  # the new camera may deliver another frame size
+        success, frame = cap.read() if cap is not None else (False, None)
+        if success and focal_length_found is None:
+            try:
+                focal_length_found = calibrated_focal_length(CAMERA_NAME, image_size=(frame.shape[1], frame.shape[0]))
+            except Exception as error:
+                print(f"[ERROR] No focal length for camera {CAMERA_NAME}: {error}")
+                success = False
         if not success:
-            print("[ERROR] Failed to read frame from camera.")
+            with capture_thread_lock:
+                if camera.generation != generation:
+                    continue  # the camera was switched while reading
+                print("[ERROR] Failed to read frame from camera.")
+                # the next viewer opens the camera again instead of getting this source back
+                failed = camera.reset()
+                if failed is not None:
+                    failed.release()
+                capture_thread = None
+                broadcaster.close()
             break
 
-        face_width_in_frame = face_data(frame)
+        face_width_in_frame = face_data(frame, detector=roi_detector)
         if face_width_in_frame != 0:
             Distance = distance_finder(focal_length_found, KNOWN_WIDTH, face_width_in_frame)
-            current_time = time.time()
-            if alert_distance_min <= Distance <= alert_distance_max and (current_time - last_speech_time) > speech_interval:
-                print(f"[ALERT] Intruder detected at {round(Distance, 2)} cm.")
-                threading.Thread(target=speak_message, args=(f"Intruder at {round(Distance, 2)} cm..",)).start()
-                last_speech_time = current_time
+            if alert_distance_min <= Distance <= alert_distance_max:
+                # faces are not tracked here, all alerts share one rate limit
+                alerts.submit("camera", -1, Distance)
             
-            cv2.putText(frame, f"Distance = {round(Distance, 2)} CM", (50, 50), fonts, 1, (255, 255, 255), 2)
+            overlays.draw_distance_text(frame, Distance)
 
-        ret, buffer = cv2.imencode('.jpg', frame)
-        frame = buffer.tobytes()
+        broadcaster.publish(frame)
 
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+def start_capture_thread():
+    """
+    Start the capture loop on the first request, or restart it if the camera failed.
+    """
+    global capture_thread
+    with capture_thread_lock:
+        if capture_thread is None or not capture_thread.is_alive():
+            broadcaster.reopen()
+            capture_thread = threading.Thread(target=capture_loop, name="capture-loop", daemon=True)
+            capture_thread.start()
+            print("[INFO] Capture thread started.")
+
+def generate_frames():
+    start_capture_thread()
+    for sequence, frame in broadcaster.subscribe():
+        yield mjpeg_part(jpeg_cache.get(sequence, frame))
 
 @app.route('/')
 def index():
@@ -96,6 +132,36 @@ def index():
 def video_feed():
     return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
+@app.route('/detector_stats')
+def detector_stats():
+    """
+    Report cascade load times and reuse counts, to confirm the XML is parsed once per thread.
+    """
+    return jsonify(cascade_stats())
+
+@app.route('/capture_stats')
+def capture_stats():
+    """
+    Report captured, delivered and dropped frame counts and the age of the frame being processed.
+    """
+    if not camera.ready:
+        return jsonify(camera.stats())
+    return jsonify(camera.get().stats())
+
+@app.route('/health')
+def health():
+    """
+    Answer at once, also while the camera is still opening: uptime and the state of the
+    lazily started backends.
+    """
+    return jsonify({
+        "status": "ok",
+        "uptime": round(time.monotonic() - started, 3),
+        "camera": camera.stats(),
+        "camera_opened": camera.ready and camera.get().isOpened(),
+        "capture_running": capture_thread is not None and capture_thread.is_alive(),
+    })
+
 @app.route('/set_distance', methods=['POST'])
 def set_distance():
     """
@@ -128,14 +194,20 @@ def set_camera_ip():
     """
     Handle the form submission to set the camera IP address.
     """
-    global camera_ip, cap
+    global camera_ip
     message = ''  # Initialize message variable
     try:
         new_ip = request.form['camera_ip']
         # Set the new camera IP and update the VideoCapture object
         camera_ip = new_ip
-        cap.release()  # Release any existing capture
-        cap = cv2.VideoCapture(camera_ip)
+        with capture_thread_lock:
+            previous = camera.reset()
+            running = capture_thread is not None and capture_thread.is_alive()
+        # a running capture loop releases the old source itself once it notices the switch
+        if previous is not None and not running:
+            previous.release()  # Release any existing capture
+            roi_detector.reset()  # previous faces belong to the old camera
+        camera.warm_up()
         message = f"Updated camera IP address to: {camera_ip}"
         print(f"[INFO] {message}")
     except Exception as e:
@@ -147,4 +219,6 @@ def set_camera_ip():
 
 if __name__ == '__main__':
     print("[INFO] Starting Flask server...")
+    if camera_ip:
+        camera.warm_up()
     app.run(host='0.0.0.0', port=5000)
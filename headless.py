@@ -0,0 +1,196 @@
+"""
+Distance and speed estimation without a window or a web server: live cameras over
+SSH, or recorded footage reprocessed as fast as the CPU allows.
+
+    python headless.py 0 --workers 4                                  # live camera, prints distances
+    python headless.py recordings/ --output results.csv               # every video in the folder
+    python headless.py door_cam.mp4 lobby.mp4 --output results.jsonl --workers 0
+
+Results have one row per face per frame (see distance_core.results.RESULT_FIELDS),
+written as .csv, .jsonl or .parquet (needs pyarrow) depending on the output name.
+Every face is tracked (distance_core.tracker.FaceTracker): rows carry its track id
+and its own speed, in cm/s, positive when it comes closer.
+
+With --workers N detection runs on N processes (DetectionPool), with 0 it runs
+in this process with the ROI detector. Frames are decoded into a SharedFrameRing
+and only slot indices travel through the pipeline.
+
+For hours-long files, --chunk-seconds S splits each file into S-second chunks that
+worker processes decode and detect independently from their own seek position;
+speeds are computed on the merged, ordered detections, so they match a sequential run.
+
+    python headless.py archive/ --output results.csv --chunk-seconds 120 --workers 8
+"""
+import argparse
+import os
+import time
+
+from distance_core import (KNOWN_WIDTH, VideoSource, ThreadedSource, DetectionPool, RoiDetector,
+                           SharedFrameRing, estimate_batch)
+from distance_core.calibration import FrameFocalLength, camera_focal_length
+from distance_core.chunked import detect_file_chunked, video_size
+from distance_core.results import open_results
+from distance_core.tracker import FaceTracker
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".m4v", ".mpg", ".h264")
+
+
+def expand_sources(items):
+    """
+    Camera indexes, video files, and folders searched recursively for video files.
+    """
+    sources = []
+    for item in items:
+        if item.isdigit():
+            sources.append(int(item))
+        elif os.path.isdir(item):
+            for folder, _, files in sorted(os.walk(item)):
+                sources.extend(os.path.join(folder, name) for name in sorted(files)
+                               if name.lower().endswith(VIDEO_EXTENSIONS))
+        else:
+            sources.append(item)
+    return sources
+
+
+class SourceResults:
+    """
+    Turns the faces of each frame of one source into result rows, in frame order.
+    """
+
+    def __init__(self, name, focal_length_found, emit):
+        self.name = name
+        self.focal_length = focal_length_found
+        self.emit = emit
+        # frame times drive the filter, so speeds don't depend on processing speed
+        self.tracker = FaceTracker(focal_length_found, KNOWN_WIDTH)
+
+    def add(self, index, frame_time, faces):
+        estimate = estimate_batch(faces, self.focal_length, KNOWN_WIDTH)
+        tracked = self.tracker.update(faces, timestamp=frame_time)
+        for face_index, ((x, y, w, h), distance, track, speed) in enumerate(
+                zip(faces, estimate.distances, tracked.ids, tracked.speeds)):
+            self.emit({
+                "source": self.name, "frame": index, "time": round(frame_time, 4), "face": face_index,
+                "track": int(track), "x": int(x), "y": int(y), "w": int(w), "h": int(h),
+                "distance": round(float(distance), 2),
+                "speed": round(float(speed), 2) if speed == speed else None,
+            })
+
+
+def run_source(source, frame_focal_length, detection_pool, emit, max_frames=None):
+    """
+    Process one camera or file to the end.
+    :param frame_focal_length: FrameFocalLength, scaled to the size of the source's frames.
+    :return: number of frames processed.
+    """
+    # live cameras keep only the newest frame, files are processed frame by frame
+    video = VideoSource(source)
+    capture = ThreadedSource(video) if isinstance(source, int) else video
+    results = None
+    roi_detector = RoiDetector()
+    frames = 0
+    with capture:
+        start_time = None
+        success, frame = capture.read()
+        if success:
+            results = SourceResults(str(source), frame_focal_length((frame.shape[1], frame.shape[0])), emit)
+        # the pool converts each frame to grayscale in its own ring on submit,
+        # so one slot is enough for the decoded color frame
+        ring = SharedFrameRing(1, frame.shape) if success else None
+        while success and (max_frames is None or frames < max_frames):
+            slot = ring.acquire()
+            if frames == 0:
+                ring.write(slot, frame)
+            else:
+                success, frame = ring.read_into(slot, capture)
+                if not success:
+                    ring.release(slot)
+                    break
+            # capture time: position in the file, or the capture thread's clock for cameras
+            start_time = capture.timestamp if start_time is None else start_time
+            frame_time = capture.timestamp - start_time
+            if detection_pool is None:
+                results.add(frames, frame_time, roi_detector.update(frame))
+            else:
+                detection_pool.submit(frame, payload=(frames, frame_time))
+                for _, (index, ready_time), faces in detection_pool.results():
+                    results.add(index, ready_time, faces)
+            ring.release(slot)
+            frames += 1
+    if detection_pool is not None:
+        for _, (index, ready_time), faces in detection_pool.results(wait=True):
+            results.add(index, ready_time, faces)
+    if ring is not None:
+        ring.close()
+    return frames
+
+
+def run_file_chunked(path, frame_focal_length, workers, chunk_seconds, emit, max_frames=None):
+    """
+    Process one file in parallel chunks, see distance_core.chunked.
+    :param frame_focal_length: FrameFocalLength, scaled to the size of the file's frames.
+    :return: number of frames processed.
+    """
+    results = SourceResults(str(path), frame_focal_length(video_size(path)), emit)
+    frames = 0
+    for index, frame_time, faces in detect_file_chunked(path, workers, chunk_seconds):
+        if max_frames is not None and frames >= max_frames:
+            break
+        results.add(index, frame_time, faces)
+        frames += 1
+    return frames
+
+
+def print_row(row):
+    print(f"{row['source']} {row['frame']} face {row['face']} (track {row['track']}): {row['distance']} cm"
+          + (f", {row['speed']} cm/s" if row["speed"] is not None else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="*", default=["0"], help="camera indexes, video files or folders")
+    parser.add_argument("--output", help="results file (.csv, .jsonl, .parquet), printed when omitted")
+    parser.add_argument("--workers", type=int, default=None, help="detection processes, default CPU count, 0 for none")
+    parser.add_argument("--max-frames", type=int, default=None, help="per source")
+    parser.add_argument("--chunk-seconds", type=float, default=None,
+                        help="process files in parallel chunks of this length instead of frame by frame")
+    parser.add_argument("--calibration", default="default", help="camera name of the calibration file to use")
+    args = parser.parse_args()
+
+    sources = expand_sources(args.sources)
+    if not sources:
+        parser.error("no video files found")
+    # the calibration holds for one frame size, each source gets it scaled to its own
+    frame_focal_length = FrameFocalLength(*camera_focal_length(args.calibration))
+    writer = open_results(args.output) if args.output else None
+    detection_pool = None
+    if args.workers != 0 and args.chunk_seconds is None:
+        detection_pool = DetectionPool(workers=args.workers)
+        detection_pool.warm_up()
+
+    total_frames = 0
+    total_start = time.perf_counter()
+    try:
+        for source in sources:
+            start = time.perf_counter()
+            emit = writer.write if writer else print_row
+            if args.chunk_seconds is not None and not isinstance(source, int):
+                frames = run_file_chunked(source, frame_focal_length, args.workers, args.chunk_seconds,
+                                          emit, args.max_frames)
+            else:
+                frames = run_source(source, frame_focal_length, detection_pool, emit, args.max_frames)
+            elapsed = time.perf_counter() - start
+            total_frames += frames
+            print(f"[INFO] {source}: {frames} frames in {elapsed:.2f} s ({frames / elapsed if elapsed else 0:.1f} fps)")
+    finally:
+        if writer is not None:
+            writer.close()
+        if detection_pool is not None:
+            detection_pool.close()
+    elapsed = time.perf_counter() - total_start
+    print(f"[INFO] {len(sources)} sources, {total_frames} frames in {elapsed:.2f} s "
+          f"({total_frames / elapsed if elapsed else 0:.1f} fps)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Distance alert server for many cameras in one process.
+
+    python multi_camera_server.py --camera front_door=rtsp://10.0.0.5/stream --camera lab=0
+    python multi_camera_server.py --config cameras.json
+
+cameras.json is a list of {"id": ..., "source": ..., "alert_distance_min": ..., "alert_distance_max": ...}.
+Each camera is streamed at /cameras/<id>/video_feed, detection for all cameras runs
+on one shared worker pool. A camera calibrated with
+Capture_Reference_image/calibrate.py --camera <id> uses its own focal length.
+"""
+import argparse
+import json
+from collections.abc import Mapping
+
+from flask import Flask, render_template, Response, request, jsonify
+
+from distance_core import MjpegStream, stream_options
+from distance_core.calibration import camera_focal_length, load_calibration
+from distance_core.multi_camera import CameraManager
+
+app = Flask(__name__)
+manager = None
+
+
+def parse_source(source):
+    """
+    Camera indexes come in as strings from the command line and forms.
+    """
+    if isinstance(source, str) and source.isdigit():
+        return int(source)
+    return source
+
+
+def parse_alert_range(data, min_field, max_field, required=True):
+    """
+    Alert range in whole cm from form or JSON fields, the same rules for every endpoint.
+    :param required: False to leave out fields that are missing, the camera keeps its defaults.
+    :return: {"alert_distance_min": ..., "alert_distance_max": ...} with the fields found.
+    :raise ValueError: when data is not a set of fields, a required field is missing, a value is
+                       not an integer or the minimum is not below the maximum.
+    """
+    if not isinstance(data, Mapping):
+        raise ValueError("Expected form or JSON object fields.")
+    distances = {}
+    for field, option in ((min_field, "alert_distance_min"), (max_field, "alert_distance_max")):
+        if field not in data:
+            if required:
+                raise ValueError(f"Missing field '{field}'.")
+            continue
+        try:
+            distances[option] = int(data[field])
+        except (TypeError, ValueError):
+            raise ValueError("Invalid distance value entered. Please enter valid integers.") from None
+    if len(distances) == 2 and distances["alert_distance_min"] >= distances["alert_distance_max"]:
+        raise ValueError("Minimum distance must be less than maximum distance.")
+    return distances
+
+
+def camera_or_404(camera_id):
+    camera = manager.get(camera_id)
+    if camera is None:
+        return None, (jsonify({"message": f"Unknown camera {camera_id}."}), 404)
+    return camera, None
+
+
+@app.route('/')
+def index():
+    return render_template('cameras.html', cameras=manager.stats()["cameras"])
+
+
+@app.route('/cameras', methods=['GET'])
+def list_cameras():
+    return jsonify(manager.stats())
+
+
+def calibrated_options(camera_id, options):
+    """
+    Cameras calibrated with Capture_Reference_image/calibrate.py --camera ID use their own focal length,
+    scaled to the size of their frames.
+    """
+    calibration = load_calibration(camera_id)
+    if calibration is not None and "focal_length" not in options:
+        options["focal_length"] = calibration.focal_length
+        options["focal_size"] = tuple(calibration.image_size)
+    return options
+
+
+@app.route('/cameras', methods=['POST'])
+def add_camera():
+    """
+    Add a camera from form or JSON fields: id, source, and optionally the alert range.
+    """
+    data = request.get_json(silent=True) or request.form
+    try:
+        options = parse_alert_range(data, "alert_distance_min", "alert_distance_max", required=False)
+        camera = manager.add_camera(data["id"], parse_source(data["source"]), **calibrated_options(data["id"], options))
+    except KeyError as missing:
+        return jsonify({"message": f"Missing field {missing}."}), 400
+    except ValueError as error:
+        return jsonify({"message": str(error)}), 400
+    return jsonify({"message": f"Camera {camera.camera_id} added.", "camera": camera.stats()}), 201
+
+
+@app.route('/cameras/<camera_id>', methods=['DELETE'])
+def remove_camera(camera_id):
+    if manager.remove_camera(camera_id) is None:
+        return jsonify({"message": f"Unknown camera {camera_id}."}), 404
+    return jsonify({"message": f"Camera {camera_id} removed."})
+
+
+@app.route('/cameras/<camera_id>/video_feed')
+def video_feed(camera_id):
+    """
+    MJPEG stream of one camera, ?quality=, ?scale= and ?max_fps= as in flask_server.py.
+    """
+    camera, error = camera_or_404(camera_id)
+    if error:
+        return error
+    try:
+        options = stream_options(request.args)
+    except ValueError as error:
+        return jsonify({"message": str(error)}), 400
+    stream = MjpegStream(camera.broadcaster, camera.jpeg_cache, sock=request.environ.get('werkzeug.socket'), **options)
+    return Response(iter(stream), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+
+@app.route('/cameras/<camera_id>/set_distance', methods=['POST'])
+def set_distance(camera_id):
+    """
+    Set the alert range of one camera.
+    """
+    camera, error = camera_or_404(camera_id)
+    if error:
+        return error
+    data = request.get_json(silent=True) or request.form
+    try:
+        camera.set_alert_range(**parse_alert_range(data, "min_distance", "max_distance"))
+    except ValueError as error:
+        print(f"[ERROR] {error}")
+        return jsonify({"message": str(error)}), 400
+    message = f"Updated alert distances for {camera_id}: Min = {camera.alert_distance_min} cm, Max = {camera.alert_distance_max} cm"
+    print(f"[INFO] {message}")
+    return jsonify({"message": message})
+
+
+def load_cameras(args):
+    cameras = []
+    if args.config:
+        with open(args.config) as file:
+            cameras.extend(json.load(file))
+    for item in args.camera:
+        camera_id, _, source = item.partition("=")
+        cameras.append({"id": camera_id, "source": source})
+    return cameras
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--camera", action="append", default=[], metavar="ID=SOURCE")
+    parser.add_argument("--config", help="JSON file with the list of cameras")
+    parser.add_argument("--workers", type=int, default=None, help="detection pool size, defaults to CPU count")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+
+    focal_length_found, focal_size = camera_focal_length()
+    manager = CameraManager(focal_length_found, workers=args.workers, focal_size=focal_size)
+    for options in load_cameras(args):
+        options = calibrated_options(options["id"], dict(options))
+        manager.add_camera(options.pop("id"), parse_source(options.pop("source")), **options)
+
+    print(f"[INFO] Starting multi-camera server with {manager.workers} detection workers...")
+    app.run(host='0.0.0.0', port=args.port, threaded=True)